@@ -41,6 +41,56 @@ interface ILiquidityPool {
     event UpdateMaxLiquidity(uint256 indexed maxLiquidity);
     event UpdateExpiry(uint256 expiry);
     event UpdateProjectOwner(address account);
+    event Settle(
+        address indexed issuer,
+        uint256 amount,
+        uint256 premium,
+        uint256 payout
+    );
+
+    /// @notice Can't roll over before the expiry ends
+    error ExpiryNotOver(uint256 expiry);
+    /// @notice Current round hasn't ended completely
+    error RoundNotOver(uint256 lockedAmount, uint256 lockedPremium);
+    /// @notice Pool has already ended
+    error PoolEnded();
+    /// @notice Pool has already reached it's max limit
+    error MaxLiquidityReached(uint256 maxLiquidity);
+    /// @notice Pool: Mint limit is too large
+    error MintLimitTooLarge(uint256 mint, uint256 minMint);
+    /// @notice Pool: Amount is too small
+    error AmountTooSmall();
+    /// @notice Pool: Amount is too large
+    error AmountTooLarge(uint256 amount, uint256 limit);
+    /// @notice Pool: Not enough funds on the pool contract. Please lower the amount.
+    error NotEnoughFunds(uint256 amount, uint256 availableBalance);
+    /// @notice Pool: Nothing to withdraw
+    error NothingToWithdraw();
+    /// @notice Pool: State locked up
+    error StateLockedUp(uint256 round);
+    /// @notice Pool: Not accepting withdraw requests currently
+    error NotAcceptingWithdrawRequests();
+    /// @notice Can't process the requests when the round is active
+    error RoundActive(uint256 round);
+    /// @notice Wrong id
+    error WrongLockID(uint256 id, uint256 expectedID);
+    /// @notice Pool: lockedAmount is already unlocked
+    error AlreadyUnlocked(uint256 id);
+    /// @notice Pool: Locks of the expiry have already been settled
+    error ExpirySettled(uint256 expiry);
+    /// @notice Pool: Settled amounts aren't the expiry's locked amounts
+    error SettleMismatch(
+        uint256 amount,
+        uint256 premium,
+        uint256 lockedAmount,
+        uint256 lockedPremium
+    );
+    /// @notice Pool: The transfer didn't go through
+    error TransferFailed();
+    /// @notice Pool: Address is the zero address
+    error ZeroAddress();
+    /// @notice Pool Error: The pool is empty
+    error PoolEmpty();
 
     function totalTokenXBalance() external view returns (uint256 amount);
 
@@ -63,6 +113,21 @@ interface ILiquidityPool {
         uint256 tokenXAmount,
         uint256 premium
     ) external;
+
+    function settle(
+        uint256 expiration,
+        uint256 tokenXAmount,
+        uint256 premium,
+        uint256 payout
+    ) external;
+
+    function sendPartial(
+        uint256 id,
+        address to,
+        uint256 tokenXAmount,
+        uint256 unlockedAmount,
+        uint256 unlockedPremium
+    ) external;
 }
 
 interface IBufferOptions {
@@ -75,10 +140,97 @@ interface IBufferOptions {
     );
 
     event Exercise(uint256 indexed id, uint256 profit);
+    event ExerciseUnits(uint256 indexed id, uint256 units, uint256 profit);
     event Expire(uint256 indexed id, uint256 premium);
     event PayReferralFee(address indexed referrer, uint256 amount);
     event PayAdminFee(address indexed owner, uint256 amount);
     event AutoExerciseStatusChange(address indexed account, bool status);
+    event SettleSeries(
+        uint256 indexed seriesID,
+        uint256 expiryPrice,
+        uint256 payout
+    );
+
+    /// @notice Option creation is not allowed currently
+    error CreationNotAllowed(uint256 expiration);
+    /// @notice The option's price is too low
+    error PriceTooLow(uint256 totalFee);
+    /// @notice The Fee Transfer didn't go through
+    error FeeTransferFailed();
+    /// @notice Option has not expired yet
+    error OptionNotExpired(uint256 expiration);
+    /// @notice Option is not active
+    error OptionNotActive(uint256 optionID);
+    /// @notice Current price is too low
+    error CurrentPriceTooLow(uint256 currentPrice, uint256 strike);
+    /// @notice Current price is too high
+    error CurrentPriceTooHigh(uint256 currentPrice, uint256 strike);
+    /// @notice only owner
+    error NotOptionOwner(uint256 optionID, address account);
+    /// @notice Option doesn't exist
+    error OptionDoesNotExist(uint256 optionID);
+    /// @notice msg.sender is not eligible to exercise the option
+    error NotEligibleToExercise(uint256 optionID, address account);
+    /// @notice Option has expired
+    error OptionExpired(uint256 expiration);
+    /// @notice Options contract doesn't has enough TokenX
+    error NotEnoughTokenX(uint256 balance, uint256 required);
+    /// @notice Expiration price is too low
+    error ExpiryPriceTooLow(uint256 expiryPrice, uint256 strike);
+    /// @notice Expiration price is too high
+    error ExpiryPriceTooHigh(uint256 expiryPrice, uint256 strike);
+    /// @notice RoundID not found
+    error RoundIDNotFound(uint256 expiration);
+    /// @notice Option's round has already been settled
+    error RoundSettled(uint256 optionID);
+    /// @notice Option's round hasn't been settled yet
+    error RoundNotSettled(uint256 optionID);
+    /// @notice Units to exercise are out of range
+    error InvalidUnits(uint256 units, uint256 totalUnits);
+    /// @notice Quote has expired
+    error QuoteExpired(uint256 deadline);
+    /// @notice Quote doesn't match the option
+    error QuoteMismatch();
+    /// @notice Quote has already been used
+    error QuoteUsed(uint256 nonce);
+    /// @notice Quote was signed for another buyer
+    error QuoteNotForBuyer(address buyer);
+    /// @notice Invalid quote signature
+    error InvalidQuoteSignature();
+    /// @notice Series isn't open for buying
+    error SeriesNotOpen(uint256 seriesID);
+    /// @notice ChainLinkPricer: roundId not first after expiry
+    error RoundNotAfterExpiry(uint256 roundID, uint256 expiration);
+    /// @notice ChainLinkPricer: invalid price
+    error InvalidPrice(uint256 roundID);
+    /// @notice ChainLinkPricer: Invalid previousRoundId
+    error InvalidPreviousRoundID();
+    /// @notice ChainLinkPricer: previousRoundId not last before expiry
+    error PreviousRoundAfterExpiry(uint256 previousRoundID);
+    /// @notice Expiry's round has already been set
+    error RoundIDAlreadySet(uint256 expiration);
+    /// @notice Empty splitUnits
+    error EmptySplitUnits();
+    /// @notice NFT: not owner nor approved
+    error NotOwnerNorApproved(uint256 optionID, address account);
+    /// @notice new token already exists
+    error OptionAlreadyExists(uint256 optionID);
+    /// @notice Empty optionIDs
+    error EmptyOptionIDs();
+    /// @notice self merge not allowed
+    error SelfMerge(uint256 optionID);
+    /// @notice slot mismatch
+    error SlotMismatch(uint256 optionID, uint256 targetOptionID);
+    /// @notice not same owner
+    error OwnerMismatch(uint256 optionID, uint256 targetOptionID);
+    /// @notice source token owner mismatch
+    error SourceOwnerMismatch(uint256 optionID, address from);
+    /// @notice transfer to the zero address
+    error TransferToZeroAddress();
+    /// @notice target token owner mismatch
+    error TargetOwnerMismatch(uint256 targetOptionID, address to);
+    /// @notice slot already existed
+    error SlotAlreadyExists(uint256 slot);
 
     enum State {
         Inactive,
@@ -147,12 +299,78 @@ interface IBufferOptions {
         bool isValid;
     }
 
+    struct RoundSeries {
+        uint256 strike;
+        uint256 expiration;
+        OptionType optionType;
+        uint256 amount;
+        uint256 lockedAmount;
+        uint256 premium;
+        uint256 expiryPrice;
+        uint256 payout;
+        bool isSettled;
+    }
+
+    struct Quote {
+        address buyer;
+        uint256 seriesID;
+        OptionType optionType;
+        uint256 amount;
+        uint256 strike;
+        uint256 expiration;
+        uint256 premium;
+        uint256 deadline;
+        uint256 nonce;
+    }
+
     struct ApproveUnits {
         address[] approvals;
         mapping(address => uint256) allowances;
     }
 }
 
+interface IBufferOptionsReader {
+    function options(uint256 optionID)
+        external
+        view
+        returns (
+            IBufferOptions.State state,
+            uint256 strike,
+            uint256 amount,
+            uint256 lockedAmount,
+            uint256 premium,
+            uint256 expiration,
+            IBufferOptions.OptionType optionType
+        );
+
+    function slotDetails(uint256 slot)
+        external
+        view
+        returns (
+            uint256 strike,
+            uint256 expiration,
+            IBufferOptions.OptionType optionType,
+            bool isValid
+        );
+
+    function exists(uint256 optionID) external view returns (bool);
+
+    function ownerOf(uint256 optionID) external view returns (address);
+
+    function unitsInToken(uint256 optionID) external view returns (uint256);
+
+    function slotOf(uint256 optionID) external view returns (uint256);
+
+    function tokensInSlot(uint256 slot) external view returns (uint256);
+
+    function tokenOfSlotByIndex(uint256 slot, uint256 index)
+        external
+        view
+        returns (uint256);
+
+    function nextTokenId() external view returns (uint256);
+}
+
 interface INFTReceiver {
     function onNFTReceived(
         address operator,
@@ -170,6 +388,10 @@ interface IOptionsConfig {
         OnlyCall,
         None
     }
+    enum CDFMethod {
+        Choudhury,
+        LookupTable
+    }
     event UpdateImpliedVolatility(uint256 value);
     event UpdateSettlementFeePercentage(uint256 value);
     event UpdateSettlementFeeRecipient(address account);
@@ -180,6 +402,49 @@ interface IOptionsConfig {
     event UpdateTradingPermission(PermittedTradingType permissionType);
     event UpdateStrike(uint256 value);
     event UpdateUnits(uint256 value);
+    event UpdateQuoteSigner(address account);
+    event UpdateCDFMethod(CDFMethod method);
+    event AddSeries(
+        uint256 indexed seriesID,
+        uint256 strike,
+        uint256 impliedVolRate
+    );
+    event UpdateSeries(
+        uint256 indexed seriesID,
+        uint256 impliedVolRate,
+        bool isActive
+    );
+
+    /// @notice Wrong option type
+    error WrongOptionType();
+    /// @notice Period is too short
+    error PeriodTooShort(uint256 period);
+    /// @notice Period is too long
+    error PeriodTooLong(uint256 period);
+    /// @notice Price difference is too large
+    error PriceDifferenceTooLarge(uint256 amount, uint256 strikeFee);
+    /// @notice Wrong value
+    error InsufficientValue(uint256 value, uint256 totalFee);
+    /// @notice ImpliedVolRate limit is too small
+    error ImpliedVolRateTooSmall(uint256 value);
+    /// @notice Series doesn't exist
+    error SeriesDoesNotExist(uint256 seriesID);
+    /// @notice Can't change strike before the expiry ends
+    error StrikeLocked(uint256 expiry);
+    /// @notice SettlementFeePercentage is too high
+    error SettlementFeePercentageTooHigh(uint256 value);
+    /// @notice StakingFeePercentage is too high
+    error StakingFeePercentageTooHigh(uint256 value);
+    /// @notice ReferralRewardPercentage is too high
+    error ReferralRewardPercentageTooHigh(uint256 value);
+    /// @notice wrong value
+    error ValueOutOfRange(uint256 value);
+
+    struct Series {
+        uint256 strike;
+        uint256 impliedVolRate;
+        bool isActive;
+    }
 }
 
 interface IOptionWindowCreator {
@@ -246,6 +511,26 @@ interface IPriceProvider {
 
 }
 
+interface IPriceHistory {
+    struct Observation {
+        uint64 timestamp;
+        uint80 roundID;
+        uint112 price;
+    }
+
+    event Observe(uint256 indexed roundID, uint256 timestamp, uint256 price);
+
+    /// @notice PriceHistory: No price observed at or before the timestamp
+    error PriceNotObserved(uint256 timestamp);
+
+    function priceAt(uint256 timestamp)
+        external
+        view
+        returns (Observation memory);
+
+    function latestObservation() external view returns (Observation memory);
+}
+
 interface INFTCore {
     function burnOption(uint256 optionId_) external;
 
@@ -22,24 +22,26 @@ library FeeCalculator {
         returns (uint256 utilization)
     {
         uint256 poolBalance = pool.totalTokenXBalance();
-        require(poolBalance > 0, "O8");
+        if (poolBalance == 0) revert ILiquidityPool.PoolEmpty();
 
         utilization = ((pool.lockedAmount() + amount) * 100e8) / poolBalance;
     }
 
     /**
      * @notice Calculate the Utilisation adjusted ImpliedVol for the pool according to https://www.desmos.com/calculator/xdmhn97opd
+     * @param impliedVolRate ImpliedVol of the option's series
      * @param amount Option amount
      * @param pool The pool selling the option
      * @param config The configuration params
      * @return iv The adjusted ImpliedVol
      */
     function currentImpliedVolatility(
+        uint256 impliedVolRate,
         uint256 amount,
         BufferIBFRPoolV2 pool,
         OptionConfig config
     ) public view returns (uint256 iv) {
-        iv = config.impliedVolRate();
+        iv = impliedVolRate;
         uint256 utilization = getNewUtilisation(amount, pool);
         if (utilization > 40e8) {
             iv += (iv * (utilization - 40e8)) / config.utilizationRate();
@@ -51,6 +53,7 @@ library FeeCalculator {
      * @param period Option period in seconds (1 days <= period <= 4 weeks)
      * @param amount Option amount
      * @param strike Strike price of the option
+     * @param impliedVolRate ImpliedVol of the option's series
      * @return total Total price to be paid
      * @return settlementFee Amount to be distributed to the Buffer token holders
      * @return premium Amount that covers the price difference in the ITM options
@@ -59,6 +62,7 @@ library FeeCalculator {
         uint256 period,
         uint256 amount,
         uint256 strike,
+        uint256 impliedVolRate,
         IBufferOptions.OptionType optionType,
         uint256 currentPrice,
         OptionConfig config,
@@ -73,12 +77,13 @@ library FeeCalculator {
         )
     {
         // usdPremium per amount is USD Price of the option in 1e8
-        uint256 usdPremium = OptionMath.blackScholesPrice(
-            currentImpliedVolatility(amount, pool, config),
+        uint256 usdPremium = OptionMath._fusedBlackScholesPrice(
+            currentImpliedVolatility(impliedVolRate, amount, pool, config),
             strike,
             currentPrice,
             period,
-            optionType == IBufferOptions.OptionType.Call
+            optionType == IBufferOptions.OptionType.Call,
+            config.cdfMethod() == IOptionsConfig.CDFMethod.LookupTable
         );
         premium = (usdPremium * amount) / currentPrice;
         settlementFee = getSettlementFee(amount, config);
@@ -843,6 +843,14 @@ library ABDKMath64x64 {
 library OptionMath {
     using ABDKMath64x64 for int128;
 
+    struct Greeks {
+        uint256 price;
+        int256 delta;
+        int256 gamma;
+        int256 vega;
+        int256 theta;
+    }
+
     // 64x64 fixed point integer constants
     int128 internal constant ONE_64x64 = 0x10000000000000000;
     int128 internal constant THREE_64x64 = 0x30000000000000000;
@@ -851,6 +859,46 @@ library OptionMath {
     int128 private constant CDF_CONST_0 = 0x09109f285df452394; // 2260 / 3989
     int128 private constant CDF_CONST_1 = 0x19abac0ea1da65036; // 6400 / 3989
     int128 private constant CDF_CONST_2 = 0x0d3c84b78b749bd6b; // 3300 / 3989
+    // 64x64 fixed point representation of 1 / sqrt(2 * pi)
+    int128 private constant INV_SQRT_2PI_64x64 = 0x0662114cf50d94234;
+
+    // Choudhury’s approximation of the tail N(-x) for x from -1/16 to 8 + 1/8
+    // in steps of 1/16, as 64-bit fractions generated by scripts/cdf_table.py
+    uint256 private constant CDF_TABLE_SEGMENTS = 128;
+    bytes private constant CDF_TABLE =
+        hex"867791759d75700080092be2804a700079a11b97419a74007343655fd8c72800"
+        hex"6cf4a71f6a72380066b9de461839ec006098360c8b9430005a94dcaeef493800"
+        hex"54b4df13738b04004efd0a6495c490004971d3356c89d000441741cbdd4e0400"
+        hex"3ef0e32dc221ba003a01be8d25030000354c4eae5cde7e0030d27ee1e011c600"
+        hex"2c95ab2b700176002896a330fb10f60024d5af8d33c7440021529924547e7200"
+        hex"1e0cb21cc3f1d5001b02e021412b01001833a796d9e8a700159d37762d867000"
+        hex"133d757d5765140011120a7643ada3000f186e5417ebe6800d4df3f1a8458580"
+        hex"0bafd4428de15c800a3b38d03a17210008ed45642f429b8007c320c834ddae80"
+        hex"06b9fc8cc259c30005cf1bccd6d902c004ffd8ece3186ec00449aa5833a20100"
+        hex"03aa264557122080031f058e411012e002a625ac5fbb87a0023d89eb7eafdb40"
+        hex"01e35be82e7b6c300195eb6f851564500153add67b7e00a0011b3cdf01bf6220"
+        hex"00eb554032c0d2f800c2d4e5f3df681800a0b8fad867a29800841bcd6db127b8"
+        hex"006c32a0374cb47400584b71af1eae540047cac7a4d0b53c003a29876999584a"
+        hex"002ef2e25d25273a0025c25cb7f52ac2001e41f2ddbe8da6001828601bcc538c"
+        hex"001337887e8025c1000f3b065e61484e000c06db67b38cd4000976442d1ac72c"
+        hex"00076aaccb33392e0005cac4bc78a6a8000481afb6242f0000037e513b78f39d"
+        hex"0002b2b080f0d0430002137237ae0a8b00019765e79ba2ce00013724982c5b45"
+        hex"0000ecbea9874a800000b376e76abec80000878909d2f6d6000065fa039a864e"
+        hex"00004c70ab51477400003915754113b200002a781e28e19e00001f7a4c0765d2"
+        hex"0000173e4cff6599000011193bc2004200000c87ecf404970000092621c53244"
+        hex"000006a791922b7d000004d26f2155010000037b1e165bc800000280dada8a19"
+        hex"000001cb22b5a00800000147b36e3660000000e901c139dd000000a50c90b088"
+        hex"00000074780865fe00000051e0535fd100000039570186bd00000028010eb978"
+        hex"0000001bcdbb50c500000013402d0d2e0000000d473543b9000000091fb0f04f"
+        hex"000000063ed0d61e00000004423fee4400000002e49f8f6c00000001f5336b99"
+        hex"0000000151e2804a00000000e2eac27d0000000097cfe99700000000652d954d"
+        hex"00000000432cba05000000002c6dc454000000001d45c94e0000000013368a0d"
+        hex"000000000c8ff13b00000000082ead4e00000000054f221900000000036e806e"
+        hex"000000000235a9e300000000016ad59c0000000000e7d7a40000000000939303"
+        hex"00000000005d934c00000000003b1b9d00000000002531670000000000175045"
+        hex"00000000000e8eb90000000000090e200000000000059c6800000000000376a4"
+        hex"00000000000221300000000000014df2000000000000cbc40000000000007bdb"
+        hex"0000000000004aff0000000000002d3c0000000000001b2e";
 
     /**
      * @notice calculate the exponential decay coefficient for a given interval
@@ -887,6 +935,53 @@ library OptionMath {
         return input64x64 > 0 ? ONE_64x64.sub(value64x64) : value64x64;
     }
 
+    /**
+     * @notice calculate Choudhury’s approximation of the Black-Scholes CDF
+     * from a lookup table, with cubic interpolation between its entries
+     * @dev the absolute error against _N is below 3e-7
+     * @param input64x64 64x64 fixed point representation of random variable
+     * @return 64x64 fixed point representation of the approximated CDF of x
+     */
+    function _lookupN(int128 input64x64) internal pure returns (int128) {
+        return _cdf(input64x64, _lookupTail(input64x64.abs()));
+    }
+
+    /**
+     * @notice calculate the tail N(-x) of Choudhury’s approximation from a
+     * lookup table, interpolating between the 4 nearest entries
+     * @param abs64x64 64x64 fixed point representation of x, x >= 0
+     * @return 64x64 fixed point representation of N(-x)
+     */
+    function _lookupTail(int128 abs64x64) internal pure returns (int128) {
+        // Entries are 1/16 apart, x >> 60 is the segment and the low 60 bits
+        // its position within the segment
+        uint256 segment = uint256(int256(abs64x64 >> 60));
+        if (segment >= CDF_TABLE_SEGMENTS) return 0;
+
+        bytes memory table = CDF_TABLE;
+        uint256 entries;
+        // The 32 bytes at the segment's entry hold the 4 entries around it,
+        // from x - 1/16 to x + 2/16
+        assembly {
+            entries := mload(add(add(table, 32), mul(segment, 8)))
+        }
+        int256 p0 = int256(entries >> 192);
+        int256 p1 = int256((entries >> 128) & 0xFFFFFFFFFFFFFFFF);
+        int256 p2 = int256((entries >> 64) & 0xFFFFFFFFFFFFFFFF);
+        int256 p3 = int256(entries & 0xFFFFFFFFFFFFFFFF);
+        int256 t = int256(
+            (uint256(int256(abs64x64)) << 4) & 0xFFFFFFFFFFFFFFFF
+        );
+
+        // Lagrange polynomial through the 4 entries,
+        // p1 + (a t + b t^2 + c t^3) / 6 with t as a 64 bit fraction
+        int256 a = 6 * p2 - 2 * p0 - 3 * p1 - p3;
+        int256 b = 3 * (p0 - 2 * p1 + p2);
+        int256 c = 3 * (p1 - p2) + p3 - p0;
+        int256 value = (t * (a + ((t * (b + ((t * c) >> 64))) >> 64))) >> 64;
+        return int128(p1 + value / 6);
+    }
+
     /**
      * @notice calculate the price of an option using the Black-Scholes model
      * @param impliedVol uint256 representation of annualized impliedVol with a factor of 1e4
@@ -961,4 +1056,291 @@ library OptionMath {
                 );
         }
     }
+
+    /**
+     * @notice calculate the price of an option using the Black-Scholes model
+     * in a single internal call, without the library calls of blackScholesPrice
+     * @dev the result is within 1 (1e-8 of the quote asset) of blackScholesPrice.
+     * Where the approximation goes below zero deep out of the money,
+     * blackScholesPrice reverts and this returns 0. With the lookup table the
+     * error of both CDF terms adds up to less than (strike + spot) * 3e-7
+     * @param impliedVol uint256 representation of annualized impliedVol with a factor of 1e4
+     * @param strike uint256 representation of strike price with a factor of 1e8
+     * @param spot uint256 representation of spot price with a factor of 1e8
+     * @param period uint256 representation of duration of option contract (in seconds)
+     * @param isCall whether to price "call" or "put" option
+     * @param useLookupTable whether to use _lookupN instead of _N for the CDF
+     * @return uint256 representation of Black-Scholes option price with a factor of 1e8
+     */
+    function _fusedBlackScholesPrice(
+        uint256 impliedVol,
+        uint256 strike,
+        uint256 spot,
+        uint256 period,
+        bool isCall,
+        bool useLookupTable
+    ) internal pure returns (uint256) {
+        (int128 ratio64x64, int128 d1_64x64, int128 d2_64x64) = _d1d2(
+            impliedVol,
+            strike,
+            spot,
+            period
+        );
+        (int128 tail1_64x64, int128 tail2_64x64) = _tails(
+            ratio64x64,
+            d1_64x64,
+            d2_64x64,
+            useLookupTable
+        );
+
+        return
+            _priceFromTails(
+                strike,
+                isCall,
+                ratio64x64,
+                d1_64x64,
+                d2_64x64,
+                tail1_64x64,
+                tail2_64x64
+            );
+    }
+
+    /**
+     * @notice calculate the price and the Greeks of an option using the
+     * Black-Scholes model, from a single evaluation of d1 and d2
+     * @dev the price is the one of _fusedBlackScholesPrice with Choudhury’s
+     * approximation, the Greeks assume no interest rate
+     * @param impliedVol uint256 representation of annualized impliedVol with a factor of 1e4
+     * @param strike uint256 representation of strike price with a factor of 1e8
+     * @param spot uint256 representation of spot price with a factor of 1e8
+     * @param period uint256 representation of duration of option contract (in seconds)
+     * @param isCall whether to price "call" or "put" option
+     * @return greeks the price, delta per unit of the underlying, gamma per 1
+     * of spot, vega per 1 (100%) of impliedVol and theta per year, all with a
+     * factor of 1e8
+     */
+    function blackScholesGreeks(
+        uint256 impliedVol,
+        uint256 strike,
+        uint256 spot,
+        uint256 period,
+        bool isCall
+    ) public pure returns (Greeks memory greeks) {
+        (int128 ratio64x64, int128 d1_64x64, int128 d2_64x64) = _d1d2(
+            impliedVol,
+            strike,
+            spot,
+            period
+        );
+        (int128 tail1_64x64, int128 tail2_64x64) = _tails(
+            ratio64x64,
+            d1_64x64,
+            d2_64x64,
+            false
+        );
+        greeks.price = _priceFromTails(
+            strike,
+            isCall,
+            ratio64x64,
+            d1_64x64,
+            d2_64x64,
+            tail1_64x64,
+            tail2_64x64
+        );
+
+        int128 delta64x64 = _cdf(d1_64x64, tail1_64x64);
+        greeks.delta = (isCall ? delta64x64 : delta64x64.sub(ONE_64x64)).muli(
+            1e8
+        );
+        (greeks.gamma, greeks.vega, greeks.theta) = _gammaVegaTheta(
+            impliedVol,
+            spot,
+            period,
+            d1_64x64,
+            d1_64x64.sub(d2_64x64)
+        );
+    }
+
+    /**
+     * @notice calculate gamma, vega and theta, which are the same for calls
+     * and puts without an interest rate
+     * @param deviation64x64 64x64 fixed point representation of
+     * impliedVol * sqrt(period), d1 - d2
+     */
+    function _gammaVegaTheta(
+        uint256 impliedVol,
+        uint256 spot,
+        uint256 period,
+        int128 d1_64x64,
+        int128 deviation64x64
+    )
+        internal
+        pure
+        returns (
+            int256 gamma,
+            int256 vega,
+            int256 theta
+        )
+    {
+        int128 spot64x64 = ABDKMath64x64.divi(int256(spot), 1e8);
+        int128 pdf64x64 = _mul(
+            (-_mul(d1_64x64, d1_64x64) >> 1).exp(),
+            INV_SQRT_2PI_64x64
+        );
+        // S * phi(d1) * sigma * sqrt(T)
+        int128 spread64x64 = _mul(_mul(spot64x64, pdf64x64), deviation64x64);
+
+        gamma = _div(pdf64x64, _mul(spot64x64, deviation64x64)).muli(1e8);
+        vega = _div(spread64x64, ABDKMath64x64.divi(int256(impliedVol), 1e4))
+            .muli(1e8);
+        theta = -_div(
+            spread64x64,
+            ABDKMath64x64.divi(int256(period), 365 days) << 1
+        ).muli(1e8);
+    }
+
+    /**
+     * @notice calculate the price of an option from spot / strike and the
+     * tails of d1 and d2
+     * @return uint256 representation of the option price with a factor of 1e8
+     */
+    function _priceFromTails(
+        uint256 strike,
+        bool isCall,
+        int128 ratio64x64,
+        int128 d1_64x64,
+        int128 d2_64x64,
+        int128 tail1_64x64,
+        int128 tail2_64x64
+    ) internal pure returns (uint256) {
+        // The price is computed in units of strike, as S/K * N(d1) - N(d2)
+        // for calls and N(-d2) - S/K * N(-d1) for puts
+        int128 price64x64 = isCall
+            ? _mul(ratio64x64, _cdf(d1_64x64, tail1_64x64)).sub(
+                _cdf(d2_64x64, tail2_64x64)
+            )
+            : _cdf(-d2_64x64, tail2_64x64).sub(
+                _mul(ratio64x64, _cdf(-d1_64x64, tail1_64x64))
+            );
+        return price64x64 > 0 ? price64x64.mulu(strike) : 0;
+    }
+
+    /**
+     * @notice calculate d1 and d2 of the Black-Scholes model straight from
+     * the scaled integer inputs
+     * @return ratio64x64 64x64 fixed point representation of spot / strike
+     * @return d1_64x64 64x64 fixed point representation of d1
+     * @return d2_64x64 64x64 fixed point representation of d2
+     */
+    function _d1d2(
+        uint256 impliedVol,
+        uint256 strike,
+        uint256 spot,
+        uint256 period
+    )
+        internal
+        pure
+        returns (
+            int128 ratio64x64,
+            int128 d1_64x64,
+            int128 d2_64x64
+        )
+    {
+        ratio64x64 = ABDKMath64x64.divi(int256(spot), int256(strike));
+        // impliedVol^2 has a factor of 1e8
+        int128 cumulativeVariance64x64 = ABDKMath64x64.divi(
+            int256(impliedVol * impliedVol * period),
+            1e8 * 365 days
+        );
+        // gavg(x, 1) is sqrt(x) without a library call
+        int128 cumulativeVarianceSqrt64x64 = cumulativeVariance64x64.gavg(
+            ONE_64x64
+        );
+
+        d1_64x64 = _div(
+            ratio64x64.ln().add(cumulativeVariance64x64 >> 1),
+            cumulativeVarianceSqrt64x64
+        );
+        d2_64x64 = d1_64x64.sub(cumulativeVarianceSqrt64x64);
+    }
+
+    /**
+     * @notice calculate the tails N(-|d1|) and N(-|d2|) of Choudhury’s
+     * approximation, sharing one exp between them, or from the lookup table
+     * @param ratio64x64 64x64 fixed point representation of spot / strike
+     * @param d1_64x64 64x64 fixed point representation of d1
+     * @param d2_64x64 64x64 fixed point representation of d2
+     * @param useLookupTable whether to read the tails from the lookup table
+     */
+    function _tails(
+        int128 ratio64x64,
+        int128 d1_64x64,
+        int128 d2_64x64,
+        bool useLookupTable
+    ) internal pure returns (int128 tail1_64x64, int128 tail2_64x64) {
+        if (useLookupTable) {
+            return (_lookupTail(d1_64x64.abs()), _lookupTail(d2_64x64.abs()));
+        }
+
+        int128 d1Squared64x64 = _mul(d1_64x64, d1_64x64);
+        int128 exp1_64x64 = (-d1Squared64x64 >> 1).exp();
+
+        tail1_64x64 = _tail(d1_64x64.abs(), d1Squared64x64, exp1_64x64);
+        // exp(-d2^2 / 2) = exp(-d1^2 / 2) * spot / strike
+        tail2_64x64 = _tail(
+            d2_64x64.abs(),
+            _mul(d2_64x64, d2_64x64),
+            _mul(exp1_64x64, ratio64x64)
+        );
+    }
+
+    /**
+     * @notice calculate N(-|x|) of Choudhury’s approximation from exp(-x^2 / 2)
+     */
+    function _tail(
+        int128 abs64x64,
+        int128 squared64x64,
+        int128 exp64x64
+    ) private pure returns (int128) {
+        return
+            _div(
+                exp64x64,
+                CDF_CONST_0.add(_mul(CDF_CONST_1, abs64x64)).add(
+                    _mul(
+                        CDF_CONST_2,
+                        squared64x64.add(THREE_64x64).gavg(ONE_64x64)
+                    )
+                )
+            );
+    }
+
+    /**
+     * @notice calculate N(x) from its tail N(-|x|)
+     */
+    function _cdf(int128 input64x64, int128 tail64x64)
+        private
+        pure
+        returns (int128)
+    {
+        return input64x64 > 0 ? ONE_64x64.sub(tail64x64) : tail64x64;
+    }
+
+    /**
+     * @notice ABDKMath64x64.mul without the library call
+     */
+    function _mul(int128 x, int128 y) private pure returns (int128) {
+        int256 result = (int256(x) * y) >> 64;
+        require(result >= type(int128).min && result <= type(int128).max);
+        return int128(result);
+    }
+
+    /**
+     * @notice ABDKMath64x64.div without the library call
+     */
+    function _div(int128 x, int128 y) private pure returns (int128) {
+        require(y != 0);
+        int256 result = (int256(x) << 64) / y;
+        require(result >= type(int128).min && result <= type(int128).max);
+        return int128(result);
+    }
 }
@@ -0,0 +1,197 @@
+pragma solidity ^0.8.0;
+
+// SPDX-License-Identifier: BUSL-1.1
+
+import "./OptionMath.sol";
+
+/**
+ * @author Heisenberg
+ * @title Buffer OptionMath Harness
+ * @notice Exposes the internal functions of ABDKMath64x64 and OptionMath
+ * together with the gas each call uses, for tests and gas benchmarks
+ */
+contract OptionMathHarness {
+    struct PriceInput {
+        uint256 impliedVol;
+        uint256 strike;
+        uint256 spot;
+        uint256 period;
+        bool isCall;
+    }
+
+    /**
+     * @notice Prices every input with blackScholesPrice, or the fused kernel,
+     * in a single call. The inputs that revert are flagged in reverted
+     * instead of reverting the whole batch
+     * @param inputs Inputs to price
+     * @param useFusedKernel Whether to price with _fusedBlackScholesPrice
+     */
+    function blackScholesPriceBatch(
+        PriceInput[] calldata inputs,
+        bool useFusedKernel
+    )
+        external
+        view
+        returns (
+            uint256[] memory prices,
+            uint256[] memory gasUsed,
+            bool[] memory reverted
+        )
+    {
+        prices = new uint256[](inputs.length);
+        gasUsed = new uint256[](inputs.length);
+        reverted = new bool[](inputs.length);
+        for (uint256 i = 0; i < inputs.length; i++) {
+            try
+                this.priceInput(inputs[i], useFusedKernel)
+            returns (uint256 price, uint256 gas) {
+                (prices[i], gasUsed[i]) = (price, gas);
+            } catch {
+                reverted[i] = true;
+            }
+        }
+    }
+
+    function priceInput(PriceInput calldata input, bool useFusedKernel)
+        external
+        view
+        returns (uint256 price, uint256 gasUsed)
+    {
+        uint256 initialGas = gasleft();
+        price = useFusedKernel
+            ? OptionMath._fusedBlackScholesPrice(
+                input.impliedVol,
+                input.strike,
+                input.spot,
+                input.period,
+                input.isCall,
+                false
+            )
+            : OptionMath.blackScholesPrice(
+                input.impliedVol,
+                input.strike,
+                input.spot,
+                input.period,
+                input.isCall
+            );
+        gasUsed = initialGas - gasleft();
+    }
+
+    function blackScholesPrice(
+        uint256 impliedVol,
+        uint256 strike,
+        uint256 spot,
+        uint256 period,
+        bool isCall
+    ) external view returns (uint256 price, uint256 gasUsed) {
+        uint256 initialGas = gasleft();
+        price = OptionMath.blackScholesPrice(
+            impliedVol,
+            strike,
+            spot,
+            period,
+            isCall
+        );
+        gasUsed = initialGas - gasleft();
+    }
+
+    function fusedBlackScholesPrice(
+        uint256 impliedVol,
+        uint256 strike,
+        uint256 spot,
+        uint256 period,
+        bool isCall,
+        bool useLookupTable
+    ) external view returns (uint256 price, uint256 gasUsed) {
+        uint256 initialGas = gasleft();
+        price = OptionMath._fusedBlackScholesPrice(
+            impliedVol,
+            strike,
+            spot,
+            period,
+            isCall,
+            useLookupTable
+        );
+        gasUsed = initialGas - gasleft();
+    }
+
+    function N(int128 input64x64)
+        external
+        view
+        returns (int128 value64x64, uint256 gasUsed)
+    {
+        uint256 initialGas = gasleft();
+        value64x64 = OptionMath._N(input64x64);
+        gasUsed = initialGas - gasleft();
+    }
+
+    function lookupN(int128 input64x64)
+        external
+        view
+        returns (int128 value64x64, uint256 gasUsed)
+    {
+        uint256 initialGas = gasleft();
+        value64x64 = OptionMath._lookupN(input64x64);
+        gasUsed = initialGas - gasleft();
+    }
+
+    function ln(int128 x)
+        external
+        view
+        returns (int128 value64x64, uint256 gasUsed)
+    {
+        uint256 initialGas = gasleft();
+        value64x64 = ABDKMath64x64.ln(x);
+        gasUsed = initialGas - gasleft();
+    }
+
+    function log_2(int128 x)
+        external
+        view
+        returns (int128 value64x64, uint256 gasUsed)
+    {
+        uint256 initialGas = gasleft();
+        value64x64 = ABDKMath64x64.log_2(x);
+        gasUsed = initialGas - gasleft();
+    }
+
+    function exp(int128 x)
+        external
+        view
+        returns (int128 value64x64, uint256 gasUsed)
+    {
+        uint256 initialGas = gasleft();
+        value64x64 = ABDKMath64x64.exp(x);
+        gasUsed = initialGas - gasleft();
+    }
+
+    function exp_2(int128 x)
+        external
+        view
+        returns (int128 value64x64, uint256 gasUsed)
+    {
+        uint256 initialGas = gasleft();
+        value64x64 = ABDKMath64x64.exp_2(x);
+        gasUsed = initialGas - gasleft();
+    }
+
+    function sqrt(int128 x)
+        external
+        view
+        returns (int128 value64x64, uint256 gasUsed)
+    {
+        uint256 initialGas = gasleft();
+        value64x64 = ABDKMath64x64.sqrt(x);
+        gasUsed = initialGas - gasleft();
+    }
+
+    function divu(uint256 x, uint256 y)
+        external
+        view
+        returns (int128 value64x64, uint256 gasUsed)
+    {
+        uint256 initialGas = gasleft();
+        value64x64 = ABDKMath64x64.divu(x, y);
+        gasUsed = initialGas - gasleft();
+    }
+}
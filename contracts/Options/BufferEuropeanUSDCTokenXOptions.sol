@@ -5,6 +5,8 @@ pragma solidity ^0.8.0;
 import "@openzeppelin/contracts/access/Ownable.sol";
 import "@openzeppelin/contracts/security/ReentrancyGuard.sol";
 import "@openzeppelin/contracts/token/ERC20/ERC20.sol";
+import "@openzeppelin/contracts/utils/cryptography/ECDSA.sol";
+import "@openzeppelin/contracts/utils/cryptography/draft-EIP712.sol";
 import "./OptionConfig.sol";
 import "./BufferNFTCore.sol";
 import "../Pool/BufferIBFRPoolV2.sol";
@@ -19,10 +21,14 @@ contract BufferEuropeanUSDCTokenXOptions is
     IBufferOptions,
     Ownable,
     ReentrancyGuard,
+    EIP712,
     BufferNFTCore
 {
-    ERC20 public USDC;
-    ERC20 public tokenX;
+    ERC20 public immutable USDC;
+    ERC20 public immutable tokenX;
+    // 10**decimals of the tokens, used for converting the fees to USDC
+    uint256 internal immutable usdcPrecision;
+    uint256 internal immutable tokenXPrecision;
     mapping(uint256 => string) private _tokenURIs;
     IPriceProvider public priceProvider;
     OptionType public fixedOptionType = OptionType.Call;
@@ -32,9 +38,17 @@ contract BufferEuropeanUSDCTokenXOptions is
     BufferIBFRPoolV2 public pool;
     OptionConfig public config;
     mapping(uint256 => SlotDetail) public slotDetails;
+    mapping(uint256 => RoundSeries) public roundSeries;
+    mapping(uint256 => uint256[]) internal expiryToSeriesIDs;
+    uint256 public unclaimedPayout;
+    mapping(uint256 => bool) public usedQuoteNonces;
     uint256 internal contractCreationTimestamp;
 
     bytes32 public constant AUTO_CLOSER_ROLE = keccak256("AUTO_CLOSER_ROLE");
+    bytes32 public constant QUOTE_TYPEHASH =
+        keccak256(
+            "Quote(address buyer,uint256 seriesID,uint8 optionType,uint256 amount,uint256 strike,uint256 expiration,uint256 premium,uint256 deadline,uint256 nonce)"
+        );
 
     uint256 public constant minimumYield = 5;
 
@@ -44,12 +58,14 @@ contract BufferEuropeanUSDCTokenXOptions is
         BufferIBFRPoolV2 _pool,
         OptionConfig _config,
         ERC20 _USDC
-    ) {
+    ) EIP712("Buffer Options", "1") {
         tokenX = _tokenX;
         pool = _pool;
         contractCreationTimestamp = block.timestamp;
         config = _config;
         USDC = _USDC;
+        usdcPrecision = 10**_USDC.decimals();
+        tokenXPrecision = 10**_tokenX.decimals();
         priceProvider = pp;
         _setupRole(DEFAULT_ADMIN_ROLE, msg.sender);
     }
@@ -78,25 +94,151 @@ contract BufferEuropeanUSDCTokenXOptions is
         string memory metadata,
         PaymentMethod _paymentMethod
     ) external nonReentrant returns (uint256 optionID) {
+        optionID = _create(
+            amount,
+            referrer,
+            metadata,
+            _paymentMethod,
+            _getSeries(0),
+            0
+        );
+    }
+
+    /**
+     * @notice Creates a new option in one of the series listed in the config
+     * @param seriesID ID of the option's series
+     * @param amount Option amount in tokenX
+     * @param referrer Referrer address
+     * @param metadata Option metadata
+     * @param _paymentMethod Option payment method for buying
+     * @return optionID Created option's ID
+     */
+    function createInSeries(
+        uint256 seriesID,
+        uint256 amount,
+        address referrer,
+        string memory metadata,
+        PaymentMethod _paymentMethod
+    ) external nonReentrant returns (uint256 optionID) {
+        optionID = _create(
+            amount,
+            referrer,
+            metadata,
+            _paymentMethod,
+            _getSeries(seriesID),
+            0
+        );
+    }
+
+    /**
+     * @notice Creates a new option at a premium quoted and signed off-chain
+     * by the quote signer set in the config, for the sender only
+     * @param quote Signed quote for the option
+     * @param signature Quote signer's signature of the quote
+     * @param referrer Referrer address
+     * @param metadata Option metadata
+     * @param _paymentMethod Option payment method for buying
+     * @return optionID Created option's ID
+     */
+    function createWithQuote(
+        Quote calldata quote,
+        bytes calldata signature,
+        address referrer,
+        string memory metadata,
+        PaymentMethod _paymentMethod
+    ) external nonReentrant returns (uint256 optionID) {
+        if (block.timestamp > quote.deadline)
+            revert QuoteExpired(quote.deadline);
+        if (quote.buyer != msg.sender) revert QuoteNotForBuyer(quote.buyer);
+        IOptionsConfig.Series memory series = _getSeries(quote.seriesID);
+        if (
+            quote.premium == 0 ||
+            quote.optionType != fixedOptionType ||
+            quote.strike != series.strike ||
+            quote.expiration != pool.fixedExpiry()
+        ) revert QuoteMismatch();
+        if (usedQuoteNonces[quote.nonce]) revert QuoteUsed(quote.nonce);
+        address signer = config.quoteSigner();
+        if (
+            signer == address(0) ||
+            ECDSA.recover(quoteDigest(quote), signature) != signer
+        ) revert InvalidQuoteSignature();
+        usedQuoteNonces[quote.nonce] = true;
+
+        optionID = _create(
+            quote.amount,
+            referrer,
+            metadata,
+            _paymentMethod,
+            series,
+            quote.premium
+        );
+    }
+
+    /**
+     * @notice Returns the EIP-712 digest that the quote signer signs for a quote
+     * @param quote Quote to be signed
+     */
+    function quoteDigest(Quote calldata quote) public view returns (bytes32) {
+        return
+            _hashTypedDataV4(
+                keccak256(
+                    abi.encode(
+                        QUOTE_TYPEHASH,
+                        quote.buyer,
+                        quote.seriesID,
+                        quote.optionType,
+                        quote.amount,
+                        quote.strike,
+                        quote.expiration,
+                        quote.premium,
+                        quote.deadline,
+                        quote.nonce
+                    )
+                )
+            );
+    }
+
+    /**
+     * @notice Creates a new option, the premium is calculated on-chain unless it is quoted
+     * @param series Strike and ImpliedVol of the option
+     * @param premium Quoted premium, 0 if the premium should be calculated
+     */
+    function _create(
+        uint256 amount,
+        address referrer,
+        string memory metadata,
+        PaymentMethod _paymentMethod,
+        IOptionsConfig.Series memory series,
+        uint256 premium
+    ) internal returns (uint256 optionID) {
         uint256 poolExpiration = pool.fixedExpiry();
-        require(poolExpiration > block.timestamp, "O1");
+        if (poolExpiration <= block.timestamp)
+            revert CreationNotAllowed(poolExpiration);
         uint256 period = poolExpiration - block.timestamp;
 
         uint256 currentPrice = priceProvider.getUsdPrice();
 
-        require(period >= 12 hours, "O1");
+        if (period < 12 hours)
+            revert CreationNotAllowed(block.timestamp + period);
 
-        (uint256 totalFee, uint256 settlementFee, uint256 premium) = fees(
-            period,
-            amount,
-            config.fixedStrike(),
-            fixedOptionType
-        );
+        uint256 settlementFee;
+        if (premium == 0) {
+            (, settlementFee, premium) = _fees(
+                period,
+                amount,
+                series.strike,
+                series.impliedVolRate,
+                fixedOptionType,
+                currentPrice
+            );
+        } else {
+            settlementFee = FeeCalculator.getSettlementFee(amount, config);
+        }
+        uint256 totalFee = settlementFee + premium;
 
-        require(
-            totalFee * 365 days * 100 > amount * period * minimumYield,
-            "O2"
-        );
+        if (totalFee * 365 days * 100 <= amount * period * minimumYield)
+            revert PriceTooLow(totalFee);
 
         // User has to approve first inorder to execute this function
         if (_paymentMethod == PaymentMethod.TokenX) {
@@ -105,22 +247,26 @@ contract BufferEuropeanUSDCTokenXOptions is
                 address(this),
                 totalFee
             );
-            require(success, "O3");
+            if (!success) revert FeeTransferFailed();
         } else {
-            require(tokenX.balanceOf(address(this)) >= totalFee, "O15");
+            if (tokenX.balanceOf(address(this)) < totalFee + unclaimedPayout)
+                revert NotEnoughTokenX(
+                    tokenX.balanceOf(address(this)),
+                    totalFee + unclaimedPayout
+                );
 
             bool success = USDC.transferFrom(
                 msg.sender,
                 pool.projectOwner(),
-                (((totalFee * 10**USDC.decimals()) / 10**tokenX.decimals()) *
-                    currentPrice) / 1e8
+                (((totalFee * usdcPrecision) / tokenXPrecision) * currentPrice) /
+                    1e8
             );
-            require(success, "O3");
+            if (!success) revert FeeTransferFailed();
         }
 
         Option memory option = Option(
             State.Active,
-            config.fixedStrike(),
+            series.strike,
             amount,
             (amount * config.optionCollateralizationRatio()) / 100,
             premium,
@@ -129,6 +275,7 @@ contract BufferEuropeanUSDCTokenXOptions is
         );
         optionID = _generateTokenId();
         _setOption(optionID, option);
+        _addToSeries(option);
         _mint(
             optionID,
             msg.sender,
@@ -213,17 +360,18 @@ contract BufferEuropeanUSDCTokenXOptions is
         (, uint256 price, , uint256 roundTimestamp, ) = priceProvider
             .getRoundData(roundId);
         uint256 expiryTimestamp = pool.fixedExpiry();
-        require(expiryTimestamp < roundTimestamp, "C1");
-        require(price >= 0, "C2");
+        if (roundTimestamp <= expiryTimestamp)
+            revert RoundNotAfterExpiry(roundId, expiryTimestamp);
+        if (price == 0) revert InvalidPrice(roundId);
         uint256 previousRoundId = roundId - 1;
         while (!isCorrectRoundId) {
             (, , , uint256 previousRoundTimestamp, ) = priceProvider
                 .getRoundData(previousRoundId);
             if (previousRoundTimestamp == 0) {
-                require(previousRoundId > 0, "C3");
+                if (previousRoundId == 0) revert InvalidPreviousRoundID();
                 previousRoundId = previousRoundId - 1;
             } else if (previousRoundTimestamp > expiryTimestamp) {
-                revert("C4");
+                revert PreviousRoundAfterExpiry(previousRoundId);
             } else {
                 isCorrectRoundId = true;
                 expiryToRoundID[expiryTimestamp] = previousRoundId;
@@ -231,6 +379,29 @@ contract BufferEuropeanUSDCTokenXOptions is
         }
     }
 
+    /**
+     * @notice Sets the expiry's round from the price history, when the price
+     * provider is a PriceHistory that has observed a round after the expiry.
+     * The observed round must be the source's last round before the expiry,
+     * its next round has to be after it, otherwise setRoundIDForExpiry is used
+     */
+    function setRoundIDFromHistory() external returns (uint256 roundID) {
+        IPriceHistory history = IPriceHistory(address(priceProvider));
+        uint256 expiryTimestamp = pool.fixedExpiry();
+        if (expiryToRoundID[expiryTimestamp] != 0)
+            revert RoundIDAlreadySet(expiryTimestamp);
+        IPriceHistory.Observation memory latest = history.latestObservation();
+        if (latest.timestamp <= expiryTimestamp)
+            revert RoundNotAfterExpiry(latest.roundID, expiryTimestamp);
+        roundID = history.priceAt(expiryTimestamp).roundID;
+        (, , , uint256 nextRoundTimestamp, ) = priceProvider.getRoundData(
+            roundID + 1
+        );
+        if (nextRoundTimestamp <= expiryTimestamp)
+            revert RoundNotAfterExpiry(roundID + 1, expiryTimestamp);
+        expiryToRoundID[expiryTimestamp] = roundID;
+    }
+
     /**
      * @notice Unlocks the locked funds if the option was
      * OTM at the time of expiry otherwise exercises it
@@ -238,10 +409,15 @@ contract BufferEuropeanUSDCTokenXOptions is
      */
     function unlock(uint256 optionID) public {
         Option storage option = options[optionID];
-        require(option.expiration <= block.timestamp, "O4");
-        require(option.state == State.Active, "O5");
+        if (option.expiration > block.timestamp)
+            revert OptionNotExpired(option.expiration);
+        if (option.state != State.Active) revert OptionNotActive(optionID);
+        if (_seriesOf(optionID).isSettled) {
+            claim(optionID);
+            return;
+        }
         uint256 roundID = expiryToRoundID[option.expiration];
-        require(roundID > 0, "O20");
+        if (roundID == 0) revert RoundIDNotFound(option.expiration);
         (, uint256 priceAtExpiration, , , ) = priceProvider.getRoundData(
             roundID
         );
@@ -254,9 +430,11 @@ contract BufferEuropeanUSDCTokenXOptions is
             exercise(optionID);
         } else {
             option.state = State.Expired;
+            _removeFromSeries(optionID);
             pool.unlock(optionID);
             burnToken(optionID);
             emit Expire(optionID, option.premium);
+            _clearOption(optionID, State.Expired);
         }
     }
 
@@ -277,43 +455,249 @@ contract BufferEuropeanUSDCTokenXOptions is
      * @param optionID ID of your option
      */
     function exercise(uint256 optionID) public returns (uint256 profit) {
-        require(exists(optionID), "O10");
+        if (!exists(optionID)) revert OptionDoesNotExist(optionID);
 
         Option storage option = options[optionID];
 
-        require(option.expiration <= block.timestamp, "O4");
-        require(option.state == State.Active, "O14");
+        if (option.expiration > block.timestamp)
+            revert OptionNotExpired(option.expiration);
+        if (option.state != State.Active) revert OptionNotActive(optionID);
+        if (_seriesOf(optionID).isSettled) {
+            return claim(optionID);
+        }
         uint256 roundID = expiryToRoundID[option.expiration];
-        require(roundID > 0, "O20");
+        if (roundID == 0) revert RoundIDNotFound(option.expiration);
         (, uint256 priceAtExpiration, , , ) = priceProvider.getRoundData(
             roundID
         );
 
         if (option.optionType == OptionType.Call) {
-            require(option.strike <= priceAtExpiration, "O17");
+            if (option.strike > priceAtExpiration)
+                revert ExpiryPriceTooLow(priceAtExpiration, option.strike);
             profit =
                 ((priceAtExpiration - option.strike) * option.amount) /
                 priceAtExpiration;
         } else {
-            require(option.strike >= priceAtExpiration, "O18");
+            if (option.strike < priceAtExpiration)
+                revert ExpiryPriceTooHigh(priceAtExpiration, option.strike);
             profit =
                 ((option.strike - priceAtExpiration) * option.amount) /
                 priceAtExpiration;
         }
         if (profit > option.lockedAmount) profit = option.lockedAmount;
+        _removeFromSeries(optionID);
         pool.send(optionID, ownerOf(optionID), profit);
         // Burn the option
         burnToken(optionID);
-        option.state = State.Exercised;
+        _clearOption(optionID, State.Exercised);
         emit Exercise(optionID, profit);
     }
 
     /**
-     * @notice Sends all the tokenX in the contract
-     * back to the project owner
+     * @notice Settles every series of options expiring at the given timestamp
+     * against the expiry price. The collateral of the whole round is released
+     * in the pool at once and the profit of the ITM options is kept in the
+     * contract until their holders claim it
+     * @param expiration Expiry timestamp of the round
+     */
+    function settleRound(uint256 expiration) external {
+        if (expiration > block.timestamp) revert OptionNotExpired(expiration);
+        uint256 roundID = expiryToRoundID[expiration];
+        if (roundID == 0) revert RoundIDNotFound(expiration);
+        (, uint256 priceAtExpiration, , , ) = priceProvider.getRoundData(
+            roundID
+        );
+
+        uint256[] storage seriesIDs = expiryToSeriesIDs[expiration];
+        uint256 totalLockedAmount;
+        uint256 totalPremium;
+        uint256 totalPayout;
+        bool hasSettled;
+        for (uint256 i = 0; i < seriesIDs.length; i++) {
+            RoundSeries storage series = roundSeries[seriesIDs[i]];
+            if (series.isSettled) continue;
+            hasSettled = true;
+
+            series.isSettled = true;
+            series.expiryPrice = priceAtExpiration;
+            series.payout = _getProfit(
+                series.optionType,
+                series.strike,
+                series.amount,
+                series.lockedAmount,
+                priceAtExpiration
+            );
+
+            totalLockedAmount += series.lockedAmount;
+            totalPremium += series.premium;
+            totalPayout += series.payout;
+            emit SettleSeries(seriesIDs[i], priceAtExpiration, series.payout);
+        }
+        // Every series of the round is settled at once
+        if (!hasSettled) return;
+        unclaimedPayout += totalPayout;
+        pool.settle(expiration, totalLockedAmount, totalPremium, totalPayout);
+    }
+
+    /**
+     * @notice Closes an option of a settled round, sending its
+     * profit to the owner if it was ITM at the time of expiry
+     * @param optionID ID of the option
+     */
+    function claim(uint256 optionID) public returns (uint256 profit) {
+        if (!exists(optionID)) revert OptionDoesNotExist(optionID);
+
+        Option storage option = options[optionID];
+        if (option.state != State.Active) revert OptionNotActive(optionID);
+        RoundSeries storage series = _seriesOf(optionID);
+        if (!series.isSettled) revert RoundNotSettled(optionID);
+
+        profit = _getProfit(
+            option.optionType,
+            option.strike,
+            option.amount,
+            option.lockedAmount,
+            series.expiryPrice
+        );
+        _claimFromSeries(optionID, profit);
+        if (profit > 0) {
+            option.state = State.Exercised;
+            tokenX.transfer(ownerOf(optionID), profit);
+            emit Exercise(optionID, profit);
+        } else {
+            option.state = State.Expired;
+            emit Expire(optionID, option.premium);
+        }
+        // Burn the option
+        burnToken(optionID);
+        _clearOption(optionID, option.state);
+    }
+
+    /**
+     * @notice Claims an array of options
+     * @param optionIDs array of options
+     */
+    function claimAll(uint256[] calldata optionIDs) external {
+        uint256 arrayLength = optionIDs.length;
+        for (uint256 i = 0; i < arrayLength; i++) {
+            claim(optionIDs[i]);
+        }
+    }
+
+    /**
+     * @notice Returns the ids of the series expiring at the given timestamp
+     * @param expiration Expiry timestamp of the round
+     */
+    function seriesOfExpiry(uint256 expiration)
+        external
+        view
+        returns (uint256[] memory)
+    {
+        return expiryToSeriesIDs[expiration];
+    }
+
+    /**
+     * @notice Returns the id of the series an option belongs to
+     * @param strike Strike price of the option
+     * @param expiration Expiry timestamp of the option
+     * @param optionType call/put
+     */
+    function getSeriesID(
+        uint256 strike,
+        uint256 expiration,
+        OptionType optionType
+    ) public pure returns (uint256) {
+        return uint256(keccak256(abi.encode(strike, expiration, optionType)));
+    }
+
+    function _seriesOf(uint256 optionID)
+        internal
+        view
+        returns (RoundSeries storage)
+    {
+        Option storage option = options[optionID];
+        return
+            roundSeries[
+                getSeriesID(option.strike, option.expiration, option.optionType)
+            ];
+    }
+
+    function _addToSeries(Option memory option) internal {
+        uint256 seriesID = getSeriesID(
+            option.strike,
+            option.expiration,
+            option.optionType
+        );
+        RoundSeries storage series = roundSeries[seriesID];
+        if (series.expiration == 0) {
+            series.strike = option.strike;
+            series.expiration = option.expiration;
+            series.optionType = option.optionType;
+            expiryToSeriesIDs[option.expiration].push(seriesID);
+        }
+        series.amount += option.amount;
+        series.lockedAmount += option.lockedAmount;
+        series.premium += option.premium;
+    }
+
+    function _removeFromSeries(uint256 optionID) internal {
+        Option storage option = options[optionID];
+        RoundSeries storage series = _seriesOf(optionID);
+        series.amount -= option.amount;
+        series.lockedAmount -= option.lockedAmount;
+        series.premium -= option.premium;
+    }
+
+    /**
+     * @notice Removes a claimed option from its settled series. Once the
+     * series' options are all claimed, the rest of its payout, the rounding
+     * of the claims, is sent back to the pool
+     */
+    function _claimFromSeries(uint256 optionID, uint256 profit) internal {
+        RoundSeries storage series = _seriesOf(optionID);
+        _removeFromSeries(optionID);
+        series.payout -= profit;
+        unclaimedPayout -= profit;
+        if (series.amount == 0) {
+            unclaimedPayout -= series.payout;
+            _returnToPool(series.payout);
+            series.payout = 0;
+        }
+    }
+
+    /**
+     * @notice Gives payout that won't be claimed back to the LPs
+     * @param amount Payout taken out of unclaimedPayout
+     */
+    function _returnToPool(uint256 amount) internal {
+        if (amount > 0) tokenX.transfer(address(pool), amount);
+    }
+
+    /**
+     * @notice Calculates the profit of an ITM option, capped at its locked amount
+     */
+    function _getProfit(
+        OptionType optionType,
+        uint256 strike,
+        uint256 amount,
+        uint256 lockedAmount,
+        uint256 priceAtExpiration
+    ) internal pure returns (uint256 profit) {
+        if (optionType == OptionType.Call && strike < priceAtExpiration) {
+            profit = ((priceAtExpiration - strike) * amount) / priceAtExpiration;
+        } else if (optionType == OptionType.Put && strike > priceAtExpiration) {
+            profit = ((strike - priceAtExpiration) * amount) / priceAtExpiration;
+        }
+        if (profit > lockedAmount) profit = lockedAmount;
+    }
+
+    /**
+     * @notice Sends all the tokenX in the contract, except the unclaimed
+     * profit of the settled rounds, back to the project owner
      */
     function withdrawFunds() external onlyOwner {
-        uint256 tokenBalance = tokenX.balanceOf(address(this));
+        uint256 tokenBalance = tokenX.balanceOf(address(this)) -
+            unclaimedPayout;
         if (tokenBalance > 0) {
             tokenX.transfer(pool.projectOwner(), tokenBalance);
         }
@@ -343,12 +727,89 @@ contract BufferEuropeanUSDCTokenXOptions is
             uint256 premium
         )
     {
-        uint256 currentPrice = priceProvider.getUsdPrice();
+        (total, settlementFee, premium) = _fees(
+            period,
+            amount,
+            strike,
+            config.impliedVolRate(),
+            optionType,
+            priceProvider.getUsdPrice()
+        );
+    }
+
+    /**
+     * @notice Used for getting the prices of the options of a series
+     * @param seriesID ID of the option's series
+     * @param period Option period in seconds
+     * @param amount Option amount
+     * @return total Total price to be paid
+     * @return settlementFee Amount to be distributed to the Buffer token holders
+     * @return premium Amount that covers the price difference in the ITM options
+     */
+    function seriesFees(
+        uint256 seriesID,
+        uint256 period,
+        uint256 amount
+    )
+        external
+        view
+        returns (
+            uint256 total,
+            uint256 settlementFee,
+            uint256 premium
+        )
+    {
+        IOptionsConfig.Series memory series = config.getSeries(seriesID);
+        (total, settlementFee, premium) = _fees(
+            period,
+            amount,
+            series.strike,
+            series.impliedVolRate,
+            fixedOptionType,
+            priceProvider.getUsdPrice()
+        );
+    }
 
+    /**
+     * @notice Returns a series that is open for buying
+     * @param seriesID ID of the series
+     */
+    function _getSeries(uint256 seriesID)
+        internal
+        view
+        returns (IOptionsConfig.Series memory series)
+    {
+        series = config.getSeries(seriesID);
+        if (!series.isActive) revert SeriesNotOpen(seriesID);
+    }
+
+    /**
+     * @notice Calculates the option's price at an already fetched spot price
+     * so that the premium and the payment conversion use the same price
+     * @param impliedVolRate ImpliedVol of the option's series
+     * @param currentPrice Spot price of tokenX in USD
+     */
+    function _fees(
+        uint256 period,
+        uint256 amount,
+        uint256 strike,
+        uint256 impliedVolRate,
+        OptionType optionType,
+        uint256 currentPrice
+    )
+        internal
+        view
+        returns (
+            uint256 total,
+            uint256 settlementFee,
+            uint256 premium
+        )
+    {
         (total, settlementFee, premium) = FeeCalculator.fees(
             period,
             amount,
             strike,
+            impliedVolRate,
             optionType,
             currentPrice,
             config,
@@ -372,9 +833,50 @@ contract BufferEuropeanUSDCTokenXOptions is
         options[optionID] = option;
     }
 
+    /**
+     * @notice Frees the storage of a closed option,
+     * only its final state is kept as a tombstone
+     * @param optionID ID of the option
+     * @param state Final state of the option
+     */
+    function _clearOption(uint256 optionID, State state) internal {
+        delete options[optionID];
+        options[optionID].state = state;
+    }
+
+    function _clearSlot(uint256 slot) internal override {
+        delete slotDetails[slot];
+    }
+
+    /**
+     * @notice Burns an option, giving up its profit. Its collateral is
+     * released, or its claim is sent back to the pool when the round has
+     * been settled
+     * @param tokenId_ ID of the option
+     */
     function burn(uint256 tokenId_) external {
-        require(msg.sender == ownerOf(tokenId_), "O9");
+        if (msg.sender != ownerOf(tokenId_))
+            revert NotOptionOwner(tokenId_, msg.sender);
+        Option storage option = options[tokenId_];
+        if (option.state != State.Active) revert OptionNotActive(tokenId_);
+        RoundSeries storage series = _seriesOf(tokenId_);
+        if (series.isSettled) {
+            uint256 profit = _getProfit(
+                option.optionType,
+                option.strike,
+                option.amount,
+                option.lockedAmount,
+                series.expiryPrice
+            );
+            _claimFromSeries(tokenId_, profit);
+            _returnToPool(profit);
+        } else {
+            _removeFromSeries(tokenId_);
+            pool.unlock(tokenId_);
+        }
         burnToken(tokenId_);
+        emit Expire(tokenId_, option.premium);
+        _clearOption(tokenId_, State.Expired);
     }
 
     /************************************************
@@ -391,7 +893,8 @@ contract BufferEuropeanUSDCTokenXOptions is
         external
         returns (uint256[] memory newOptionIDs)
     {
-        require(splitUnits_.length > 0, "N1");
+        if (splitUnits_.length == 0) revert EmptySplitUnits();
+        if (_seriesOf(optionID).isSettled) revert RoundSettled(optionID);
         newOptionIDs = new uint256[](splitUnits_.length);
         Option memory option = _getOption(optionID);
         uint256 totalUnits = unitsInToken(optionID);
@@ -452,7 +955,9 @@ contract BufferEuropeanUSDCTokenXOptions is
     function merge(uint256[] calldata optionIDs, uint256 targetOptionID)
         external
     {
-        require(optionIDs.length > 0, "N4");
+        if (optionIDs.length == 0) revert EmptyOptionIDs();
+        if (_seriesOf(targetOptionID).isSettled)
+            revert RoundSettled(targetOptionID);
         Option memory targetOption = _getOption(targetOptionID);
 
         uint256 totalLockedAmount = targetOption.lockedAmount;
@@ -466,6 +971,7 @@ contract BufferEuropeanUSDCTokenXOptions is
             totalPremium = totalPremium + option.premium;
             pool.unlockWithoutProfit(optionIDs[i]);
             _merge(optionIDs[i], targetOptionID);
+            delete options[optionIDs[i]];
         }
         _modifyOption(
             targetOptionID,
@@ -491,6 +997,7 @@ contract BufferEuropeanUSDCTokenXOptions is
             Option memory option
         )
     {
+        if (_seriesOf(optionID).isSettled) revert RoundSettled(optionID);
         option = _getOption(optionID);
         uint256 totalUnits = unitsInToken(optionID);
         newAmount = (option.amount * transferUnits_) / totalUnits;
@@ -557,7 +1064,7 @@ contract BufferEuropeanUSDCTokenXOptions is
         uint256 targetOptionID,
         uint256 transferUnits_
     ) external virtual {
-        require(exists(targetOptionID), "N12");
+        if (!exists(targetOptionID)) revert OptionDoesNotExist(targetOptionID);
         (
             uint256 newAmount,
             uint256 newPremium,
@@ -596,7 +1103,7 @@ contract BufferEuropeanUSDCTokenXOptions is
         slot = uint256(
             keccak256(abi.encode(strike, expiration, optionType, optionID))
         );
-        require(!slotDetails[slot].isValid, "N14");
+        if (slotDetails[slot].isValid) revert SlotAlreadyExists(slot);
         slotDetails[slot] = SlotDetail(strike, expiration, optionType, true);
     }
 }
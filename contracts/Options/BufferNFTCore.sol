@@ -64,8 +64,9 @@ abstract contract BufferNFTCore is
         uint256 newOptionId_,
         uint256 splitUnits_
     ) internal {
-        require(_isApprovedOrOwner(_msgSender(), optionId_), "N2");
-        require(!_exists(newOptionId_), "N3");
+        if (!_isApprovedOrOwner(_msgSender(), optionId_))
+            revert NotOwnerNorApproved(optionId_, _msgSender());
+        if (_exists(newOptionId_)) revert OptionAlreadyExists(newOptionId_);
         setSlotOf(newOptionId_, slotOf(optionId_));
         _units[optionId_] = _units[optionId_] - splitUnits_;
 
@@ -76,12 +77,15 @@ abstract contract BufferNFTCore is
     }
 
     function _merge(uint256 optionId_, uint256 targetOptionId_) internal {
-        require(_isApprovedOrOwner(_msgSender(), optionId_), "N5");
-        require(optionId_ != targetOptionId_, "N6");
-        require(slotOf(optionId_) == slotOf(targetOptionId_), "N7");
+        if (!_isApprovedOrOwner(_msgSender(), optionId_))
+            revert NotOwnerNorApproved(optionId_, _msgSender());
+        if (optionId_ == targetOptionId_) revert SelfMerge(optionId_);
+        if (slotOf(optionId_) != slotOf(targetOptionId_))
+            revert SlotMismatch(optionId_, targetOptionId_);
 
         address owner = ownerOf(optionId_);
-        require(owner == ownerOf(targetOptionId_), "N8");
+        if (owner != ownerOf(targetOptionId_))
+            revert OwnerMismatch(optionId_, targetOptionId_);
 
         uint256 mergeUnits = _units[optionId_];
         _units[targetOptionId_] = mergeUnits + _units[targetOptionId_];
@@ -97,8 +101,9 @@ abstract contract BufferNFTCore is
         uint256 targetOptionId_,
         uint256 transferUnits_
     ) internal {
-        require(from_ == ownerOf(optionId_), "N9");
-        require(to_ != address(0), "N10");
+        if (from_ != ownerOf(optionId_))
+            revert SourceOwnerMismatch(optionId_, from_);
+        if (to_ == address(0)) revert TransferToZeroAddress();
         _beforeTransferUnits(
             from_,
             to_,
@@ -118,8 +123,10 @@ abstract contract BufferNFTCore is
         if (!_exists(targetOptionId_)) {
             _mintUnits(to_, targetOptionId_, slotOf(optionId_), transferUnits_);
         } else {
-            require(ownerOf(targetOptionId_) == to_, "N11");
-            require(slotOf(optionId_) == slotOf(targetOptionId_), "N7");
+            if (ownerOf(targetOptionId_) != to_)
+                revert TargetOwnerMismatch(targetOptionId_, to_);
+            if (slotOf(optionId_) != slotOf(targetOptionId_))
+                revert SlotMismatch(optionId_, targetOptionId_);
             _units[targetOptionId_] = _units[targetOptionId_] + transferUnits_;
         }
         optionSlotMapping[targetOptionId_] = optionSlotMapping[optionId_];
@@ -139,10 +146,20 @@ abstract contract BufferNFTCore is
      **/
 
     function burnToken(uint256 optionID) internal {
-        delete optionSlotMapping[optionID];
+        uint256 slot = slotOf(optionID);
         _burn(optionID);
+        delete optionSlotMapping[optionID];
+        if (tokensInSlot(slot) == 0) {
+            _clearSlot(slot);
+        }
     }
 
+    /**
+     * @dev Called once the last token of a slot is burnt so that
+     * the slot's storage can be freed.
+     */
+    function _clearSlot(uint256 slot) internal virtual {}
+
     function _burnUnits(uint256 optionId_, uint256 burnUnits_)
         internal
         returns (uint256 balance)
@@ -165,7 +182,7 @@ abstract contract BufferNFTCore is
         _slotTokens[slot].remove(optionId_);
         delete _units[optionId_];
 
-        ERC721._burn(optionId_);
+        ERC721URIStorage._burn(optionId_);
         emit TransferUnits(owner, address(0), optionId_, 0, burnUnits);
     }
 
@@ -174,7 +191,8 @@ abstract contract BufferNFTCore is
         uint256 optionId_,
         uint256 allowance_
     ) public {
-        require(_msgSender() == ownerOf(optionId_), "O9");
+        if (_msgSender() != ownerOf(optionId_))
+            revert NotOptionOwner(optionId_, _msgSender());
         _approveUnits(to_, optionId_, allowance_);
     }
 
@@ -208,8 +226,8 @@ abstract contract BufferNFTCore is
         ApproveUnits storage approveUnits = _tokenApprovalUnits[optionId_];
         for (uint256 i = 0; i < approveUnits.approvals.length; i++) {
             delete approveUnits.allowances[approveUnits.approvals[i]];
-            delete approveUnits.approvals[i];
         }
+        delete approveUnits.approvals;
     }
 
     function unitDecimals() public view returns (uint8) {
@@ -0,0 +1,162 @@
+pragma solidity ^0.8.0;
+
+// SPDX-License-Identifier: BUSL-1.1
+
+import "../Interfaces/Interfaces.sol";
+import "../Pool/BufferIBFRPoolV2.sol";
+
+/**
+ * @author Heisenberg
+ * @title Buffer Options Lens
+ * @notice Read-only aggregator that returns the options, slots and pool state
+ * in a single call. Works with both the American and the European options contracts.
+ */
+contract BufferOptionsLens {
+    struct OptionData {
+        uint256 optionID;
+        bool exists;
+        address owner;
+        uint256 units;
+        uint256 slot;
+        bool autoExerciseStatus;
+        IBufferOptions.Option option;
+        IBufferOptions.SlotDetail slotDetail;
+    }
+
+    struct PoolState {
+        uint256 totalTokenXBalance;
+        uint256 availableBalance;
+        uint256 lockedAmount;
+        uint256 lockedPremium;
+        uint256 maxLiquidity;
+        uint256 totalSupply;
+        uint256 fixedExpiry;
+        uint256 currentRound;
+        uint256 queueStart;
+        uint256 queueEnd;
+        bool hasPoolEnded;
+        bool isAcceptingWithdrawRequests;
+    }
+
+    /**
+     * @notice Returns the details of a list of options
+     * @param options The options contract
+     * @param optionIDs IDs of the options to query
+     * @return data Option, ownership, units and slot details for every id
+     */
+    function getOptions(
+        IBufferOptionsReader options,
+        uint256[] calldata optionIDs
+    ) external view returns (OptionData[] memory data) {
+        data = new OptionData[](optionIDs.length);
+        for (uint256 i = 0; i < optionIDs.length; i++) {
+            data[i] = _getOption(options, optionIDs[i]);
+        }
+    }
+
+    /**
+     * @notice Returns a page of the options that belong to a slot
+     * @param options The options contract
+     * @param slot Slot to query
+     * @param offset Index of the first option of the page
+     * @param limit Maximum number of options to return
+     * @return data Option, ownership, units and slot details for every id in the page
+     * @return total Number of options in the slot
+     */
+    function getOptionsOfSlot(
+        IBufferOptionsReader options,
+        uint256 slot,
+        uint256 offset,
+        uint256 limit
+    ) external view returns (OptionData[] memory data, uint256 total) {
+        total = options.tokensInSlot(slot);
+        if (offset >= total) return (new OptionData[](0), total);
+        uint256 end = limit > total - offset ? total : offset + limit;
+        uint256 length = end - offset;
+
+        data = new OptionData[](length);
+        for (uint256 i = 0; i < length; i++) {
+            data[i] = _getOption(
+                options,
+                options.tokenOfSlotByIndex(slot, offset + i)
+            );
+        }
+    }
+
+    /**
+     * @notice Returns the state of the liquidity pool
+     * @param pool The pool to query
+     * @return state Balances, locks, round and withdraw queue details of the pool
+     */
+    function getPoolState(BufferIBFRPoolV2 pool)
+        external
+        view
+        returns (PoolState memory state)
+    {
+        state.totalTokenXBalance = pool.totalTokenXBalance();
+        state.availableBalance = pool.availableBalance();
+        state.lockedAmount = pool.lockedAmount();
+        state.lockedPremium = pool.lockedPremium();
+        state.maxLiquidity = pool.maxLiquidity();
+        state.totalSupply = pool.totalSupply();
+        state.fixedExpiry = pool.fixedExpiry();
+        state.currentRound = pool.currentRound();
+        state.queueStart = pool.queueStart();
+        state.queueEnd = pool.queueEnd();
+        state.hasPoolEnded = pool.hasPoolEnded();
+        state.isAcceptingWithdrawRequests = pool.isAcceptingWithdrawRequests();
+    }
+
+    function _getOption(IBufferOptionsReader options, uint256 optionID)
+        internal
+        view
+        returns (OptionData memory data)
+    {
+        data.optionID = optionID;
+        (
+            data.option.state,
+            data.option.strike,
+            data.option.amount,
+            data.option.lockedAmount,
+            data.option.premium,
+            data.option.expiration,
+            data.option.optionType
+        ) = options.options(optionID);
+
+        data.exists = options.exists(optionID);
+        if (!data.exists) {
+            return data;
+        }
+
+        data.owner = options.ownerOf(optionID);
+        data.units = options.unitsInToken(optionID);
+        data.slot = options.slotOf(optionID);
+        (
+            data.slotDetail.strike,
+            data.slotDetail.expiration,
+            data.slotDetail.optionType,
+            data.slotDetail.isValid
+        ) = options.slotDetails(data.slot);
+        data.autoExerciseStatus = _autoExerciseStatus(
+            address(options),
+            data.owner
+        );
+    }
+
+    /**
+     * @dev The European options contract has no auto exercise, so the status
+     * is read with a staticcall and defaults to false when it isn't supported.
+     */
+    function _autoExerciseStatus(address options, address account)
+        internal
+        view
+        returns (bool status)
+    {
+        (bool success, bytes memory result) = options.staticcall(
+            abi.encodeWithSignature("autoExerciseStatus(address)", account)
+        );
+        if (success && result.length == 32) {
+            status = abi.decode(result, (bool));
+        }
+    }
+}
@@ -5,6 +5,8 @@ pragma solidity ^0.8.0;
 import "@openzeppelin/contracts/access/Ownable.sol";
 import "@openzeppelin/contracts/security/ReentrancyGuard.sol";
 import "@openzeppelin/contracts/token/ERC20/ERC20.sol";
+import "@openzeppelin/contracts/utils/cryptography/ECDSA.sol";
+import "@openzeppelin/contracts/utils/cryptography/draft-EIP712.sol";
 import "./OptionConfig.sol";
 import "./BufferNFTCore.sol";
 import "../Pool/BufferIBFRPoolV2.sol";
@@ -19,10 +21,14 @@ contract BufferUSDCTokenXOptions is
     IBufferOptions,
     Ownable,
     ReentrancyGuard,
+    EIP712,
     BufferNFTCore
 {
-    ERC20 public USDC;
+    ERC20 public immutable USDC;
     ERC20 public immutable tokenX;
+    // 10**decimals of the tokens, used for converting the fees to USDC
+    uint256 internal immutable usdcPrecision;
+    uint256 internal immutable tokenXPrecision;
     mapping(uint256 => string) private _tokenURIs;
     IPriceProvider public priceProvider;
     OptionType public fixedOptionType = OptionType.Call;
@@ -36,9 +42,14 @@ contract BufferUSDCTokenXOptions is
     mapping(address => bool) public autoExerciseStatus;
     mapping(address => bool) public hasUserBoughtFirstOption;
 
+    mapping(uint256 => bool) public usedQuoteNonces;
     uint256 internal contractCreationTimestamp;
 
     bytes32 public constant AUTO_CLOSER_ROLE = keccak256("AUTO_CLOSER_ROLE");
+    bytes32 public constant QUOTE_TYPEHASH =
+        keccak256(
+            "Quote(address buyer,uint256 seriesID,uint8 optionType,uint256 amount,uint256 strike,uint256 expiration,uint256 premium,uint256 deadline,uint256 nonce)"
+        );
 
     uint256 public constant minimumYield = 5;
 
@@ -48,12 +59,14 @@ contract BufferUSDCTokenXOptions is
         BufferIBFRPoolV2 _pool,
         OptionConfig _config,
         ERC20 _USDC
-    ) {
+    ) EIP712("Buffer Options", "1") {
         tokenX = _tokenX;
         pool = _pool;
         contractCreationTimestamp = block.timestamp;
         config = _config;
         USDC = _USDC;
+        usdcPrecision = 10**_USDC.decimals();
+        tokenXPrecision = 10**_tokenX.decimals();
         priceProvider = pp;
         _setupRole(DEFAULT_ADMIN_ROLE, msg.sender);
     }
@@ -79,24 +92,150 @@ contract BufferUSDCTokenXOptions is
         string memory metadata,
         PaymentMethod _paymentMethod
     ) external nonReentrant returns (uint256 optionID) {
-        require(pool.fixedExpiry() > block.timestamp, "O1");
-        uint256 period = pool.fixedExpiry() - block.timestamp;
-
-        uint256 currentPrice = priceProvider.getUsdPrice();
-
-        require(period >= 12 hours, "O1");
+        optionID = _create(
+            amount,
+            referrer,
+            metadata,
+            _paymentMethod,
+            _getSeries(0),
+            0
+        );
+    }
 
-        (uint256 totalFee, uint256 settlementFee, uint256 premium) = fees(
-            period,
+    /**
+     * @notice Creates a new option in one of the series listed in the config
+     * @param seriesID ID of the option's series
+     * @param amount Option amount in tokenX
+     * @param referrer Referrer address
+     * @param metadata Option metadata
+     * @param _paymentMethod Option payment method for buying
+     * @return optionID Created option's ID
+     */
+    function createInSeries(
+        uint256 seriesID,
+        uint256 amount,
+        address referrer,
+        string memory metadata,
+        PaymentMethod _paymentMethod
+    ) external nonReentrant returns (uint256 optionID) {
+        optionID = _create(
             amount,
-            config.fixedStrike(),
-            fixedOptionType
+            referrer,
+            metadata,
+            _paymentMethod,
+            _getSeries(seriesID),
+            0
         );
+    }
 
-        require(
-            totalFee * 365 days * 100 > amount * period * minimumYield,
-            "O2"
+    /**
+     * @notice Creates a new option at a premium quoted and signed off-chain
+     * by the quote signer set in the config, for the sender only
+     * @param quote Signed quote for the option
+     * @param signature Quote signer's signature of the quote
+     * @param referrer Referrer address
+     * @param metadata Option metadata
+     * @param _paymentMethod Option payment method for buying
+     * @return optionID Created option's ID
+     */
+    function createWithQuote(
+        Quote calldata quote,
+        bytes calldata signature,
+        address referrer,
+        string memory metadata,
+        PaymentMethod _paymentMethod
+    ) external nonReentrant returns (uint256 optionID) {
+        if (block.timestamp > quote.deadline)
+            revert QuoteExpired(quote.deadline);
+        if (quote.buyer != msg.sender) revert QuoteNotForBuyer(quote.buyer);
+        IOptionsConfig.Series memory series = _getSeries(quote.seriesID);
+        if (
+            quote.premium == 0 ||
+            quote.optionType != fixedOptionType ||
+            quote.strike != series.strike ||
+            quote.expiration != pool.fixedExpiry()
+        ) revert QuoteMismatch();
+        if (usedQuoteNonces[quote.nonce]) revert QuoteUsed(quote.nonce);
+        address signer = config.quoteSigner();
+        if (
+            signer == address(0) ||
+            ECDSA.recover(quoteDigest(quote), signature) != signer
+        ) revert InvalidQuoteSignature();
+        usedQuoteNonces[quote.nonce] = true;
+
+        optionID = _create(
+            quote.amount,
+            referrer,
+            metadata,
+            _paymentMethod,
+            series,
+            quote.premium
         );
+    }
+
+    /**
+     * @notice Returns the EIP-712 digest that the quote signer signs for a quote
+     * @param quote Quote to be signed
+     */
+    function quoteDigest(Quote calldata quote) public view returns (bytes32) {
+        return
+            _hashTypedDataV4(
+                keccak256(
+                    abi.encode(
+                        QUOTE_TYPEHASH,
+                        quote.buyer,
+                        quote.seriesID,
+                        quote.optionType,
+                        quote.amount,
+                        quote.strike,
+                        quote.expiration,
+                        quote.premium,
+                        quote.deadline,
+                        quote.nonce
+                    )
+                )
+            );
+    }
+
+    /**
+     * @notice Creates a new option, the premium is calculated on-chain unless it is quoted
+     * @param series Strike and ImpliedVol of the option
+     * @param premium Quoted premium, 0 if the premium should be calculated
+     */
+    function _create(
+        uint256 amount,
+        address referrer,
+        string memory metadata,
+        PaymentMethod _paymentMethod,
+        IOptionsConfig.Series memory series,
+        uint256 premium
+    ) internal returns (uint256 optionID) {
+        if (pool.fixedExpiry() <= block.timestamp)
+            revert CreationNotAllowed(pool.fixedExpiry());
+        uint256 period = pool.fixedExpiry() - block.timestamp;
+
+        uint256 currentPrice = priceProvider.getUsdPrice();
+
+        if (period < 12 hours)
+            revert CreationNotAllowed(block.timestamp + period);
+
+        uint256 settlementFee;
+        if (premium == 0) {
+            (, settlementFee, premium) = _fees(
+                period,
+                amount,
+                series.strike,
+                series.impliedVolRate,
+                fixedOptionType,
+                currentPrice
+            );
+        } else {
+            settlementFee = FeeCalculator.getSettlementFee(amount, config);
+        }
+        uint256 totalFee = settlementFee + premium;
+
+        if (totalFee * 365 days * 100 <= amount * period * minimumYield)
+            revert PriceTooLow(totalFee);
 
         // User has to approve first inorder to execute this function
         if (_paymentMethod == PaymentMethod.TokenX) {
@@ -105,22 +244,26 @@ contract BufferUSDCTokenXOptions is
                 address(this),
                 totalFee
             );
-            require(success, "O3");
+            if (!success) revert FeeTransferFailed();
         } else {
-            require(tokenX.balanceOf(address(this)) >= totalFee, "O15");
+            if (tokenX.balanceOf(address(this)) < totalFee)
+                revert NotEnoughTokenX(
+                    tokenX.balanceOf(address(this)),
+                    totalFee
+                );
 
             bool success = USDC.transferFrom(
                 msg.sender,
                 pool.projectOwner(),
-                (((totalFee * 10**USDC.decimals()) / 10**tokenX.decimals()) *
-                    currentPrice) / 1e8
+                (((totalFee * usdcPrecision) / tokenXPrecision) * currentPrice) /
+                    1e8
             );
-            require(success, "O3");
+            if (!success) revert FeeTransferFailed();
         }
 
         Option memory option = Option(
             State.Active,
-            config.fixedStrike(),
+            series.strike,
             amount,
             (amount * config.optionCollateralizationRatio()) / 100,
             premium,
@@ -218,8 +361,9 @@ contract BufferUSDCTokenXOptions is
      */
     function unlock(uint256 optionID) public {
         Option storage option = options[optionID];
-        require(option.expiration < block.timestamp, "O4");
-        require(option.state == State.Active, "O5");
+        if (option.expiration >= block.timestamp)
+            revert OptionNotExpired(option.expiration);
+        if (option.state != State.Active) revert OptionNotActive(optionID);
         option.state = State.Expired;
         pool.unlock(optionID);
 
@@ -227,6 +371,7 @@ contract BufferUSDCTokenXOptions is
         burnToken(optionID);
 
         emit Expire(optionID, option.premium);
+        _clearOption(optionID, State.Expired);
     }
 
     /**
@@ -245,7 +390,7 @@ contract BufferUSDCTokenXOptions is
      * @param optionID ID of your option
      */
     function canExercise(uint256 optionID) internal view returns (bool) {
-        require(exists(optionID), "O10");
+        if (!exists(optionID)) revert OptionDoesNotExist(optionID);
 
         address tokenOwner = ownerOf(optionID);
         bool isAutoExerciseTrue = autoExerciseStatus[tokenOwner] &&
@@ -264,23 +409,27 @@ contract BufferUSDCTokenXOptions is
      * @notice Exercises an active option
      * @param optionID ID of your option
      */
-    function exercise(uint256 optionID) external returns (uint256 profit) {
-        require(canExercise(optionID), "O12");
+    function exercise(uint256 optionID) public returns (uint256 profit) {
+        if (!canExercise(optionID))
+            revert NotEligibleToExercise(optionID, msg.sender);
 
         Option storage option = options[optionID];
 
-        require(option.expiration >= block.timestamp, "O13");
-        require(option.state == State.Active, "O14");
+        if (option.expiration < block.timestamp)
+            revert OptionExpired(option.expiration);
+        if (option.state != State.Active) revert OptionNotActive(optionID);
 
         option.state = State.Exercised;
         uint256 currentPrice = priceProvider.getUsdPrice();
         if (option.optionType == OptionType.Call) {
-            require(option.strike <= currentPrice, "O6");
+            if (option.strike > currentPrice)
+                revert CurrentPriceTooLow(currentPrice, option.strike);
             profit =
                 ((currentPrice - option.strike) * option.amount) /
                 currentPrice;
         } else {
-            require(option.strike >= currentPrice, "O7");
+            if (option.strike < currentPrice)
+                revert CurrentPriceTooHigh(currentPrice, option.strike);
             profit =
                 ((option.strike - currentPrice) * option.amount) /
                 currentPrice;
@@ -289,10 +438,66 @@ contract BufferUSDCTokenXOptions is
         pool.send(optionID, ownerOf(optionID), profit);
         // Burn the option
         burnToken(optionID);
+        _clearOption(optionID, State.Exercised);
 
         emit Exercise(optionID, profit);
     }
 
+    /**
+     * @notice Exercises a part of the units of an active option,
+     * the rest of the option stays active
+     * @param optionID ID of your option
+     * @param units Units of the option to exercise
+     */
+    function exerciseUnits(uint256 optionID, uint256 units)
+        external
+        returns (uint256 profit)
+    {
+        if (!canExercise(optionID))
+            revert NotEligibleToExercise(optionID, msg.sender);
+
+        uint256 totalUnits = unitsInToken(optionID);
+        if (units == totalUnits) return exercise(optionID);
+        if (units == 0 || units >= totalUnits)
+            revert InvalidUnits(units, totalUnits);
+
+        Option storage option = options[optionID];
+
+        if (option.expiration < block.timestamp)
+            revert OptionExpired(option.expiration);
+        if (option.state != State.Active) revert OptionNotActive(optionID);
+
+        uint256 amount = (option.amount * units) / totalUnits;
+        uint256 lockedAmount = (option.lockedAmount * units) / totalUnits;
+        uint256 premium = (option.premium * units) / totalUnits;
+
+        uint256 currentPrice = priceProvider.getUsdPrice();
+        if (option.optionType == OptionType.Call) {
+            if (option.strike > currentPrice)
+                revert CurrentPriceTooLow(currentPrice, option.strike);
+            profit = ((currentPrice - option.strike) * amount) / currentPrice;
+        } else {
+            if (option.strike < currentPrice)
+                revert CurrentPriceTooHigh(currentPrice, option.strike);
+            profit = ((option.strike - currentPrice) * amount) / currentPrice;
+        }
+        if (profit > lockedAmount) profit = lockedAmount;
+
+        option.amount = option.amount - amount;
+        option.lockedAmount = option.lockedAmount - lockedAmount;
+        option.premium = option.premium - premium;
+        _burnUnits(optionID, units);
+        pool.sendPartial(
+            optionID,
+            ownerOf(optionID),
+            profit,
+            lockedAmount,
+            premium
+        );
+
+        emit ExerciseUnits(optionID, units, profit);
+    }
+
     /**
      * Exercise Approval
      */
@@ -333,12 +538,89 @@ contract BufferUSDCTokenXOptions is
             uint256 premium
         )
     {
-        uint256 currentPrice = priceProvider.getUsdPrice();
+        (total, settlementFee, premium) = _fees(
+            period,
+            amount,
+            strike,
+            config.impliedVolRate(),
+            optionType,
+            priceProvider.getUsdPrice()
+        );
+    }
 
+    /**
+     * @notice Used for getting the prices of the options of a series
+     * @param seriesID ID of the option's series
+     * @param period Option period in seconds
+     * @param amount Option amount
+     * @return total Total price to be paid
+     * @return settlementFee Amount to be distributed to the Buffer token holders
+     * @return premium Amount that covers the price difference in the ITM options
+     */
+    function seriesFees(
+        uint256 seriesID,
+        uint256 period,
+        uint256 amount
+    )
+        external
+        view
+        returns (
+            uint256 total,
+            uint256 settlementFee,
+            uint256 premium
+        )
+    {
+        IOptionsConfig.Series memory series = config.getSeries(seriesID);
+        (total, settlementFee, premium) = _fees(
+            period,
+            amount,
+            series.strike,
+            series.impliedVolRate,
+            fixedOptionType,
+            priceProvider.getUsdPrice()
+        );
+    }
+
+    /**
+     * @notice Returns a series that is open for buying
+     * @param seriesID ID of the series
+     */
+    function _getSeries(uint256 seriesID)
+        internal
+        view
+        returns (IOptionsConfig.Series memory series)
+    {
+        series = config.getSeries(seriesID);
+        if (!series.isActive) revert SeriesNotOpen(seriesID);
+    }
+
+    /**
+     * @notice Calculates the option's price at an already fetched spot price
+     * so that the premium and the payment conversion use the same price
+     * @param impliedVolRate ImpliedVol of the option's series
+     * @param currentPrice Spot price of tokenX in USD
+     */
+    function _fees(
+        uint256 period,
+        uint256 amount,
+        uint256 strike,
+        uint256 impliedVolRate,
+        OptionType optionType,
+        uint256 currentPrice
+    )
+        internal
+        view
+        returns (
+            uint256 total,
+            uint256 settlementFee,
+            uint256 premium
+        )
+    {
         (total, settlementFee, premium) = FeeCalculator.fees(
             period,
             amount,
             strike,
+            impliedVolRate,
             optionType,
             currentPrice,
             config,
@@ -362,9 +644,35 @@ contract BufferUSDCTokenXOptions is
         options[optionID] = option;
     }
 
+    /**
+     * @notice Frees the storage of a closed option,
+     * only its final state is kept as a tombstone
+     * @param optionID ID of the option
+     * @param state Final state of the option
+     */
+    function _clearOption(uint256 optionID, State state) internal {
+        delete options[optionID];
+        options[optionID].state = state;
+    }
+
+    function _clearSlot(uint256 slot) internal override {
+        delete slotDetails[slot];
+    }
+
+    /**
+     * @notice Burns an option, giving up its profit. Its collateral is
+     * released in the pool first
+     * @param tokenId_ ID of the option
+     */
     function burn(uint256 tokenId_) external {
-        require(msg.sender == ownerOf(tokenId_), "O9");
+        if (msg.sender != ownerOf(tokenId_))
+            revert NotOptionOwner(tokenId_, msg.sender);
+        Option storage option = options[tokenId_];
+        if (option.state != State.Active) revert OptionNotActive(tokenId_);
+        pool.unlock(tokenId_);
         burnToken(tokenId_);
+        emit Expire(tokenId_, option.premium);
+        _clearOption(tokenId_, State.Expired);
     }
 
     /************************************************
@@ -375,7 +683,7 @@ contract BufferUSDCTokenXOptions is
         public
         returns (uint256[] memory newOptionIDs)
     {
-        require(splitUnits_.length > 0, "N1");
+        if (splitUnits_.length == 0) revert EmptySplitUnits();
         newOptionIDs = new uint256[](splitUnits_.length);
         Option memory option = _getOption(optionID);
         uint256 totalUnits = unitsInToken(optionID);
@@ -431,7 +739,7 @@ contract BufferUSDCTokenXOptions is
     function merge(uint256[] calldata optionIDs, uint256 targetOptionID)
         public
     {
-        require(optionIDs.length > 0, "N4");
+        if (optionIDs.length == 0) revert EmptyOptionIDs();
         Option memory targetOption = _getOption(targetOptionID);
 
         uint256 totalLockedAmount = targetOption.lockedAmount;
@@ -445,6 +753,7 @@ contract BufferUSDCTokenXOptions is
             totalPremium = totalPremium + option.premium;
             pool.unlockWithoutProfit(optionIDs[i]);
             _merge(optionIDs[i], targetOptionID);
+            delete options[optionIDs[i]];
         }
         _modifyOption(
             targetOptionID,
@@ -536,7 +845,7 @@ contract BufferUSDCTokenXOptions is
         uint256 targetOptionID,
         uint256 transferUnits_
     ) public virtual {
-        require(exists(targetOptionID), "N12");
+        if (!exists(targetOptionID)) revert OptionDoesNotExist(targetOptionID);
         (
             uint256 newAmount,
             uint256 newPremium,
@@ -575,7 +884,7 @@ contract BufferUSDCTokenXOptions is
         slot = uint256(
             keccak256(abi.encode(strike, expiration, optionType, optionID))
         );
-        require(!slotDetails[slot].isValid, "slot already existed");
+        if (slotDetails[slot].isValid) revert SlotAlreadyExists(slot);
         slotDetails[slot] = SlotDetail(strike, expiration, optionType, true);
     }
 }
@@ -21,8 +21,13 @@ contract OptionConfig is Ownable, IBufferOptions, IOptionsConfig {
     address public settlementFeeRecipient;
     uint256 public utilizationRate = 60e8;
     uint256 public fixedStrike;
+    address public quoteSigner;
+    // Series 0 is the fixedStrike and impliedVolRate series
+    uint256 public seriesCount = 1;
+    mapping(uint256 => Series) internal _series;
     BufferIBFRPoolV2 public pool;
     PermittedTradingType public permittedTradingType;
+    CDFMethod public cdfMethod;
 
     constructor(
         address staking,
@@ -53,15 +58,15 @@ contract OptionConfig is Ownable, IBufferOptions, IOptionsConfig {
         uint256 totalFee,
         uint256 msgValue
     ) external pure {
-        require(
-            optionType == IBufferOptions.OptionType.Call ||
-                optionType == IBufferOptions.OptionType.Put,
-            "Wrong option type"
-        );
-        require(period >= 1 days, "Period is too short");
-        require(period <= 90 days, "Period is too long");
-        require(amount > strikeFee, "Price difference is too large");
-        require(msgValue >= totalFee, "Wrong value");
+        if (
+            optionType != IBufferOptions.OptionType.Call &&
+            optionType != IBufferOptions.OptionType.Put
+        ) revert WrongOptionType();
+        if (period < 1 days) revert PeriodTooShort(period);
+        if (period > 90 days) revert PeriodTooLong(period);
+        if (amount <= strikeFee)
+            revert PriceDifferenceTooLarge(amount, strikeFee);
+        if (msgValue < totalFee) revert InsufficientValue(msgValue, totalFee);
     }
 
     /**
@@ -69,11 +74,88 @@ contract OptionConfig is Ownable, IBufferOptions, IOptionsConfig {
      * @param value New IVRate value
      */
     function setImpliedVolRate(uint256 value) external onlyOwner {
-        require(value >= 100, "ImpliedVolRate limit is too small");
+        if (value < 100) revert ImpliedVolRateTooSmall(value);
         impliedVolRate = value;
         emit UpdateImpliedVolatility(value);
     }
 
+    /**
+     * @notice Returns the strike and the ImpliedVol of a series
+     * @param seriesID ID of the series
+     */
+    function getSeries(uint256 seriesID)
+        external
+        view
+        returns (Series memory series)
+    {
+        if (seriesID == 0) {
+            return Series(fixedStrike, impliedVolRate, true);
+        }
+        series = _series[seriesID];
+    }
+
+    /**
+     * @notice Used for listing a new strike for the options
+     * @param strike Strike of the new series
+     * @param value ImpliedVolRate of the new series
+     * @return seriesID ID of the new series
+     */
+    function addSeries(uint256 strike, uint256 value)
+        external
+        onlyOwner
+        returns (uint256 seriesID)
+    {
+        if (strike == 0) revert ValueOutOfRange(strike);
+        if (value < 100) revert ImpliedVolRateTooSmall(value);
+        seriesID = seriesCount;
+        seriesCount = seriesID + 1;
+        _series[seriesID] = Series(strike, value, true);
+        emit AddSeries(seriesID, strike, value);
+    }
+
+    /**
+     * @notice Used for adjusting the implied volatility rate of a listed series
+     * @param seriesID ID of the series
+     * @param value New IVRate value
+     */
+    function setSeriesImpliedVolRate(uint256 seriesID, uint256 value)
+        external
+        onlyOwner
+    {
+        if (value < 100) revert ImpliedVolRateTooSmall(value);
+        Series storage series = _listedSeries(seriesID);
+        series.impliedVolRate = value;
+        emit UpdateSeries(seriesID, value, series.isActive);
+    }
+
+    /**
+     * @notice Used for stopping or resuming the sale of a listed series
+     * @param seriesID ID of the series
+     * @param isActive Whether new options can be bought in the series
+     */
+    function setSeriesStatus(uint256 seriesID, bool isActive)
+        external
+        onlyOwner
+    {
+        Series storage series = _listedSeries(seriesID);
+        series.isActive = isActive;
+        emit UpdateSeries(seriesID, series.impliedVolRate, isActive);
+    }
+
+    /**
+     * @notice Returns a series listed with addSeries
+     * @param seriesID ID of the series
+     */
+    function _listedSeries(uint256 seriesID)
+        internal
+        view
+        returns (Series storage)
+    {
+        if (seriesID == 0 || seriesID >= seriesCount)
+            revert SeriesDoesNotExist(seriesID);
+        return _series[seriesID];
+    }
+
     function setTradingPermission(PermittedTradingType permissionType)
         external
         onlyOwner
@@ -82,15 +164,23 @@ contract OptionConfig is Ownable, IBufferOptions, IOptionsConfig {
         emit UpdateTradingPermission(permissionType);
     }
 
+    /**
+     * @notice Used for choosing how the options prices evaluate the normal CDF,
+     * the lookup table is cheaper and within 3e-7 of Choudhury's approximation
+     * @param method New cdfMethod value
+     */
+    function setCDFMethod(CDFMethod method) external onlyOwner {
+        cdfMethod = method;
+        emit UpdateCDFMethod(method);
+    }
+
     /**
      * @notice Used for changing strike
      * @param value New fixedStrike value
      */
     function setStrike(uint256 value) external onlyOwner {
-        require(
-            block.timestamp > pool.fixedExpiry(),
-            "Can't change strike before the expiry ends"
-        );
+        if (block.timestamp <= pool.fixedExpiry())
+            revert StrikeLocked(pool.fixedExpiry());
         fixedStrike = value;
         emit UpdateStrike(value);
     }
@@ -100,7 +190,7 @@ contract OptionConfig is Ownable, IBufferOptions, IOptionsConfig {
      * @param value New Settlement Fee Percentage
      */
     function setSettlementFeePercentage(uint256 value) external onlyOwner {
-        require(value < 20, "SettlementFeePercentage is too high");
+        if (value >= 20) revert SettlementFeePercentageTooHigh(value);
         settlementFeePercentage = value;
         emit UpdateSettlementFeePercentage(value);
     }
@@ -115,12 +205,22 @@ contract OptionConfig is Ownable, IBufferOptions, IOptionsConfig {
         emit UpdateSettlementFeeRecipient(address(recipient));
     }
 
+    /**
+     * @notice Used for changing the signer of the option quotes,
+     * set it to the zero address to disable the signed quotes
+     * @param signer New quoteSigner address
+     */
+    function setQuoteSigner(address signer) external onlyOwner {
+        quoteSigner = signer;
+        emit UpdateQuoteSigner(signer);
+    }
+
     /**
      * @notice Used for adjusting the staking fee percentage
      * @param value New Staking Fee Percentage
      */
     function setStakingFeePercentage(uint256 value) external onlyOwner {
-        require(value <= 100, "StakingFeePercentage is too high");
+        if (value > 100) revert StakingFeePercentageTooHigh(value);
         stakingFeePercentage = value;
         emit UpdateStakingFeePercentage(value);
     }
@@ -130,7 +230,7 @@ contract OptionConfig is Ownable, IBufferOptions, IOptionsConfig {
      * @param value New Referral Reward Percentage
      */
     function setReferralRewardPercentage(uint256 value) external onlyOwner {
-        require(value <= 100, "ReferralRewardPercentage is too high");
+        if (value > 100) revert ReferralRewardPercentageTooHigh(value);
         referralRewardPercentage = value;
         emit UpdateReferralRewardPercentage(value);
     }
@@ -140,7 +240,7 @@ contract OptionConfig is Ownable, IBufferOptions, IOptionsConfig {
      * @param value New optionCollateralizationRatio value
      */
     function setOptionCollaterizationRatio(uint256 value) external onlyOwner {
-        require(50 <= value && value <= 100, "wrong value");
+        if (value < 50 || value > 100) revert ValueOutOfRange(value);
         optionCollateralizationRatio = value;
         emit UpdateOptionCollaterizationRatio(value);
     }
@@ -150,7 +250,7 @@ contract OptionConfig is Ownable, IBufferOptions, IOptionsConfig {
      * @param value New nftSaleRoyaltyPercentage value
      */
     function setNFTSaleRoyaltyPercentage(uint256 value) external onlyOwner {
-        require(value <= 10, "wrong value");
+        if (value > 10) revert ValueOutOfRange(value);
         nftSaleRoyaltyPercentage = value;
         emit UpdateNFTSaleRoyaltyPercentage(value);
     }
@@ -29,7 +29,18 @@ contract BufferIBFRPoolV2 is
     bool public isAcceptingWithdrawRequests = true;
     address public projectOwner;
     address public owner;
+    // A lock whose expiry has been settled is unlocked, even though
+    // its locked flag is still set
     mapping(address => LockedLiquidity[]) public lockedLiquidity;
+    // Issuer => expiry of each of the issuer's locks, kept apart from
+    // LockedLiquidity so that the lockedLiquidity getter keeps its shape
+    mapping(address => uint256[]) public lockExpiry;
+    // Issuer => expiry => total of the issuer's open locks of that expiry
+    mapping(address => mapping(uint256 => LockedLiquidity))
+        public expiryLockedLiquidity;
+    // Issuer => expiry => whether the issuer's locks of that expiry have
+    // been settled
+    mapping(address => mapping(uint256 => bool)) public isExpirySettled;
 
     bytes32 public constant OPTION_ISSUER_ROLE =
         keccak256("OPTION_ISSUER_ROLE");
@@ -37,7 +48,8 @@ contract BufferIBFRPoolV2 is
     bytes32 public constant PROJECT_OWNER_ROLE =
         keccak256("PROJECT_OWNER_ROLE");
 
-    ERC20 public tokenX;
+    ERC20 public immutable tokenX;
+    uint8 internal immutable _decimals;
 
     struct WithdrawRequest {
         uint256 withdrawAmount;
@@ -55,18 +67,18 @@ contract BufferIBFRPoolV2 is
     uint256 public queueEnd = 0;
 
     constructor(ERC20 _tokenX, uint256 initialExpiry) {
+        bytes memory tokenXSymbol = bytes(_tokenX.symbol());
+        uint8 tokenXDecimals = _tokenX.decimals();
+
         _name = string(
-            bytes.concat(
-                "Buffer Generic ",
-                bytes(_tokenX.symbol()),
-                " LP Token"
-            )
+            bytes.concat("Buffer Generic ", tokenXSymbol, " LP Token")
         );
-        _symbol = string(bytes.concat("r", bytes(_tokenX.symbol())));
+        _symbol = string(bytes.concat("r", tokenXSymbol));
         tokenX = _tokenX;
+        _decimals = tokenXDecimals;
         fixedExpiry = initialExpiry;
         owner = msg.sender;
-        maxLiquidity = 5000000 * 10**_tokenX.decimals();
+        maxLiquidity = 5000000 * 10**tokenXDecimals;
         _setupRole(DEFAULT_ADMIN_ROLE, msg.sender);
     }
 
@@ -89,7 +101,7 @@ contract BufferIBFRPoolV2 is
      * @dev Returns the decimals of the token.
      */
     function decimals() public view virtual override returns (uint8) {
-        return tokenX.decimals();
+        return _decimals;
     }
 
     /**
@@ -143,14 +155,9 @@ contract BufferIBFRPoolV2 is
      * @param expiry New limit
      */
     function rollOver(uint256 expiry) external onlyRole(DEFAULT_ADMIN_ROLE) {
-        require(
-            block.timestamp > fixedExpiry,
-            "Can't roll over before the expiry ends"
-        );
-        require(
-            lockedAmount == 0 && lockedPremium == 0,
-            "Current round hasn't ended completely"
-        );
+        if (block.timestamp <= fixedExpiry) revert ExpiryNotOver(fixedExpiry);
+        if (lockedAmount > 0 || lockedPremium > 0)
+            revert RoundNotOver(lockedAmount, lockedPremium);
         setExpiry(expiry);
         currentRound++;
         isAcceptingWithdrawRequests = false;
@@ -168,29 +175,27 @@ contract BufferIBFRPoolV2 is
         external
         returns (uint256 mint)
     {
-        require(!hasPoolEnded, "Pool has already ended");
+        if (hasPoolEnded) revert PoolEnded();
 
         uint256 supply = totalSupply();
         uint256 balance = tokenX.balanceOf(address(this));
 
-        require(
-            balance + tokenXAmount <= maxLiquidity,
-            "Pool has already reached it's max limit"
-        );
+        if (balance + tokenXAmount > maxLiquidity)
+            revert MaxLiquidityReached(maxLiquidity);
 
         if (supply > 0 && balance > 0)
             mint = (tokenXAmount * supply) / (balance);
         else mint = tokenXAmount * INITIAL_RATE;
 
-        require(mint >= minMint, "Pool: Mint limit is too large");
-        require(mint > 0, "Pool: Amount is too small");
+        if (mint < minMint) revert MintLimitTooLarge(mint, minMint);
+        if (mint == 0) revert AmountTooSmall();
 
         bool success = tokenX.transferFrom(
             msg.sender,
             address(this),
             tokenXAmount
         );
-        require(success, "The Provide transfer didn't go through");
+        if (!success) revert TransferFailed();
 
         uint256 adminCut = mint / 1000;
         uint256 userMint = mint - adminCut;
@@ -211,10 +216,8 @@ contract BufferIBFRPoolV2 is
         internal
         returns (uint256 burn)
     {
-        require(
-            tokenXAmount <= availableBalance(),
-            "Pool: Not enough funds on the pool contract. Please lower the amount."
-        );
+        if (tokenXAmount > availableBalance())
+            revert NotEnoughFunds(tokenXAmount, availableBalance());
         uint256 totalSupply = totalSupply();
         uint256 balance = totalTokenXBalance();
 
@@ -227,13 +230,14 @@ contract BufferIBFRPoolV2 is
 
         burn = divCeil((tokenXAmountToWithdraw * totalSupply), balance);
 
-        require(burn <= balanceOf(account), "Pool: Amount is too large");
-        require(burn > 0, "Pool: Amount is too small");
+        if (burn > balanceOf(account))
+            revert AmountTooLarge(burn, balanceOf(account));
+        if (burn == 0) revert AmountTooSmall();
 
         _burn(account, burn);
 
         bool success = tokenX.transfer(account, tokenXAmountToWithdraw);
-        require(success, "Pool: The Withdrawal didn't go through");
+        if (!success) revert TransferFailed();
         emit Withdraw(account, tokenXAmountToWithdraw, burn);
     }
 
@@ -243,7 +247,7 @@ contract BufferIBFRPoolV2 is
      * @param account User address for which the withdrawal has to be initiated
      */
     function _initiateWithdraw(uint256 tokenXAmount, address account) internal {
-        require(balanceOf(account) > 0, "Pool: Nothing to withdraw");
+        if (balanceOf(account) == 0) revert NothingToWithdraw();
 
         User storage addressToWithdrawRequest = AddressToWithdrawRequest[
             account
@@ -252,11 +256,10 @@ contract BufferIBFRPoolV2 is
             WithdrawRequest storage withdrawRequest = WithdrawRequestQueue[
                 addressToWithdrawRequest.requestIndex
             ];
-            require(
-                (withdrawRequest.round == currentRound ||
-                    withdrawRequest.round == 0),
-                "Pool: State locked up"
-            );
+            if (
+                withdrawRequest.round != currentRound &&
+                withdrawRequest.round != 0
+            ) revert StateLockedUp(withdrawRequest.round);
             withdrawRequest.withdrawAmount =
                 withdrawRequest.withdrawAmount +
                 tokenXAmount;
@@ -282,10 +285,8 @@ contract BufferIBFRPoolV2 is
         if (hasPoolEnded) {
             _withdraw(tokenXAmount, msg.sender);
         } else {
-            require(
-                isAcceptingWithdrawRequests,
-                "Pool: Not accepting withdraw requests currently"
-            );
+            if (!isAcceptingWithdrawRequests)
+                revert NotAcceptingWithdrawRequests();
             _initiateWithdraw(tokenXAmount, msg.sender);
         }
     }
@@ -316,10 +317,8 @@ contract BufferIBFRPoolV2 is
                 withdrawRequest.account
             ];
 
-            require(
-                withdrawRequest.round != currentRound,
-                "Can't process the requests when the round is active"
-            );
+            if (withdrawRequest.round == currentRound)
+                revert RoundActive(currentRound);
 
             _withdraw(withdrawRequest.withdrawAmount, withdrawRequest.account);
             emit ProcessWithdrawRequest(
@@ -349,19 +348,31 @@ contract BufferIBFRPoolV2 is
         uint256 tokenXAmount,
         uint256 premium
     ) external override onlyRole(OPTION_ISSUER_ROLE) {
-        require(id == lockedLiquidity[msg.sender].length, "Wrong id");
+        if (id != lockedLiquidity[msg.sender].length)
+            revert WrongLockID(id, lockedLiquidity[msg.sender].length);
 
-        require(
-            (lockedAmount + tokenXAmount) <= totalTokenXBalance(),
-            "Pool: Amount is too large."
-        );
+        if (lockedAmount + tokenXAmount > totalTokenXBalance())
+            revert AmountTooLarge(
+                lockedAmount + tokenXAmount,
+                totalTokenXBalance()
+            );
+
+        if (isExpirySettled[msg.sender][fixedExpiry])
+            revert ExpirySettled(fixedExpiry);
 
         bool success = tokenX.transferFrom(msg.sender, address(this), premium);
-        require(success, "The Premium transfer didn't go through");
+        if (!success) revert TransferFailed();
 
         lockedLiquidity[msg.sender].push(
             LockedLiquidity(tokenXAmount, premium, true)
         );
+        lockExpiry[msg.sender].push(fixedExpiry);
+        LockedLiquidity storage total = expiryLockedLiquidity[msg.sender][
+            fixedExpiry
+        ];
+        total.amount = total.amount + tokenXAmount;
+        total.premium = total.premium + premium;
+        total.locked = true;
         lockedPremium = lockedPremium + premium;
         lockedAmount = lockedAmount + tokenXAmount;
     }
@@ -375,11 +386,15 @@ contract BufferIBFRPoolV2 is
         uint256 tokenXAmount,
         uint256 premium
     ) public override onlyRole(OPTION_ISSUER_ROLE) {
-        LockedLiquidity storage ll = lockedLiquidity[msg.sender][id];
-        require(ll.locked, "lockedAmount is already unlocked");
+        LockedLiquidity storage ll = _lockedLiquidity(id);
         if (ll.premium > premium) {
             tokenX.transfer(msg.sender, ll.premium - premium);
         }
+        LockedLiquidity storage total = expiryLockedLiquidity[msg.sender][
+            lockExpiry[msg.sender][id]
+        ];
+        total.premium = total.premium - ll.premium + premium;
+        total.amount = total.amount - ll.amount + tokenXAmount;
         lockedPremium = lockedPremium - ll.premium + premium;
         lockedAmount = lockedAmount - ll.amount + tokenXAmount;
         ll.premium = premium;
@@ -395,10 +410,10 @@ contract BufferIBFRPoolV2 is
         onlyRole(OPTION_ISSUER_ROLE)
         returns (uint256 premium)
     {
-        LockedLiquidity storage ll = lockedLiquidity[msg.sender][id];
-        require(ll.locked, "Pool: lockedAmount is already unlocked");
+        LockedLiquidity storage ll = _lockedLiquidity(id);
         ll.locked = false;
 
+        _releaseFromExpiry(id, ll.amount, ll.premium);
         lockedPremium = lockedPremium - ll.premium;
         lockedAmount = lockedAmount - ll.amount;
         premium = ll.premium;
@@ -432,11 +447,11 @@ contract BufferIBFRPoolV2 is
         address to,
         uint256 tokenXAmount
     ) external override onlyRole(OPTION_ISSUER_ROLE) {
-        LockedLiquidity storage ll = lockedLiquidity[msg.sender][id];
-        require(ll.locked, "Pool: lockedAmount is already unlocked");
-        require(to != address(0));
+        LockedLiquidity storage ll = _lockedLiquidity(id);
+        if (to == address(0)) revert ZeroAddress();
 
         ll.locked = false;
+        _releaseFromExpiry(id, ll.amount, ll.premium);
         lockedPremium = lockedPremium - ll.premium;
         lockedAmount = lockedAmount - ll.amount;
 
@@ -445,13 +460,127 @@ contract BufferIBFRPoolV2 is
             : tokenXAmount;
 
         bool success = tokenX.transfer(to, transferTokenXAmount);
-        require(success, "Pool: The Payout transfer didn't go through");
+        if (!success) revert TransferFailed();
 
         if (transferTokenXAmount <= ll.premium)
             emit Profit(id, ll.premium - transferTokenXAmount);
         else emit Loss(id, transferTokenXAmount - ll.premium);
     }
 
+    /**
+     * @notice Called by BufferOptions to send the profit of a part of an option
+     * and release that part's share of the locked funds
+     * @param id Id of LockedLiquidity that should be reduced
+     * @param to Provider
+     * @param tokenXAmount Funds that should be sent
+     * @param unlockedAmount Part of the locked amount that should be released
+     * @param unlockedPremium Part of the locked premium that should be released
+     */
+    function sendPartial(
+        uint256 id,
+        address to,
+        uint256 tokenXAmount,
+        uint256 unlockedAmount,
+        uint256 unlockedPremium
+    ) external override onlyRole(OPTION_ISSUER_ROLE) {
+        LockedLiquidity storage ll = _lockedLiquidity(id);
+        if (to == address(0)) revert ZeroAddress();
+
+        ll.amount = ll.amount - unlockedAmount;
+        ll.premium = ll.premium - unlockedPremium;
+        _releaseFromExpiry(id, unlockedAmount, unlockedPremium);
+        lockedPremium = lockedPremium - unlockedPremium;
+        lockedAmount = lockedAmount - unlockedAmount;
+
+        uint256 transferTokenXAmount = tokenXAmount > unlockedAmount
+            ? unlockedAmount
+            : tokenXAmount;
+
+        bool success = tokenX.transfer(to, transferTokenXAmount);
+        if (!success) revert TransferFailed();
+
+        if (transferTokenXAmount <= unlockedPremium)
+            emit Profit(id, unlockedPremium - transferTokenXAmount);
+        else emit Loss(id, transferTokenXAmount - unlockedPremium);
+    }
+
+    /**
+     * @notice Called by BufferOptions to release the funds locked by a whole
+     * round of options at once and send the profit of its ITM options. The
+     * amounts have to be the totals of the issuer's open locks of the expiry,
+     * which are all unlocked
+     * @param expiration Expiry of the settled locks
+     * @param tokenXAmount Total amount locked by the settled options
+     * @param premium Total premium locked by the settled options
+     * @param payout Total profit of the ITM options, sent to the options contract
+     */
+    function settle(
+        uint256 expiration,
+        uint256 tokenXAmount,
+        uint256 premium,
+        uint256 payout
+    ) external override onlyRole(OPTION_ISSUER_ROLE) {
+        if (isExpirySettled[msg.sender][expiration])
+            revert ExpirySettled(expiration);
+        LockedLiquidity storage total = expiryLockedLiquidity[msg.sender][
+            expiration
+        ];
+        if (tokenXAmount != total.amount || premium != total.premium)
+            revert SettleMismatch(
+                tokenXAmount,
+                premium,
+                total.amount,
+                total.premium
+            );
+        delete expiryLockedLiquidity[msg.sender][expiration];
+        isExpirySettled[msg.sender][expiration] = true;
+
+        lockedPremium = lockedPremium - premium;
+        lockedAmount = lockedAmount - tokenXAmount;
+
+        uint256 transferTokenXAmount = payout > tokenXAmount
+            ? tokenXAmount
+            : payout;
+
+        if (transferTokenXAmount > 0) {
+            bool success = tokenX.transfer(msg.sender, transferTokenXAmount);
+            if (!success) revert TransferFailed();
+        }
+
+        emit Settle(msg.sender, tokenXAmount, premium, transferTokenXAmount);
+    }
+
+    /**
+     * @notice Returns one of the sender's locks that is still locked
+     * @param id Id of the LockedLiquidity
+     */
+    function _lockedLiquidity(uint256 id)
+        internal
+        view
+        returns (LockedLiquidity storage ll)
+    {
+        ll = lockedLiquidity[msg.sender][id];
+        uint256 expiry = lockExpiry[msg.sender][id];
+        if (!ll.locked || isExpirySettled[msg.sender][expiry])
+            revert AlreadyUnlocked(id);
+    }
+
+    /**
+     * @notice Removes released funds of a lock from the total of the
+     * sender's locks of its expiry
+     */
+    function _releaseFromExpiry(
+        uint256 id,
+        uint256 tokenXAmount,
+        uint256 premium
+    ) internal {
+        LockedLiquidity storage total = expiryLockedLiquidity[msg.sender][
+            lockExpiry[msg.sender][id]
+        ];
+        total.amount = total.amount - tokenXAmount;
+        total.premium = total.premium - premium;
+    }
+
     /**
      * @notice Returns provider's share in X
      * @param account Provider's address
@@ -2,6 +2,7 @@ pragma solidity ^0.8.0;
 
 // SPDX-License-Identifier: BUSL-1.1
 
+import "@openzeppelin/contracts/access/Ownable.sol";
 import "./Interfaces/Interfaces.sol";
 
 contract PriceProvider {
@@ -34,6 +35,12 @@ contract FakePriceProvider {
     mapping(uint256 => uint256) public roundIDToExpiry;
     mapping(uint256 => uint256) public roundIDToPrice;
 
+    // Scripted price path replayed one price per advance()
+    uint256[] public scriptedPrices;
+    uint256 public cursor;
+    uint256 public firstScriptedRoundID;
+    uint256 public latestRoundID;
+
     constructor(uint256 _price) {
         price = _price;
     }
@@ -47,6 +54,63 @@ contract FakePriceProvider {
         roundIDToPrice[roundID] = _price;
     }
 
+    function setRoundDataBatch(
+        uint256[] calldata roundIDs,
+        uint256[] calldata expiries,
+        uint256[] calldata prices
+    ) external {
+        require(
+            roundIDs.length == expiries.length &&
+                roundIDs.length == prices.length,
+            "FakePriceProvider: Length mismatch"
+        );
+        for (uint256 i = 0; i < roundIDs.length; i++) {
+            roundIDToExpiry[roundIDs[i]] = expiries[i];
+            roundIDToPrice[roundIDs[i]] = prices[i];
+        }
+    }
+
+    /**
+     * @notice Appends prices to the scripted path, the first one replayed
+     * becomes round `firstRoundID`
+     */
+    function scriptPrices(uint256 firstRoundID, uint256[] calldata prices)
+        external
+    {
+        if (scriptedPrices.length == 0) firstScriptedRoundID = firstRoundID;
+        for (uint256 i = 0; i < prices.length; i++) {
+            scriptedPrices.push(prices[i]);
+        }
+    }
+
+    function clearScript() external {
+        delete scriptedPrices;
+        cursor = 0;
+    }
+
+    /**
+     * @notice Moves to the next `steps` scripted prices, each one is recorded
+     * as a round at the current timestamp and the last one becomes the price
+     */
+    function advance(uint256 steps) external returns (uint256 roundID) {
+        require(
+            cursor + steps <= scriptedPrices.length,
+            "FakePriceProvider: End of the script"
+        );
+        for (uint256 i = 0; i < steps; i++) {
+            price = scriptedPrices[cursor];
+            roundID = firstScriptedRoundID + cursor;
+            roundIDToExpiry[roundID] = block.timestamp;
+            roundIDToPrice[roundID] = price;
+            cursor++;
+        }
+        if (steps > 0) latestRoundID = roundID;
+    }
+
+    function scriptLength() external view returns (uint256) {
+        return scriptedPrices.length;
+    }
+
     function setPrice(uint256 _price) external {
         price = _price;
     }
@@ -56,15 +120,58 @@ contract FakePriceProvider {
         return price;
     }
 
+    // Latest advanced round, or the current price before any advance
+    function latestRoundData() external view returns (uint80 roundId, int256 answer, uint256 startedAt,  uint256 updatedAt, uint80 answeredInRound) {
+        if (latestRoundID == 0) {
+            return (0, int256(price), 0, block.timestamp, 0);
+        }
+        (roundId, answer, startedAt, updatedAt, answeredInRound) = (uint80(latestRoundID), int256(roundIDToPrice[latestRoundID]), 0, roundIDToExpiry[latestRoundID], uint80(latestRoundID));
+    }
+
 }
 
-contract TwapPriceProvider {
+contract FakeSlidingWindowOracle {
+    uint256 public rate;
+
+    constructor(uint256 _rate) {
+        rate = _rate;
+    }
+
+    function setRate(uint256 _rate) external {
+        rate = _rate;
+    }
+
+    function consult(
+        address,
+        uint256 amountIn,
+        address
+    ) external view returns (uint256 amountOut) {
+        amountOut = (amountIn * rate) / 1e8;
+    }
+}
+
+contract TwapPriceProvider is Ownable {
+    // Price and time of the last poke, packed with the staleness window
+    // so that a cached read costs a single storage read
+    struct PriceCache {
+        uint128 price;
+        uint64 updatedAt;
+        uint64 maxAge;
+    }
+
     address public token0;
     address public token1;
     ISlidingWindowOracle public twap;
+    PriceCache public cache;
 
     AggregatorV3Interface public priceProvider;
 
+    event Poke(uint256 price, uint256 timestamp);
+    event UpdateMaxAge(uint256 maxAge);
+
+    /// @notice TwapPriceProvider: Price is too large to be cached
+    error PriceTooLarge(uint256 price);
+
     constructor(
         address _token0,
         address _token1,
@@ -77,11 +184,161 @@ contract TwapPriceProvider {
         twap = _twap;
     }
 
+    /**
+     * @notice Sets how long a poked price is used for, 0 caches it
+     * only within the block of the poke
+     */
+    function setMaxAge(uint64 maxAge) external onlyOwner {
+        cache.maxAge = maxAge;
+        emit UpdateMaxAge(maxAge);
+    }
+
+    /**
+     * @notice Reads the oracles and caches the price, called by keepers
+     * once per block or heartbeat
+     */
+    function poke() external returns (uint256 _price) {
+        _price = _livePrice();
+        if (_price > type(uint128).max) revert PriceTooLarge(_price);
+        PriceCache storage _cache = cache;
+        _cache.price = uint128(_price);
+        _cache.updatedAt = uint64(block.timestamp);
+        emit Poke(_price, block.timestamp);
+    }
+
     // Should return USD price
     function getUsdPrice() external view returns (uint256 _price) {
+        PriceCache memory _cache = cache;
+        if (
+            _cache.updatedAt > 0 &&
+            block.timestamp <= uint256(_cache.updatedAt) + _cache.maxAge
+        ) {
+            return _cache.price;
+        }
+        _price = _livePrice();
+    }
+
+    function _livePrice() internal view returns (uint256 _price) {
         (, int256 latestPrice, , , ) = priceProvider.latestRoundData();
         uint256 bnb_price = uint256(latestPrice);
         uint256 token_price = twap.consult(token0, 1e8, token1);
         _price = (token_price * bnb_price) / 1e8;
     }
 }
+
+/**
+ * @notice Price provider that remembers the last `capacity` rounds of its
+ * source in a ring buffer, so the round at or before any recent timestamp
+ * is found with a binary search instead of walking back through the rounds
+ */
+contract PriceHistory is IPriceHistory {
+    IPriceProvider public immutable source;
+    uint256 public immutable capacity;
+    // Number of rounds ever observed, the i-th one is at i % capacity
+    uint256 public observationCount;
+    mapping(uint256 => Observation) internal observations;
+
+    constructor(IPriceProvider _source, uint256 _capacity) {
+        require(_capacity > 0, "PriceHistory: Zero capacity");
+        source = _source;
+        capacity = _capacity;
+    }
+
+    /**
+     * @notice Records the latest round of the source, called by keepers
+     * after every round
+     */
+    function observe() external returns (bool isRecorded) {
+        (uint80 roundID, int256 answer, , uint256 updatedAt, ) = source
+            .latestRoundData();
+        isRecorded = _record(roundID, updatedAt, uint256(answer));
+    }
+
+    /**
+     * @notice Records past rounds of the source, in increasing order,
+     * rounds that aren't newer than the last observation are skipped
+     */
+    function observeRounds(uint256[] calldata roundIDs)
+        external
+        returns (uint256 recorded)
+    {
+        for (uint256 i = 0; i < roundIDs.length; i++) {
+            (, uint256 price, , uint256 updatedAt, ) = source.getRoundData(
+                roundIDs[i]
+            );
+            if (_record(roundIDs[i], updatedAt, price)) recorded++;
+        }
+    }
+
+    /**
+     * @notice Returns the last observed round at or before the timestamp
+     */
+    function priceAt(uint256 timestamp)
+        external
+        view
+        override
+        returns (Observation memory observation)
+    {
+        uint256 count = observationCount;
+        uint256 low = count > capacity ? count - capacity : 0;
+        if (count == 0 || observations[low % capacity].timestamp > timestamp)
+            revert PriceNotObserved(timestamp);
+
+        // Invariant: the observation at `low` is at or before the timestamp
+        uint256 high = count - 1;
+        while (low < high) {
+            uint256 mid = (low + high + 1) / 2;
+            if (observations[mid % capacity].timestamp <= timestamp) {
+                low = mid;
+            } else {
+                high = mid - 1;
+            }
+        }
+        observation = observations[low % capacity];
+    }
+
+    function latestObservation()
+        external
+        view
+        override
+        returns (Observation memory observation)
+    {
+        if (observationCount > 0)
+            observation = observations[(observationCount - 1) % capacity];
+    }
+
+    function _record(
+        uint256 roundID,
+        uint256 timestamp,
+        uint256 price
+    ) internal returns (bool) {
+        uint256 count = observationCount;
+        if (roundID == 0 || timestamp == 0 || price == 0) return false;
+        if (count > 0) {
+            Observation memory latest = observations[(count - 1) % capacity];
+            if (roundID <= latest.roundID || timestamp < latest.timestamp)
+                return false;
+        }
+        observations[count % capacity] = Observation(
+            uint64(timestamp),
+            uint80(roundID),
+            uint112(price)
+        );
+        observationCount = count + 1;
+        emit Observe(roundID, timestamp, price);
+        return true;
+    }
+
+    // Should return USD price
+    function getUsdPrice() external view returns (uint256) {
+        return source.getUsdPrice();
+    }
+
+    function getRoundData(uint256 roundID) external view returns (uint80 roundId,uint256 price, uint256 startedAt, uint256 updatedAt,uint80 answeredInRound) {
+        (roundId, price, startedAt, updatedAt, answeredInRound) = source.getRoundData(roundID);
+    }
+
+    function latestRoundData() external view returns (uint80 roundId, int256 answer, uint256 startedAt,  uint256 updatedAt, uint80 answeredInRound) {
+        (roundId, answer, startedAt, updatedAt, answeredInRound) = source.latestRoundData();
+    }
+}
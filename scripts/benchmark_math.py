@@ -0,0 +1,168 @@
+"""
+Gas benchmark of the math library primitives
+
+Measures the gas of ABDKMath64x64.exp, exp_2, ln, log_2, sqrt and divu and of
+OptionMath._N, _lookupN, blackScholesPrice and the fused kernel over
+representative input ranges, through OptionMathHarness on a local chain. The
+gas is measured inside the EVM, around the call to the library, so it
+doesn't include the transaction or the harness' own call.
+
+    brownie run benchmark_math
+    brownie run benchmark_math main reports/math_gas.json reports/baseline.json
+
+The report is JSON, keyed by primitive and then by input range, with the
+samples, min, mean and max gas of each. Given a baseline report the change
+of the mean gas of every range is printed.
+"""
+import json
+import random
+from pathlib import Path
+
+from brownie import ABDKMath64x64, OptionMath, OptionMathHarness, accounts
+
+REPORT_PATH = Path("reports/math_gas.json")
+SAMPLES = 20
+SEED = 0
+ONE_DAY = 86400
+
+
+def _64x64(value):
+    return int(value * 2**64)
+
+
+def _with_fraction_bits(rng, integer, bits):
+    # 64.64 number whose fractional part has `bits` bits set, exp_2 does one
+    # multiplication per set bit
+    fraction = sum(1 << b for b in rng.sample(range(64), bits))
+    return (integer << 64) + fraction
+
+
+def input_ranges(rng, samples=SAMPLES):
+    """
+    Returns the inputs of every primitive, by range label
+    """
+
+    def log_uniform(low, high):
+        return [10 ** rng.uniform(low, high) for _ in range(samples)]
+
+    def uniform(low, high):
+        return [rng.uniform(low, high) for _ in range(samples)]
+
+    exp_2_ranges = {
+        f"fraction with {bits} bits set": [
+            (_with_fraction_bits(rng, rng.randint(-30, 30), bits),)
+            for _ in range(samples)
+        ]
+        for bits in [0, 8, 16, 32, 48, 64]
+    }
+    quotes = [
+        (
+            rng.randint(int(50e2), int(200e2)),
+            rng.randint(int(380e8), int(420e8)),
+            int(400e8),
+            rng.randint(ONE_DAY, 30 * ONE_DAY),
+            rng.random() < 0.5,
+        )
+        for _ in range(samples)
+    ]
+    return {
+        "exp": {
+            "[-40, -1]": [(_64x64(x),) for x in uniform(-40, -1)],
+            "[-1, 1]": [(_64x64(x),) for x in uniform(-1, 1)],
+            "[1, 40]": [(_64x64(x),) for x in uniform(1, 40)],
+        },
+        "exp_2": exp_2_ranges,
+        "ln": {
+            "[1e-6, 1]": [(_64x64(x),) for x in log_uniform(-6, 0)],
+            "[1, 1e6]": [(_64x64(x),) for x in log_uniform(0, 6)],
+        },
+        "log_2": {
+            "[1e-6, 1]": [(_64x64(x),) for x in log_uniform(-6, 0)],
+            "[1, 1e6]": [(_64x64(x),) for x in log_uniform(0, 6)],
+        },
+        "sqrt": {
+            "[1e-6, 1]": [(_64x64(x),) for x in log_uniform(-6, 0)],
+            "[1, 1e12]": [(_64x64(x),) for x in log_uniform(0, 12)],
+        },
+        "divu": {
+            "x < 2^192": [
+                (int(y * x), int(y))
+                for (x, y) in zip(log_uniform(-6, 12), log_uniform(0, 18))
+            ],
+            "x >= 2^192": [
+                (int(y * x), int(y))
+                for (x, y) in zip(log_uniform(8, 12), log_uniform(50, 60))
+            ],
+        },
+        "N": {
+            "[-8, 8]": [(_64x64(x),) for x in uniform(-8, 8)],
+            "beyond 8": [(_64x64(x),) for x in uniform(8, 12)],
+        },
+        "lookupN": {
+            "[-8, 8]": [(_64x64(x),) for x in uniform(-8, 8)],
+            "beyond 8": [(_64x64(x),) for x in uniform(8, 12)],
+        },
+        "blackScholesPrice": {"quotes": quotes},
+        "fusedBlackScholesPrice": {
+            "quotes": [quote + (False,) for quote in quotes],
+            "quotes with lookup table": [quote + (True,) for quote in quotes],
+        },
+    }
+
+
+def measure(harness, ranges):
+    """
+    Returns the gas statistics of every primitive and range
+    """
+    report = {}
+    for (primitive, primitive_ranges) in ranges.items():
+        function = getattr(harness, primitive)
+        report[primitive] = {}
+        for (label, inputs) in primitive_ranges.items():
+            gas = [function(*args)[1] for args in inputs]
+            report[primitive][label] = {
+                "samples": len(gas),
+                "min": min(gas),
+                "mean": sum(gas) / len(gas),
+                "max": max(gas),
+            }
+    return report
+
+
+def compare(report, baseline):
+    """
+    Returns the relative change of the mean gas of every range in both reports
+    """
+    changes = {}
+    for (primitive, ranges) in report.items():
+        for (label, stats) in ranges.items():
+            base = baseline.get(primitive, {}).get(label)
+            if base:
+                changes[f"{primitive} {label}"] = stats["mean"] / base["mean"] - 1
+    return changes
+
+
+def main(report_path=REPORT_PATH, baseline_path=None):
+    deployer = accounts[0]
+    if not len(ABDKMath64x64):
+        ABDKMath64x64.deploy({"from": deployer})
+    if not len(OptionMath):
+        OptionMath.deploy({"from": deployer})
+    harness = OptionMathHarness.deploy({"from": deployer})
+
+    report = measure(harness, input_ranges(random.Random(SEED)))
+    report_path = Path(report_path)
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    report_path.write_text(json.dumps(report, indent=2) + "\n")
+
+    for (primitive, ranges) in report.items():
+        for (label, stats) in ranges.items():
+            print(
+                f"{primitive:<24}{label:<28}"
+                f"{stats['min']:>8}{stats['mean']:>10.0f}{stats['max']:>8}"
+            )
+    if baseline_path:
+        baseline = json.loads(Path(baseline_path).read_text())
+        for (name, change) in compare(report, baseline).items():
+            print(f"{name:<52}{change:>+8.1%}")
+    return report
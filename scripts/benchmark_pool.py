@@ -0,0 +1,197 @@
+"""
+Gas scaling benchmark of BufferIBFRPoolV2's withdraw queue and locked liquidity
+
+For every size the pool is filled on a local chain, the state is reverted
+in between sizes:
+
+- the withdraw queue with `size` LPs that each provide and request a
+  withdrawal, then the round is rolled over and the queue processed
+- the issuer's lockedLiquidity array with `size` locks
+
+It records the gas of provide, withdraw, processWithdrawRequests, lock,
+changeLock, unlock and send at each size. It also records the largest
+requestsToProcess whose gas estimate fits a block. When the block gas limit
+is above the local node's own, that number is extrapolated from the gas of
+the largest chunk that fits the node.
+
+    brownie run benchmark_pool
+    brownie run benchmark_pool main reports/pool_gas.json 10,100 30000000
+
+The report is written as JSON and as a CSV of (size, operation, gas) rows
+next to it.
+"""
+import csv
+import json
+from pathlib import Path
+
+from brownie import IBFR, BufferIBFRPoolV2, accounts, chain, web3
+from brownie.exceptions import VirtualMachineError
+
+REPORT_PATH = Path("reports/pool_gas.json")
+SIZES = [10, 100, 1000, 10000]
+BLOCK_GAS_LIMIT = 30_000_000
+LP_AMOUNT = int(1e15)
+ONE_DAY = 86400
+
+
+def _estimate(pool, requests_to_process, sender):
+    try:
+        return pool.processWithdrawRequests.estimate_gas(
+            requests_to_process, {"from": sender}
+        )
+    except (ValueError, VirtualMachineError):
+        return None
+
+
+def _largest_fitting(pool, queue_length, sender, gas_limit):
+    # Binary search of the largest chunk whose estimate fits the gas limit
+    (low, high) = (0, queue_length)
+    while low < high:
+        mid = (low + high + 1) // 2
+        gas = _estimate(pool, mid, sender)
+        if gas is not None and gas <= gas_limit:
+            low = mid
+        else:
+            high = mid - 1
+    return low
+
+
+def max_requests_to_process(pool, queue_length, sender, block_gas_limit):
+    """
+    Returns the largest requestsToProcess that fits in a block, whether the
+    whole queue fits and whether it was extrapolated
+    """
+    node_gas_limit = web3.eth.get_block("latest")["gasLimit"]
+    fitting = _largest_fitting(
+        pool, queue_length, sender, min(block_gas_limit, node_gas_limit)
+    )
+    if fitting == queue_length:
+        return (fitting, True, False)
+    if block_gas_limit <= node_gas_limit or fitting < 2:
+        return (fitting, False, False)
+
+    # Every request costs the same, extrapolate from the first and the rest
+    first = _estimate(pool, 1, sender)
+    per_request = (_estimate(pool, fitting, sender) - first) / (fitting - 1)
+    return (1 + int((block_gas_limit - first) // per_request), False, True)
+
+
+def fill_queue(pool, token, owner, size):
+    """
+    Adds `size` new LPs to the pool that each request a withdrawal, returns
+    the transactions of the last LP
+    """
+    token.approve(pool, LP_AMOUNT, {"from": owner})
+    pool.provide(LP_AMOUNT, 0, {"from": owner})
+    for _ in range(size):
+        lp = accounts.add()
+        owner.transfer(lp, "0.002 ether")
+        token.transfer(lp, LP_AMOUNT, {"from": owner})
+        token.approve(pool, LP_AMOUNT, {"from": lp})
+        provide = pool.provide(LP_AMOUNT, 0, {"from": lp})
+        withdraw = pool.withdraw(LP_AMOUNT // 2, {"from": lp})
+    return (provide, withdraw)
+
+
+def measure_queue(pool, token, owner, size, block_gas_limit):
+    """
+    Returns the gas of the queue operations with `size` queued requests
+    """
+    (provide, withdraw) = fill_queue(pool, token, owner, size)
+    assert pool.queueEnd() - pool.queueStart() == size, "Requests weren't queued"
+
+    chain.sleep(max(pool.fixedExpiry() - chain.time(), 0) + 1)
+    pool.rollOver(chain.time() + 7 * ONE_DAY, {"from": owner})
+    (max_requests, fits_queue, extrapolated) = max_requests_to_process(
+        pool, size, owner, block_gas_limit
+    )
+
+    first = pool.processWithdrawRequests(1, {"from": owner})
+    gas = {
+        "provide": provide.gas_used,
+        "withdraw": withdraw.gas_used,
+        "processWithdrawRequests(1)": first.gas_used,
+    }
+    chunk = min(size - 1, _largest_fitting(pool, size - 1, owner, block_gas_limit))
+    if chunk > 0:
+        rest = pool.processWithdrawRequests(chunk, {"from": owner})
+        gas[f"processWithdrawRequests({chunk})"] = rest.gas_used
+        gas["processWithdrawRequests per request"] = rest.gas_used / chunk
+    return {
+        "gas": gas,
+        "max_requests_to_process": max_requests,
+        "whole_queue_fits": fits_queue,
+        "extrapolated": extrapolated,
+    }
+
+
+def measure_locks(pool, token, owner, issuer, size):
+    """
+    Returns the gas of the lock operations once the issuer, without locks of
+    its own, has `size` locks
+    """
+    pool.grantRole(pool.OPTION_ISSUER_ROLE(), issuer, {"from": owner})
+    token.approve(pool, LP_AMOUNT, {"from": owner})
+    pool.provide(LP_AMOUNT, 0, {"from": owner})
+    token.transfer(issuer, size + 1, {"from": owner})
+    token.approve(pool, size + 1, {"from": issuer})
+
+    for lock_id in range(size):
+        lock = pool.lock(lock_id, 1, 1, {"from": issuer})
+    gas = {
+        "lock": lock.gas_used,
+        "changeLock": pool.changeLock(size - 1, 2, 1, {"from": issuer}).gas_used,
+        "unlock": pool.unlock(size - 1, {"from": issuer}).gas_used,
+    }
+    pool.lock(size, 1, 1, {"from": issuer})
+    gas["send"] = pool.send(size, issuer, 1, {"from": issuer}).gas_used
+    return {"gas": gas}
+
+
+def measure(pool, token, owner, issuer, sizes=SIZES, block_gas_limit=BLOCK_GAS_LIMIT):
+    """
+    Returns the gas of the queue and lock operations at every size
+    """
+    report = {"block_gas_limit": block_gas_limit, "sizes": {}}
+    chain.snapshot()
+    for size in sizes:
+        queue = measure_queue(pool, token, owner, size, block_gas_limit)
+        chain.revert()
+        locks = measure_locks(pool, token, owner, issuer, size)
+        chain.revert()
+        queue["gas"].update(locks["gas"])
+        report["sizes"][str(size)] = queue
+        print(
+            f"{size:>6} queued requests, at most "
+            f"{queue['max_requests_to_process']} processed per block"
+        )
+    return report
+
+
+def write_report(report, path=REPORT_PATH):
+    """
+    Writes the report as JSON and its gas as (size, operation, gas) CSV rows
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2) + "\n")
+    with open(path.with_suffix(".csv"), "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["size", "operation", "gas"])
+        for (size, results) in report["sizes"].items():
+            for (operation, gas) in results["gas"].items():
+                writer.writerow([size, operation, round(gas)])
+
+
+def main(report_path=REPORT_PATH, sizes=None, block_gas_limit=BLOCK_GAS_LIMIT):
+    owner = accounts[0]
+    token = IBFR.deploy({"from": owner})
+    pool = BufferIBFRPoolV2.deploy(token, chain.time() + 7 * ONE_DAY, {"from": owner})
+    sizes = [int(size) for size in sizes.split(",")] if sizes else SIZES
+
+    report = measure(pool, token, owner, accounts[9], sizes, int(block_gas_limit))
+    write_report(report, report_path)
+    for (size, results) in report["sizes"].items():
+        for (operation, gas) in results["gas"].items():
+            print(f"{size:>6}  {operation:<40}{gas:>12.0f}")
+    return report
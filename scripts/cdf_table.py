@@ -0,0 +1,60 @@
+"""
+Generates OptionMath.CDF_TABLE, the lookup table of Choudhury's approximation
+used by OptionMath._lookupTail
+
+Entry j holds the tail N(-x) at x = (j - 1) / 16 as an unsigned 64-bit
+fraction of 2^64, big endian, for x from -1/16 to 8 + 1/8. The entry at
+-1/16 continues the tail's formula past 0 instead of using N(1/16), so the
+interpolation stays smooth at 0 where the approximation jumps.
+
+    brownie run cdf_table
+    python scripts/cdf_table.py
+"""
+import math
+
+# Kept in sync with OptionMath
+CDF_CONST_0 = 0x09109F285DF452394 / 2**64
+CDF_CONST_1 = 0x19ABAC0EA1DA65036 / 2**64
+CDF_CONST_2 = 0x0D3C84B78B749BD6B / 2**64
+
+STEPS_PER_UNIT = 16
+SEGMENTS = 8 * STEPS_PER_UNIT
+ENTRY_BYTES = 8
+BYTES_PER_LINE = 32
+
+
+def tail(x):
+    """
+    Choudhury's approximation of N(-x), for x >= -1/16
+    """
+    return math.exp(-x * x / 2) / (
+        CDF_CONST_0 + CDF_CONST_1 * x + CDF_CONST_2 * math.sqrt(x * x + 3)
+    )
+
+
+def cdf_table():
+    """
+    Returns the entries of the table as 64.64 fixed point numbers
+    """
+    return [
+        round(tail((j - 1) / STEPS_PER_UNIT) * 2**64) for j in range(SEGMENTS + 3)
+    ]
+
+
+def solidity_constant(entries=None):
+    entries = cdf_table() if entries is None else entries
+    data = b"".join(entry.to_bytes(ENTRY_BYTES, "big") for entry in entries)
+    lines = [
+        data[i : i + BYTES_PER_LINE].hex() for i in range(0, len(data), BYTES_PER_LINE)
+    ]
+    return "    bytes internal constant CDF_TABLE =\n{};".format(
+        "\n".join(f'        hex"{line}"' for line in lines)
+    )
+
+
+def main():
+    print(solidity_constant())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Decodes the custom errors the contracts revert with and keeps
+error_messages.json in sync with them.
+
+The errors are read from the compiled artifacts in build/contracts, their
+selectors from the `error` entries of each ABI and their readable messages
+from the NatSpec the compiler emits for them. Every error is declared with a
+`/// @notice` line holding its message:
+
+    /// @notice Option has not expired yet
+    error OptionNotExpired(uint256 expiration);
+
+Regenerate error_messages.json after adding or changing an error with
+
+    brownie compile
+    brownie run error_decoder
+    python scripts/error_decoder.py [--check]
+"""
+import json
+import sys
+from pathlib import Path
+
+from eth_utils import keccak
+
+try:
+    from eth_abi import decode
+except ImportError:  # eth-abi < 4
+    from eth_abi import decode_abi as decode
+
+ROOT = Path(__file__).resolve().parent.parent
+BUILD_DIR = ROOT / "build" / "contracts"
+ERROR_MESSAGES_PATH = ROOT / "error_messages.json"
+
+ERROR_STRING_SELECTOR = "0x08c379a0"
+PANIC_SELECTOR = "0x4e487b71"
+
+
+def _natspec_errors(artifact):
+    """
+    Returns the NatSpec of the artifact's errors keyed by their signature.
+    Brownie merges the compiler's userdoc and devdoc into `natspec`, raw solc
+    output keeps them apart.
+    """
+    docs = {}
+    for key in ("natspec", "devdoc", "userdoc"):
+        for (signature, entries) in artifact.get(key, {}).get("errors", {}).items():
+            for entry in entries:
+                docs.setdefault(signature, {}).update(entry)
+    return docs
+
+
+def _message(doc):
+    return (doc.get("notice") or doc.get("details") or "").strip()
+
+
+def parse_errors(build_dir=BUILD_DIR):
+    """
+    Returns every custom error in the compiled artifacts, keyed by its selector.
+    Each error has its name, inputs, signature and message.
+    """
+    build_dir = Path(build_dir)
+    if not build_dir.exists():
+        raise FileNotFoundError(f"{build_dir} doesn't exist, run `brownie compile`")
+    errors = {}
+    for path in sorted(build_dir.rglob("*.json")):
+        artifact = json.loads(path.read_text())
+        docs = _natspec_errors(artifact)
+        for item in artifact.get("abi", []):
+            if item["type"] != "error":
+                continue
+            inputs = [{"name": i["name"], "type": i["type"]} for i in item["inputs"]]
+            signature = "{}({})".format(
+                item["name"], ",".join(i["type"] for i in inputs)
+            )
+            selector = "0x" + keccak(text=signature)[:4].hex()
+            message = _message(docs.get(signature, {}))
+            if selector in errors:
+                # Inherited and interface errors show up in several artifacts
+                if errors[selector]["signature"] != signature:
+                    raise ValueError(
+                        f"{signature} and {errors[selector]['signature']} "
+                        "share a selector"
+                    )
+                if message and not errors[selector]["message"]:
+                    errors[selector]["message"] = message
+                continue
+            errors[selector] = {
+                "name": item["name"],
+                "inputs": inputs,
+                "signature": signature,
+                "message": message,
+            }
+    return errors
+
+
+def error_messages(errors=None):
+    """
+    Returns the readable message of every error, keyed by the error's name
+    """
+    errors = parse_errors() if errors is None else errors
+    return {error["name"]: error["message"] for error in errors.values()}
+
+
+def sync_error_messages(path=ERROR_MESSAGES_PATH, check=False):
+    """
+    Writes the messages of the compiled errors to error_messages.json.
+    Returns True if the file was out of date, with `check` it isn't written.
+    """
+    path = Path(path)
+    messages = error_messages()
+    current = json.loads(path.read_text()) if path.exists() else None
+    if current == messages:
+        return False
+    if not check:
+        path.write_text(json.dumps(messages, indent=2) + "\n")
+    return True
+
+
+def decode_revert(data, errors=None):
+    """
+    Decodes the revert data of a failed call or transaction
+
+    Returns a tuple of the error's name, its arguments and its message.
+    Revert strings are returned as "Error" and compiler panics as "Panic".
+    """
+    errors = parse_errors() if errors is None else errors
+    if isinstance(data, (bytes, bytearray)):
+        data = "0x" + bytes(data).hex()
+    data = data.lower()
+    selector = data[:10]
+    payload = bytes.fromhex(data[10:])
+
+    if selector == ERROR_STRING_SELECTOR:
+        (reason,) = decode(["string"], payload)
+        return ("Error", {"reason": reason}, reason)
+    if selector == PANIC_SELECTOR:
+        (code,) = decode(["uint256"], payload)
+        return ("Panic", {"code": code}, f"Panic({hex(code)})")
+    if selector not in errors:
+        return ("Unknown", {"data": data}, f"Unknown error {selector}")
+
+    error = errors[selector]
+    values = decode([i["type"] for i in error["inputs"]], payload)
+    args = {i["name"]: value for (i, value) in zip(error["inputs"], values)}
+    return (error["name"], args, error["message"])
+
+
+def format_revert(data, errors=None):
+    """
+    Returns a readable description of the revert data, e.g.
+    "OptionNotExpired(expiration=1650000000): Option has not expired yet"
+    """
+    (name, args, message) = decode_revert(data, errors)
+    params = ", ".join(f"{key}={value}" for (key, value) in args.items())
+    return f"{name}({params}): {message}"
+
+
+def main():
+    check = "--check" in sys.argv
+    if not sync_error_messages(check=check):
+        print(f"{ERROR_MESSAGES_PATH.name} is up to date")
+    elif check:
+        sys.exit(f"{ERROR_MESSAGES_PATH.name} is out of date")
+    else:
+        print(f"Updated {ERROR_MESSAGES_PATH.name}")
+
+
+if __name__ == "__main__":
+    main()
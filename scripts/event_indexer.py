@@ -0,0 +1,647 @@
+"""
+Incremental indexer of the pool's and the options' events into SQLite
+
+Streams Create, Exercise, ExerciseUnits, Expire, Split, Merge, TransferUnits,
+SettleSeries, Provide, Withdraw, InitiateWithdraw, ProcessWithdrawRequest,
+Profit, Loss and Settle from the pool and both options contracts into a local
+database, decoded with the contracts' ABIs. Besides the events it keeps the
+option book, the settled European series, the LP positions and the pool's
+profit and loss up to date, indexed for lookups:
+
+    indexer = EventIndexer("reports/events.db", web3, sources(pool, options))
+    indexer.sync()
+    indexer.option_book(owner=account)
+    indexer.lp_position(account)
+
+Claims of a settled European round close their options with Exercise or
+Expire, a round settled at once counts in the pool's profit or loss with
+its total premium less its payout.
+
+Logs are fetched in block ranges that grow while they return few logs and
+shrink when they return too many or the node rejects them. Every range is committed in a single
+transaction along with the checkpoint, so an interrupted sync resumes from
+the last committed block. The hashes of the recent indexed blocks are kept:
+when one of them changed, the events of the abandoned blocks are deleted and
+the changes they made to the book are undone from an undo log.
+
+    brownie run event_indexer
+    brownie run event_indexer main reports/events.db 0 true
+
+indexes the latest deployments, once or, with the last argument, following
+the chain. The book only follows the units of the options, whole options
+moved with ERC721 transfers keep the owner their units were last sent to.
+"""
+import json
+import sqlite3
+import time
+from pathlib import Path
+
+from eth_utils import keccak, to_checksum_address
+from web3.exceptions import BlockNotFound
+
+try:
+    from web3.exceptions import Web3RPCError
+except ImportError:  # web3 < 7 raises ValueError
+    Web3RPCError = ValueError
+
+try:
+    from eth_abi import decode
+except ImportError:  # eth-abi < 4
+    from eth_abi import decode_abi as decode
+
+DB_PATH = Path("reports/events.db")
+EVENTS = [
+    "Create",
+    "Exercise",
+    "ExerciseUnits",
+    "Expire",
+    "Split",
+    "Merge",
+    "TransferUnits",
+    "Provide",
+    "Withdraw",
+    "InitiateWithdraw",
+    "ProcessWithdrawRequest",
+    "Profit",
+    "Loss",
+    "Settle",
+    "SettleSeries",
+]
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+MIN_RANGE = 1
+MAX_RANGE = 100_000
+INITIAL_RANGE = 2_000
+# Fewer logs than that in a range let the next one grow
+TARGET_LOGS = 5_000
+# Blocks that can still be reorganized, their hashes and undo log are kept
+REORG_DEPTH = 128
+POLL_INTERVAL = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoint (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    block_number INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS blocks (
+    block_number INTEGER PRIMARY KEY,
+    block_hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS events (
+    block_number INTEGER NOT NULL,
+    log_index INTEGER NOT NULL,
+    transaction_hash TEXT NOT NULL,
+    contract TEXT NOT NULL,
+    event TEXT NOT NULL,
+    args TEXT NOT NULL,
+    PRIMARY KEY (block_number, log_index)
+);
+CREATE INDEX IF NOT EXISTS events_by_name ON events (event, block_number);
+CREATE TABLE IF NOT EXISTS options (
+    contract TEXT NOT NULL,
+    option_id INTEGER NOT NULL,
+    owner TEXT,
+    units INTEGER NOT NULL,
+    state TEXT NOT NULL,
+    total_fee TEXT,
+    profit TEXT,
+    created_block INTEGER,
+    PRIMARY KEY (contract, option_id)
+);
+CREATE INDEX IF NOT EXISTS options_by_owner ON options (owner, state);
+CREATE INDEX IF NOT EXISTS options_by_state ON options (state, contract);
+CREATE TABLE IF NOT EXISTS series (
+    contract TEXT NOT NULL,
+    series_id TEXT NOT NULL,
+    expiry_price TEXT NOT NULL,
+    payout TEXT NOT NULL,
+    settled_block INTEGER NOT NULL,
+    PRIMARY KEY (contract, series_id)
+);
+CREATE TABLE IF NOT EXISTS lp_positions (
+    account TEXT PRIMARY KEY,
+    provided TEXT NOT NULL,
+    withdrawn TEXT NOT NULL,
+    lp_tokens TEXT NOT NULL,
+    pending_withdrawal TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pool_totals (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS undo (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    block_number INTEGER NOT NULL,
+    table_name TEXT NOT NULL,
+    key TEXT NOT NULL,
+    row TEXT
+);
+CREATE INDEX IF NOT EXISTS undo_by_block ON undo (block_number);
+"""
+
+# Columns of the book's tables, the keys first, and how many are keys
+TABLES = {
+    "options": (
+        [
+            "contract",
+            "option_id",
+            "owner",
+            "units",
+            "state",
+            "total_fee",
+            "profit",
+            "created_block",
+        ],
+        2,
+    ),
+    "series": (
+        ["contract", "series_id", "expiry_price", "payout", "settled_block"],
+        2,
+    ),
+    "lp_positions": (
+        ["account", "provided", "withdrawn", "lp_tokens", "pending_withdrawal"],
+        1,
+    ),
+    "pool_totals": (["name", "value"], 1),
+}
+
+
+def sources(pool, options, european_options=None):
+    """
+    Returns the indexed contracts, as (address, abi) pairs, from deployed
+    brownie contracts
+    """
+    contracts = [pool, options] + ([european_options] if european_options else [])
+    return [(contract.address, contract.abi) for contract in contracts]
+
+
+def event_abis(abi):
+    """
+    Returns the ABI of every indexed event of a contract, keyed by its topic
+    """
+    abis = {}
+    for item in abi:
+        if item["type"] == "event" and item["name"] in EVENTS:
+            signature = "{}({})".format(
+                item["name"], ",".join(i["type"] for i in item["inputs"])
+            )
+            abis["0x" + keccak(text=signature).hex()] = item
+    return abis
+
+
+def _to_bytes(value):
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value)
+    return bytes.fromhex(value[2:] if value.startswith("0x") else value)
+
+
+def _to_hex(value):
+    return "0x" + _to_bytes(value).hex()
+
+
+def _normalize(type_, value):
+    if type_ == "address":
+        return to_checksum_address(value)
+    if isinstance(value, bytes):
+        return "0x" + value.hex()
+    return value
+
+
+def decode_log(log, abis):
+    """
+    Returns the name and the arguments of a log, None if it isn't indexed
+    """
+    topics = [_to_hex(topic) for topic in log["topics"]]
+    abi = abis.get(topics[0]) if topics else None
+    if abi is None:
+        return None
+    indexed = [i for i in abi["inputs"] if i["indexed"]]
+    data = [i for i in abi["inputs"] if not i["indexed"]]
+    values = {}
+    for (item, topic) in zip(indexed, topics[1:]):
+        values[item["name"]] = decode([item["type"]], _to_bytes(topic))[0]
+    for (item, value) in zip(
+        data, decode([i["type"] for i in data], _to_bytes(log["data"]))
+    ):
+        values[item["name"]] = value
+    args = {i["name"]: _normalize(i["type"], values[i["name"]]) for i in abi["inputs"]}
+    return (abi["name"], args)
+
+
+class EventIndexer:
+    """
+    Indexes the events of the given (address, abi) contracts into a SQLite
+    database and answers queries on the book
+    """
+
+    def __init__(self, db_path, web3, contracts, start_block=0, confirmations=0):
+        self.web3 = web3
+        self.confirmations = confirmations
+        self.start_block = start_block
+        self.abis = {
+            to_checksum_address(address): event_abis(abi)
+            for (address, abi) in contracts
+        }
+        self.block_range = INITIAL_RANGE
+        # Largest range not known to be rejected by the node
+        self.range_limit = MAX_RANGE
+        if str(db_path) != ":memory:":
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(db_path))
+        self.db.row_factory = sqlite3.Row
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    @property
+    def checkpoint(self):
+        """
+        Last indexed block, start_block - 1 before the first sync
+        """
+        row = self.db.execute("SELECT block_number FROM checkpoint").fetchone()
+        return row[0] if row else self.start_block - 1
+
+    def sync(self, to_block=None):
+        """
+        Indexes the blocks after the checkpoint up to `to_block`, the
+        confirmed head by default, and returns the number of new events
+        """
+        head = self.web3.eth.block_number - self.confirmations
+        to_block = head if to_block is None else min(to_block, head)
+        self.handle_reorg()
+        count = 0
+        while self.checkpoint < to_block:
+            from_block = self.checkpoint + 1
+            end = min(to_block, from_block + self.block_range - 1)
+            try:
+                logs = self._get_logs(from_block, end)
+            except (ValueError, Web3RPCError):
+                # Too many logs or too wide a range for the node
+                if self.block_range == MIN_RANGE:
+                    raise
+                self.block_range = max(MIN_RANGE, self.block_range // 2)
+                self.range_limit = self.block_range
+                continue
+            if len(logs) < TARGET_LOGS:
+                self.block_range = min(self.range_limit, self.block_range * 2)
+            elif len(logs) > TARGET_LOGS:
+                self.block_range = max(MIN_RANGE, self.block_range // 2)
+            end_hash = _to_hex(self.web3.eth.get_block(end)["hash"])
+            count += self._commit(logs, end, end_hash)
+        return count
+
+    def follow(self, poll_interval=POLL_INTERVAL):
+        """
+        Keeps the database in sync with the chain until interrupted
+        """
+        while True:
+            count = self.sync()
+            if count:
+                print(f"{count} events indexed up to block {self.checkpoint}")
+            time.sleep(poll_interval)
+
+    def _get_logs(self, from_block, to_block):
+        topics = [topic for abis in self.abis.values() for topic in abis]
+        logs = self.web3.eth.get_logs(
+            {
+                "fromBlock": from_block,
+                "toBlock": to_block,
+                "address": list(self.abis),
+                "topics": [sorted(set(topics))],
+            }
+        )
+        return sorted(logs, key=lambda log: (log["blockNumber"], log["logIndex"]))
+
+    def _commit(self, logs, block_number, block_hash):
+        # Events, book, block hashes and checkpoint move together
+        count = 0
+        with self.db:
+            minted = set()
+            transaction = None
+            for log in logs:
+                address = to_checksum_address(log["address"])
+                decoded = decode_log(log, self.abis.get(address, {}))
+                if decoded is None:
+                    continue
+                if log["transactionHash"] != transaction:
+                    (transaction, minted) = (log["transactionHash"], set())
+                (name, args) = decoded
+                self.db.execute(
+                    "INSERT OR REPLACE INTO events VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        log["blockNumber"],
+                        log["logIndex"],
+                        _to_hex(log["transactionHash"]),
+                        address,
+                        name,
+                        json.dumps(args, default=str),
+                    ),
+                )
+                self._apply(log["blockNumber"], address, name, args, minted)
+                self._save_block(log["blockNumber"], _to_hex(log["blockHash"]))
+                count += 1
+            self._save_block(block_number, block_hash)
+            self.db.execute(
+                "INSERT OR REPLACE INTO checkpoint VALUES (0, ?)", (block_number,)
+            )
+            self.db.execute(
+                "DELETE FROM blocks WHERE block_number < ?",
+                (block_number - REORG_DEPTH,),
+            )
+            self.db.execute(
+                "DELETE FROM undo WHERE block_number < ?",
+                (block_number - REORG_DEPTH,),
+            )
+        return count
+
+    def _save_block(self, block_number, block_hash):
+        self.db.execute(
+            "INSERT OR REPLACE INTO blocks VALUES (?, ?)", (block_number, block_hash)
+        )
+
+    def handle_reorg(self):
+        """
+        Rolls the database back to the last indexed block still on the chain,
+        returns the block it was rolled back to or None without a reorg
+        """
+        rows = self.db.execute(
+            "SELECT block_number, block_hash FROM blocks ORDER BY block_number DESC"
+        ).fetchall()
+        for (i, (block_number, block_hash)) in enumerate(rows):
+            try:
+                block = self.web3.eth.get_block(block_number)
+            except BlockNotFound:
+                # The new chain is shorter
+                continue
+            if _to_hex(block["hash"]) == block_hash:
+                if i == 0:
+                    return None
+                self.rollback(block_number)
+                return block_number
+        if rows:
+            raise RuntimeError(
+                f"Reorg deeper than the {REORG_DEPTH} blocks kept, reindex"
+            )
+        return None
+
+    def rollback(self, block_number):
+        """
+        Deletes the events after the block and undoes their changes
+        """
+        with self.db:
+            undo = self.db.execute(
+                "SELECT table_name, key, row FROM undo WHERE block_number > ? "
+                "ORDER BY seq DESC",
+                (block_number,),
+            ).fetchall()
+            for (table, key, row) in undo:
+                self._delete(table, json.loads(key))
+                if row is not None:
+                    self._insert(table, json.loads(row))
+            for table in ["undo", "events", "blocks"]:
+                self.db.execute(
+                    f"DELETE FROM {table} WHERE block_number > ?", (block_number,)
+                )
+            self.db.execute(
+                "INSERT OR REPLACE INTO checkpoint VALUES (0, ?)", (block_number,)
+            )
+
+    def _get(self, table, key):
+        (columns, keys) = TABLES[table]
+        where = " AND ".join(f"{c} = ?" for c in columns[:keys])
+        row = self.db.execute(f"SELECT * FROM {table} WHERE {where}", key).fetchone()
+        return list(row) if row else None
+
+    def _delete(self, table, key):
+        (columns, keys) = TABLES[table]
+        where = " AND ".join(f"{c} = ?" for c in columns[:keys])
+        self.db.execute(f"DELETE FROM {table} WHERE {where}", key)
+
+    def _insert(self, table, row):
+        placeholders = ", ".join("?" * len(row))
+        self.db.execute(f"INSERT OR REPLACE INTO {table} VALUES ({placeholders})", row)
+
+    def _put(self, block_number, table, row):
+        # Every change of the book is logged so that a reorg can undo it
+        key = row[: TABLES[table][1]]
+        old = self._get(table, key)
+        self.db.execute(
+            "INSERT INTO undo (block_number, table_name, key, row) VALUES (?, ?, ?, ?)",
+            (
+                block_number,
+                table,
+                json.dumps(key),
+                json.dumps(old) if old is not None else None,
+            ),
+        )
+        self._insert(table, row)
+
+    def _update_option(self, block_number, contract, option_id, **changes):
+        row = self._get("options", [contract, option_id]) or [
+            contract,
+            option_id,
+            None,
+            0,
+            "active",
+            None,
+            None,
+            block_number,
+        ]
+        columns = TABLES["options"][0]
+        units = changes.pop("units_delta", 0)
+        for (column, value) in changes.items():
+            row[columns.index(column)] = value
+        row[3] += units
+        if row[3] == 0 and row[4] == "active" and units < 0:
+            row[4] = "burnt"
+        self._put(block_number, "options", row)
+
+    def _update_lp(self, block_number, account, **deltas):
+        row = self._get("lp_positions", [account]) or [account, "0", "0", "0", "0"]
+        columns = TABLES["lp_positions"][0]
+        for (column, delta) in deltas.items():
+            i = columns.index(column)
+            row[i] = str(int(row[i]) + delta)
+        self._put(block_number, "lp_positions", row)
+
+    def _add_total(self, block_number, name, amount):
+        row = self._get("pool_totals", [name]) or [name, "0"]
+        self._put(block_number, "pool_totals", [name, str(int(row[1]) + amount)])
+
+    def _apply(self, block_number, contract, name, args, minted):
+        # Units minted to a new option are followed by a TransferUnits that
+        # only debits the source, the mint already credited the target
+        if name == "TransferUnits":
+            (source, target) = (args["tokenId"], args["targetTokenId"])
+            units = args["transferUnits"]
+            if args["from"] == ZERO_ADDRESS:
+                self._update_option(
+                    block_number, contract, target, owner=args["to"], units_delta=units
+                )
+                minted.add((contract, target))
+                return
+            self._update_option(block_number, contract, source, units_delta=-units)
+            if args["to"] != ZERO_ADDRESS and (contract, target) not in minted:
+                self._update_option(
+                    block_number, contract, target, owner=args["to"], units_delta=units
+                )
+        elif name == "Split":
+            self._update_option(
+                block_number, contract, args["tokenId"], units_delta=-args["splitUnits"]
+            )
+        elif name == "Merge":
+            self._update_option(
+                block_number,
+                contract,
+                args["targetTokenId"],
+                units_delta=args["mergeUnits"],
+            )
+            self._update_option(block_number, contract, args["tokenId"], state="merged")
+        elif name == "Create":
+            self._update_option(
+                block_number,
+                contract,
+                args["id"],
+                total_fee=str(args["totalFee"]),
+                created_block=block_number,
+            )
+        elif name in ["Exercise", "ExerciseUnits"]:
+            # Exercised units add up to the option's profit, it stays active
+            # until it is exercised in full
+            row = self._get("options", [contract, args["id"]])
+            profit = int(row[6]) if row and row[6] is not None else 0
+            changes = {"state": "exercised"} if name == "Exercise" else {}
+            self._update_option(
+                block_number,
+                contract,
+                args["id"],
+                profit=str(profit + args["profit"]),
+                **changes,
+            )
+        elif name == "Expire":
+            self._update_option(block_number, contract, args["id"], state="expired")
+        elif name == "Provide":
+            self._update_lp(
+                block_number,
+                args["account"],
+                provided=args["amount"],
+                lp_tokens=args["writeAmount"],
+            )
+        elif name == "Withdraw":
+            self._update_lp(
+                block_number,
+                args["account"],
+                withdrawn=args["amount"],
+                lp_tokens=-args["writeAmount"],
+            )
+        elif name == "InitiateWithdraw":
+            self._update_lp(
+                block_number, args["account"], pending_withdrawal=args["tokenXAmount"]
+            )
+        elif name == "ProcessWithdrawRequest":
+            self._update_lp(
+                block_number, args["account"], pending_withdrawal=-args["tokenXAmount"]
+            )
+        elif name == "SettleSeries":
+            self._put(
+                block_number,
+                "series",
+                [
+                    contract,
+                    str(args["seriesID"]),
+                    str(args["expiryPrice"]),
+                    str(args["payout"]),
+                    block_number,
+                ],
+            )
+        elif name in ["Profit", "Loss"]:
+            self._add_total(block_number, name.lower(), args["amount"])
+        elif name == "Settle":
+            pnl = args["premium"] - args["payout"]
+            self._add_total(block_number, "profit" if pnl >= 0 else "loss", abs(pnl))
+
+    def option_book(self, owner=None, contract=None):
+        """
+        Returns the active options, of an owner or of a contract
+        """
+        query = "SELECT * FROM options WHERE state = 'active' AND units > 0"
+        params = []
+        if owner is not None:
+            query += " AND owner = ?"
+            params.append(to_checksum_address(str(owner)))
+        if contract is not None:
+            query += " AND contract = ?"
+            params.append(to_checksum_address(str(contract)))
+        return [
+            _option(row)
+            for row in self.db.execute(query + " ORDER BY option_id", params)
+        ]
+
+    def option(self, contract, option_id):
+        row = self._get("options", [to_checksum_address(str(contract)), option_id])
+        return _option(dict(zip(TABLES["options"][0], row))) if row else None
+
+    def series(self, contract, series_id):
+        """
+        Returns the expiry price and the payout of a settled series
+        """
+        row = self._get("series", [to_checksum_address(str(contract)), str(series_id)])
+        if row is None:
+            return None
+        series = dict(zip(TABLES["series"][0], row))
+        for column in ["series_id", "expiry_price", "payout"]:
+            series[column] = int(series[column])
+        return series
+
+    def lp_position(self, account):
+        row = self._get("lp_positions", [to_checksum_address(str(account))])
+        if row is None:
+            return None
+        return {
+            column: value if column == "account" else int(value)
+            for (column, value) in zip(TABLES["lp_positions"][0], row)
+        }
+
+    def lp_positions(self):
+        return [
+            self.lp_position(row[0])
+            for row in self.db.execute("SELECT account FROM lp_positions")
+        ]
+
+    def pool_pnl(self):
+        """
+        Returns the pool's total profit and loss on the options
+        """
+        totals = dict(self.db.execute("SELECT name, value FROM pool_totals"))
+        return {name: int(totals.get(name, 0)) for name in ["profit", "loss"]}
+
+
+def _option(row):
+    option = dict(row)
+    for column in ["total_fee", "profit"]:
+        if option[column] is not None:
+            option[column] = int(option[column])
+    return option
+
+
+def main(db_path=DB_PATH, start_block=0, follow=False):
+    from brownie import (
+        BufferEuropeanUSDCTokenXOptions,
+        BufferIBFRPoolV2,
+        BufferUSDCTokenXOptions,
+        web3,
+    )
+
+    contracts = sources(
+        BufferIBFRPoolV2[-1],
+        BufferUSDCTokenXOptions[-1],
+        BufferEuropeanUSDCTokenXOptions[-1]
+        if len(BufferEuropeanUSDCTokenXOptions)
+        else None,
+    )
+    indexer = EventIndexer(db_path, web3, contracts, int(start_block))
+    count = indexer.sync()
+    print(f"{count} events indexed up to block {indexer.checkpoint}")
+    if str(follow).lower() in ["true", "1"]:
+        indexer.follow()
+    return indexer
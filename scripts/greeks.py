@@ -0,0 +1,126 @@
+"""
+Vectorized Greeks of the options book
+
+Computes the price, delta, gamma, vega and theta of every active option of
+an options contract in one NumPy pass, with the same model as
+OptionMath.blackScholesGreeks: Choudhury's approximation of the CDF and no
+interest rate.
+
+    >>> from scripts.greeks import book_greeks, load_book
+    >>> book = load_book(options, lens, config)
+    >>> (positions, pool) = book_greeks(book, spot=400e8, implied_vol=book["implied_vol"], now=chain.time())
+    >>> pool["delta"]  # tokenX the pool would buy to hedge its short book
+
+The options are read through BufferOptionsLens, `batch_size` per call, and
+each is valued at the implied vol of its series in the config.
+"""
+import numpy as np
+
+try:
+    from scripts.vectorized_fees import YEAR, normal_cdf
+except ImportError:  # run as a script
+    from vectorized_fees import YEAR, normal_cdf
+
+ACTIVE = 1
+CALL = 2
+GREEKS = ("price", "delta", "gamma", "vega", "theta")
+
+
+def greeks(implied_vol, strike, spot, period, is_call):
+    """
+    Returns the price and Greeks per unit of the underlying, by name. The
+    inputs have the units of OptionMath.blackScholesGreeks, the outputs are
+    plain floats: the price in USD, delta per unit, gamma per 1 USD of spot,
+    vega per 1 (100%) of implied vol and theta per year.
+    """
+    (implied_vol, strike, spot, period) = (
+        np.asarray(a, dtype=np.float64) for a in (implied_vol, strike, spot, period)
+    )
+    (sigma, strike, spot, years) = (
+        implied_vol / 1e4,
+        strike / 1e8,
+        spot / 1e8,
+        period / YEAR,
+    )
+    deviation = sigma * np.sqrt(years)
+    d1 = (np.log(spot / strike) + deviation**2 / 2) / deviation
+    d2 = d1 - deviation
+    n1 = normal_cdf(d1)
+    n2 = normal_cdf(d2)
+    pdf = np.exp(-d1 * d1 / 2) / np.sqrt(2 * np.pi)
+
+    call = spot * n1 - strike * n2
+    put = strike * (1 - n2) - spot * (1 - n1)
+    return {
+        "price": np.maximum(np.where(is_call, call, put), 0),
+        "delta": np.where(is_call, n1, n1 - 1),
+        "gamma": pdf / (spot * deviation),
+        "vega": spot * pdf * np.sqrt(years),
+        "theta": -spot * pdf * sigma / (2 * np.sqrt(years)),
+    }
+
+
+def series_implied_vols(config):
+    """
+    Returns the implied vol of the config's series by strike. Options don't
+    store their series, a strike listed more than once gets the first one's.
+    """
+    implied_vols = {}
+    for series_id in range(config.seriesCount()):
+        (strike, implied_vol, _) = config.getSeries(series_id)
+        implied_vols.setdefault(strike, implied_vol)
+    return implied_vols
+
+
+def load_book(options, lens, config, batch_size=500):
+    """
+    Returns the active options of an options contract as arrays of their id,
+    strike, amount, expiration, whether they are calls and the implied vol of
+    their series. Options at a strike without a series get the config's
+    impliedVolRate.
+    """
+    implied_vols = series_implied_vols(config)
+    default_implied_vol = config.impliedVolRate()
+    rows = []
+    for start in range(0, options.nextTokenId(), batch_size):
+        ids = list(range(start, min(start + batch_size, options.nextTokenId())))
+        for data in lens.getOptions(options.address, ids):
+            (state, strike, amount, _, _, expiration, option_type) = data["option"]
+            if data["exists"] and state == ACTIVE:
+                rows.append(
+                    (
+                        data["optionID"],
+                        strike,
+                        amount,
+                        expiration,
+                        option_type == CALL,
+                        implied_vols.get(strike, default_implied_vol),
+                    )
+                )
+    columns = list(zip(*rows)) or [[]] * 6
+    return {
+        "id": np.array(columns[0], dtype=np.int64),
+        "strike": np.array(columns[1], dtype=np.float64),
+        "amount": np.array(columns[2], dtype=np.float64),
+        "expiration": np.array(columns[3], dtype=np.int64),
+        "is_call": np.array(columns[4], dtype=bool),
+        "implied_vol": np.array(columns[5], dtype=np.float64),
+    }
+
+
+def book_greeks(book, spot, implied_vol, now, decimals=18):
+    """
+    Returns the Greeks of every position, for the holders, and the totals of
+    the pool, which is short all of them. Position Greeks are per option
+    amount, in units of tokenX with `decimals`. Expired positions are valued
+    at 1 second to expiry.
+
+    `implied_vol` is broadcast against the positions: one vol for the whole
+    book or one per position, like the book's "implied_vol".
+    """
+    period = np.maximum(book["expiration"] - now, 1)
+    per_unit = greeks(implied_vol, book["strike"], spot, period, book["is_call"])
+    units = book["amount"] / 10**decimals
+    positions = {name: per_unit[name] * units for name in GREEKS}
+    pool = {name: -float(positions[name].sum()) for name in GREEKS}
+    return (positions, pool)
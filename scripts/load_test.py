@@ -0,0 +1,437 @@
+"""
+Load test of the options and the pool on a local chain
+
+Funds hundreds of new local accounts, then runs a random mix of provide,
+create, split, merge, transferFrom, exercise and withdraw from several
+threads, every thread sending from its own accounts. Each round ends with
+the chain moved past the pool's expiry, the options unlocked with unlockAll
+in batches, the pool rolled over and its withdraw queue processed.
+
+    brownie run load_test
+    brownie run load_test main 500 5000 create=4,split=1,exercise=1 16 2
+
+The arguments are the number of accounts, of operations, the mix as
+operation=weight pairs, the number of threads and of rounds. Only local
+development networks are accepted, e.g. ganache or an anvil node added to
+brownie with
+
+    brownie networks add Development anvil cmd=anvil host=http://127.0.0.1 port=8545
+    brownie run load_test --network anvil
+
+The report, written to reports/load_test.json, has the transactions per
+second of the whole run and, for every operation, its count, reverts, gas
+and latency percentiles. Every transaction is also written as a CSV row
+next to it.
+"""
+import contextlib
+import csv
+import json
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from brownie import accounts, chain
+from brownie._config import CONFIG
+from brownie.exceptions import VirtualMachineError
+
+from scripts.profile_gas import deploy
+
+REPORT_PATH = Path("reports/load_test.json")
+ONE_DAY = 86400
+ROUND_LENGTH = 7 * ONE_DAY
+MIX = {
+    "provide": 2,
+    "create": 4,
+    "split": 1,
+    "merge": 1,
+    "transferFrom": 1,
+    "exercise": 1,
+    "withdraw": 1,
+}
+ETHER_PER_ACCOUNT = "0.1 ether"
+TOKENX_PER_ACCOUNT = int(1e21)
+INITIAL_LIQUIDITY = int(1e22)
+UNLOCK_BATCH = 20
+PROCESS_BATCH = 50
+PERCENTILES = [50, 90, 99]
+# PaymentMethod of the options
+TOKENX = 1
+
+
+def parse_mix(mix):
+    """
+    Returns the weights of a "name=weight,..." mix, MIX when it is empty
+    """
+    if not mix:
+        return dict(MIX)
+    if isinstance(mix, dict):
+        weights = {name: float(weight) for (name, weight) in mix.items()}
+    else:
+        weights = {}
+        for pair in mix.split(","):
+            (name, weight) = pair.split("=")
+            weights[name.strip()] = float(weight)
+    unknown = set(weights) - set(MIX)
+    if unknown:
+        raise ValueError(f"Unknown operations {sorted(unknown)}, use {list(MIX)}")
+    if sum(weights.values()) <= 0:
+        raise ValueError("The mix needs a positive weight")
+    return weights
+
+
+class Book:
+    """
+    Options and LP positions of the load test's accounts, the option ids are
+    mapped to their units and to the option they were split from, the only
+    ones they can be merged with
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.options = defaultdict(dict)
+        self.lps = set()
+
+    def add(self, account, option_id, units, root):
+        with self._lock:
+            self.options[str(account)][option_id] = (units, root)
+
+    def remove(self, account, option_id):
+        with self._lock:
+            return self.options[str(account)].pop(option_id)
+
+    def held(self, account):
+        with self._lock:
+            return list(self.options[str(account)].items())
+
+    def pop_all(self, account):
+        with self._lock:
+            return list(self.options.pop(str(account), {}))
+
+
+def _event(tx, name, **match):
+    for event in tx.events[name] if name in tx.events else []:
+        if all(event[key] == value for (key, value) in match.items()):
+            return event
+    raise ValueError(f"{name} wasn't emitted")
+
+
+def _splittable(book, account):
+    return [(i, entry) for (i, entry) in book.held(account) if entry[0] >= 2]
+
+
+def _mergeable(book, account):
+    by_root = defaultdict(list)
+    for (option_id, (_, root)) in book.held(account):
+        by_root[root].append(option_id)
+    return [ids for ids in by_root.values() if len(ids) >= 2]
+
+
+def can_send(name, account, book):
+    """
+    Returns whether the account has what the operation needs, e.g. an
+    option to split
+    """
+    if name == "withdraw":
+        return str(account) in book.lps
+    if name == "exercise":
+        return bool(book.held(account))
+    if name in ["split", "transferFrom"]:
+        return bool(_splittable(book, account))
+    if name == "merge":
+        return bool(_mergeable(book, account))
+    return True
+
+
+def send_operation(name, account, rng, book, pool, options, owner, others):
+    """
+    Sends one operation from the account, which can send it, and records its
+    effect in the book once it succeeded. Returns its transaction
+    """
+    if name == "provide":
+        tx = pool.provide(rng.randint(1, 10) * 10**18, 0, {"from": account})
+        book.lps.add(str(account))
+    elif name == "withdraw":
+        tx = pool.withdraw(rng.randint(1, 10) * 10**16, {"from": account})
+    elif name == "create":
+        tx = options.create(
+            rng.randint(1, 10) * 10**16, owner, "", TOKENX, {"from": account}
+        )
+        option_id = _event(tx, "Create")["id"]
+        book.add(account, option_id, options.maxUnits(), option_id)
+    elif name == "exercise":
+        (option_id, _) = rng.choice(book.held(account))
+        tx = options.exercise(option_id, {"from": account})
+        book.remove(account, option_id)
+    elif name == "split":
+        (option_id, (units, root)) = rng.choice(_splittable(book, account))
+        split_units = rng.randint(1, units - 1)
+        tx = options.split(option_id, [split_units], {"from": account})
+        new_id = _event(tx, "Split", tokenId=option_id)["newTokenId"]
+        book.add(account, option_id, units - split_units, root)
+        book.add(account, new_id, split_units, root)
+    elif name == "merge":
+        (source, target) = rng.sample(rng.choice(_mergeable(book, account)), 2)
+        tx = options.merge([source], target, {"from": account})
+        (units, _) = book.remove(account, source)
+        (target_units, root) = book.remove(account, target)
+        book.add(account, target, units + target_units, root)
+    elif name == "transferFrom":
+        (option_id, (units, root)) = rng.choice(_splittable(book, account))
+        receiver = rng.choice(others)
+        transfer_units = rng.randint(1, units - 1)
+        tx = options.transferFrom["address,address,uint256,uint256"](
+            account, receiver, option_id, transfer_units, {"from": account}
+        )
+        new_id = _event(tx, "TransferUnits", tokenId=option_id)["targetTokenId"]
+        book.add(account, option_id, units - transfer_units, root)
+        book.add(receiver, new_id, transfer_units, root)
+    return tx
+
+
+def timed(send):
+    """
+    Returns the transaction of `send()`, None when it reverted, and its
+    latency in seconds
+    """
+    start = time.perf_counter()
+    try:
+        tx = send()
+    except VirtualMachineError:
+        tx = None
+    return (tx, time.perf_counter() - start)
+
+
+def _sample(name, tx, latency):
+    return {
+        "operation": name,
+        "reverted": tx is None,
+        "gas": tx.gas_used if tx is not None else None,
+        "latency": latency,
+    }
+
+
+def run_worker(shard, count, weights, seed, book, pool, options, owner, others):
+    """
+    Sends `count` operations drawn from the mix from the shard's accounts
+    and returns their samples. An operation the account can't send is
+    replaced by a create
+    """
+    rng = random.Random(seed)
+    names = list(weights)
+    samples = []
+    for _ in range(count):
+        name = rng.choices(names, [weights[n] for n in names])[0]
+        account = rng.choice(shard)
+        if not can_send(name, account, book):
+            name = "create"
+        (tx, latency) = timed(
+            lambda: send_operation(
+                name, account, rng, book, pool, options, owner, others
+            )
+        )
+        samples.append(_sample(name, tx, latency))
+    return samples
+
+
+def unlock_shard(shard, book, options):
+    """
+    Unlocks the expired options of the shard's accounts with unlockAll in
+    batches and returns their samples
+    """
+    samples = []
+    for account in shard:
+        option_ids = book.pop_all(account)
+        for start in range(0, len(option_ids), UNLOCK_BATCH):
+            batch = option_ids[start : start + UNLOCK_BATCH]
+            (tx, latency) = timed(lambda: options.unlockAll(batch, {"from": account}))
+            samples.append(_sample("unlockAll", tx, latency))
+    return samples
+
+
+def settle_round(shards, book, pool, options, owner, executor):
+    """
+    Moves the chain past the pool's expiry, unlocks every option, rolls the
+    pool over and processes its withdraw queue. Returns the samples of
+    unlockAll and processWithdrawRequests
+    """
+    chain.sleep(max(pool.fixedExpiry() - chain.time(), 0) + 1)
+    chain.mine(1)
+    samples = [
+        sample
+        for result in executor.map(lambda s: unlock_shard(s, book, options), shards)
+        for sample in result
+    ]
+    pool.rollOver(chain.time() + ROUND_LENGTH, {"from": owner})
+    while True:
+        (tx, latency) = timed(
+            lambda: pool.processWithdrawRequests(PROCESS_BATCH, {"from": owner})
+        )
+        samples.append(_sample("processWithdrawRequests", tx, latency))
+        if tx is None or pool.queueEnd() == 0:
+            break
+    return samples
+
+
+def fund_accounts(tokenX, pool, options, owner, count):
+    """
+    Returns `count` new local accounts with ether and tokenX, that approved
+    the pool and the options to spend it
+    """
+    new_accounts = []
+    for _ in range(count):
+        account = accounts.add()
+        owner.transfer(account, ETHER_PER_ACCOUNT)
+        tokenX.transfer(account, TOKENX_PER_ACCOUNT, {"from": owner})
+        tokenX.approve(pool, 2**256 - 1, {"from": account})
+        tokenX.approve(options, 2**256 - 1, {"from": account})
+        new_accounts.append(account)
+    return new_accounts
+
+
+def percentile(values, q):
+    return float(np.percentile(values, q)) if len(values) else None
+
+
+def summarize(samples, elapsed):
+    """
+    Returns the throughput of the samples and the count, reverts, gas and
+    latency percentiles of every operation
+    """
+    report = {
+        "transactions": len(samples),
+        "seconds": elapsed,
+        "tps": len(samples) / elapsed if elapsed > 0 else None,
+        "reverts": sum(s["reverted"] for s in samples),
+        "operations": {},
+    }
+    by_name = defaultdict(list)
+    for sample in samples:
+        by_name[sample["operation"]].append(sample)
+    for (name, group) in sorted(by_name.items()):
+        gas = [s["gas"] for s in group if not s["reverted"]]
+        latencies = [s["latency"] * 1000 for s in group]
+        report["operations"][name] = {
+            "count": len(group),
+            "reverts": len(group) - len(gas),
+            "gas": {
+                "mean": float(np.mean(gas)) if gas else None,
+                "min": min(gas, default=None),
+                "max": max(gas, default=None),
+            },
+            "latency_ms": {f"p{q}": percentile(latencies, q) for q in PERCENTILES},
+        }
+    report["latency_ms"] = {
+        f"p{q}": percentile([s["latency"] * 1000 for s in samples], q)
+        for q in PERCENTILES
+    }
+    return report
+
+
+def run(
+    pool,
+    options,
+    owner,
+    load_accounts,
+    operations,
+    mix=None,
+    threads=8,
+    rounds=1,
+    seed=0,
+):
+    """
+    Runs the load test on the given accounts and returns its report and
+    samples
+    """
+    weights = parse_mix(mix)
+    threads = max(1, min(threads, len(load_accounts)))
+    shards = [load_accounts[i::threads] for i in range(threads)]
+    book = Book()
+    samples = []
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as executor:
+        for round_ in range(rounds):
+            counts = [
+                (operations // rounds) // threads
+                + (i < (operations // rounds) % threads)
+                for i in range(threads)
+            ]
+            results = executor.map(
+                lambda i: run_worker(
+                    shards[i],
+                    counts[i],
+                    weights,
+                    f"{seed}-{round_}-{i}",
+                    book,
+                    pool,
+                    options,
+                    owner,
+                    load_accounts,
+                ),
+                range(threads),
+            )
+            samples += [sample for result in results for sample in result]
+            samples += settle_round(shards, book, pool, options, owner, executor)
+    return (summarize(samples, time.perf_counter() - start), samples)
+
+
+def write_report(report, samples, path=REPORT_PATH):
+    """
+    Writes the report as JSON and the samples as CSV rows next to it
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2) + "\n")
+    with open(path.with_suffix(".csv"), "w", newline="") as f:
+        writer = csv.DictWriter(f, ["operation", "reverted", "gas", "latency"])
+        writer.writeheader()
+        writer.writerows(samples)
+
+
+def main(
+    account_count=200,
+    operations=2000,
+    mix=None,
+    threads=8,
+    rounds=1,
+    report_path=REPORT_PATH,
+):
+    if CONFIG.network_type != "development":
+        raise ValueError("The load test only runs on a local development network")
+    owner = accounts[0]
+    (tokenX, _, pool, options) = deploy(owner)
+    options.approvePoolToTransferTokenX({"from": owner})
+    tokenX.approve(pool, INITIAL_LIQUIDITY, {"from": owner})
+    pool.provide(INITIAL_LIQUIDITY, 0, {"from": owner})
+
+    # Printing every transaction would slow the threads down
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        load_accounts = fund_accounts(tokenX, pool, options, owner, int(account_count))
+        (report, samples) = run(
+            pool,
+            options,
+            owner,
+            load_accounts,
+            int(operations),
+            mix,
+            int(threads),
+            int(rounds),
+        )
+    write_report(report, samples, report_path)
+
+    print(
+        f"{report['transactions']} transactions in {report['seconds']:.1f}s, "
+        f"{report['tps']:.1f} per second, {report['reverts']} reverted"
+    )
+    for (name, result) in report["operations"].items():
+        latency = result["latency_ms"]
+        print(
+            f"  {name:<26}{result['count']:>6}{result['reverts']:>6}"
+            f"{result['gas']['mean'] or 0:>12.0f}"
+            + "".join(f"{latency[f'p{q}']:>10.1f}" for q in PERCENTILES)
+        )
+    return report
@@ -0,0 +1,240 @@
+"""
+Monte Carlo simulation of the LPs' returns over a round of the pool
+
+Simulates many price paths at once with NumPy. Along every path buyers
+arrive at random, are quoted the contract's premium, with the utilization
+adjusted IV of FeeCalculator.currentImpliedVolatility, and buy when it is
+below what they are willing to pay and the pool can lock the collateral.
+The options are settled with the payout rules of `exercise`:
+
+- American options pay (spot - strike) / spot of their amount, capped at the
+  locked amount, when exercised. Holders exercise once the option is
+  `take_profit` in the money, keepers auto-exercise the rest of the ITM
+  options at the last step before the expiry
+- European options pay the same at the expiry price, once the round is over
+
+The LPs earn the premiums and pay the payouts, the settlement fee goes to
+the stakers and the admin. The result has, for every path, the LPs' return
+on the round and whether buyers were turned away for lack of liquidity:
+
+    >>> from scripts.lp_simulation import price_paths, simulate, summarize
+    >>> prices = price_paths(np.random.default_rng(0), 100000, 7 * 24, 7 * 86400, 400e8, 0.9)
+    >>> result = simulate(prices, 7 * 86400, strike=395e8, implied_vol_rate=110e2)
+    >>> summarize(result)["lp_return"]["p5"]
+
+100k paths of a week in hourly steps run in a few seconds. Run
+`python scripts/lp_simulation.py` to compare the American and European
+rules on the default scenario.
+"""
+import time
+
+import numpy as np
+
+try:
+    from scripts.vectorized_fees import YEAR, black_scholes_price, fees
+except ImportError:  # run as a script
+    from vectorized_fees import YEAR, black_scholes_price, fees
+
+ONE_DAY = 86400
+# Options can't be created in the last 12 hours of a round
+CREATION_CUTOFF = 12 * 3600
+# BufferUSDCTokenXOptions.minimumYield
+MINIMUM_YIELD = 5
+PERCENTILES = [1, 5, 50, 95, 99]
+
+
+def price_paths(rng, paths, steps, period, spot, volatility, drift=0.0):
+    """
+    Returns (steps + 1, paths) prices of a geometric Brownian motion with an
+    annual volatility and drift, starting at spot
+    """
+    dt = period / steps / YEAR
+    shocks = rng.standard_normal((steps, paths), dtype=np.float32)
+    log_returns = (drift - volatility**2 / 2) * dt + volatility * np.sqrt(dt) * shocks
+    log_prices = np.vstack(
+        [np.zeros((1, paths)), np.cumsum(log_returns, axis=0, dtype=np.float64)]
+    )
+    return spot * np.exp(log_prices)
+
+
+def _moneyness(prices, strike, is_call):
+    # Payout per unit of amount of an exercise at the price
+    return np.maximum((prices - strike if is_call else strike - prices) / prices, 0)
+
+
+def simulate(
+    prices,
+    period,
+    strike,
+    implied_vol_rate=110e2,
+    utilization_rate=60e8,
+    collateralization_ratio=100,
+    max_liquidity=5e24,
+    lp_liquidity=1e21,
+    settlement_fee_percentage=1,
+    is_call=True,
+    american=True,
+    demand_rate=24,
+    order_size=5e18,
+    order_dispersion=1.0,
+    fair_vol=None,
+    markup=1.5,
+    markup_dispersion=0.5,
+    take_profit=0.1,
+    seed=0,
+):
+    """
+    Simulates a round on every price path, prices has a row per step and
+    the expiry price last. Buyers arrive demand_rate times a day on average
+    with lognormal orders averaging order_size, and pay up to a lognormal
+    markup on the fair premium at fair_vol, the series' IV by default.
+    Returns the LPs' return, the premiums, the payouts and the orders
+    sold and turned away, per path
+    """
+    rng = np.random.default_rng(seed)
+    (steps, paths) = (prices.shape[0] - 1, prices.shape[1])
+    dt = period / steps
+    fair_vol = implied_vol_rate / 1e4 if fair_vol is None else fair_vol
+    order_probability = 1 - np.exp(-demand_rate * dt / ONE_DAY)
+    collateral = collateralization_ratio / 100
+
+    initial = np.full(paths, float(min(lp_liquidity, max_liquidity)))
+    balance = initial.copy()
+    locked_amount = np.zeros(paths)
+    locked_premium = np.zeros(paths)
+    open_amount = np.zeros(paths)
+    premiums = np.zeros(paths)
+    payouts = np.zeros(paths)
+    sold = np.zeros(paths, dtype=np.int64)
+    rejected = np.zeros(paths, dtype=np.int64)
+
+    def settle(mask, payout_rate):
+        # Pays the open options of the masked paths and unlocks them all
+        payout = np.where(mask, open_amount * np.minimum(payout_rate, collateral), 0)
+        balance[:] -= payout
+        payouts[:] += payout
+        released = mask & (open_amount > 0)
+        locked_amount[released] = 0
+        locked_premium[released] = 0
+        open_amount[released] = 0
+
+    for step in range(steps):
+        spot = prices[step]
+        if american:
+            payout_rate = _moneyness(spot, strike, is_call)
+            last = step == steps - 1
+            settle(
+                (payout_rate >= take_profit) | (last & (payout_rate > 0)), payout_rate
+            )
+
+        remaining = period - step * dt
+        if remaining < CREATION_CUTOFF:
+            continue
+        orders = np.flatnonzero(rng.random(paths) < order_probability)
+        amount = order_size * rng.lognormal(
+            -(order_dispersion**2) / 2, order_dispersion, orders.size
+        )
+        (total, _, premium) = fees(
+            remaining,
+            amount,
+            strike,
+            implied_vol_rate,
+            is_call,
+            spot[orders],
+            locked_amount[orders],
+            balance[orders] - locked_premium[orders],
+            utilization_rate,
+            settlement_fee_percentage,
+        )
+        fair_premium = (
+            black_scholes_price(
+                fair_vol * 1e4, strike, spot[orders], remaining, is_call
+            )
+            * amount
+            / spot[orders]
+        )
+        willing = fair_premium * rng.lognormal(
+            np.log(markup) - markup_dispersion**2 / 2, markup_dispersion, orders.size
+        )
+        buying = (total <= willing) & (
+            total * YEAR * 100 > amount * remaining * MINIMUM_YIELD
+        )
+        locked = amount * collateral
+        fits = (
+            locked_amount[orders] + locked <= balance[orders] - locked_premium[orders]
+        )
+        rejected[orders[buying & ~fits]] += 1
+
+        (orders, amount, premium, locked) = (
+            a[buying & fits] for a in (orders, amount, premium, locked)
+        )
+        balance[orders] += premium
+        premiums[orders] += premium
+        locked_premium[orders] += premium
+        locked_amount[orders] += locked
+        open_amount[orders] += amount
+        sold[orders] += 1
+
+    # American options left are OTM, European ones settle at the expiry price
+    expiry_rate = _moneyness(prices[-1], strike, is_call)
+    settle(np.full(paths, True), 0 if american else expiry_rate)
+    return {
+        "lp_return": balance / initial - 1,
+        "premiums": premiums,
+        "payouts": payouts,
+        "sold": sold,
+        "rejected": rejected,
+    }
+
+
+def summarize(result):
+    """
+    Returns the distribution of the LPs' return, its expected shortfall, the
+    probability of a loss and how often liquidity ran out
+    """
+    returns = result["lp_return"]
+    tail = returns[returns <= np.percentile(returns, 5)]
+    orders = result["sold"] + result["rejected"]
+    return {
+        "lp_return": {
+            "mean": float(returns.mean()),
+            "std": float(returns.std()),
+            **{f"p{q}": float(np.percentile(returns, q)) for q in PERCENTILES},
+            "expected_shortfall_5": float(tail.mean()),
+        },
+        "loss_probability": float((returns < 0).mean()),
+        "exhaustion_frequency": float((result["rejected"] > 0).mean()),
+        "rejected_share": float(result["rejected"].sum() / max(orders.sum(), 1)),
+        "options_sold": float(result["sold"].mean()),
+    }
+
+
+def main(paths=100_000, steps_per_day=24, days=7, volatility=0.9, seed=0):
+    period = days * ONE_DAY
+    start = time.perf_counter()
+    prices = price_paths(
+        np.random.default_rng(seed),
+        paths,
+        days * steps_per_day,
+        period,
+        400e8,
+        volatility,
+    )
+    for american in [True, False]:
+        result = simulate(prices, period, strike=395e8, american=american, seed=seed)
+        summary = summarize(result)
+        returns = summary["lp_return"]
+        print(
+            f"{'American' if american else 'European'}: mean return "
+            f"{returns['mean']:.2%}, p1 {returns['p1']:.2%}, p5 {returns['p5']:.2%}, "
+            f"p95 {returns['p95']:.2%}, loss probability "
+            f"{summary['loss_probability']:.1%}, liquidity exhausted on "
+            f"{summary['exhaustion_frequency']:.1%} of the paths"
+        )
+    print(
+        f"{paths} paths of {days * steps_per_day} steps, twice, in {time.perf_counter() - start:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,539 @@
+"""
+Bit-exact Python port of the ABDKMath64x64 and OptionMath libraries
+
+Every function works on Python integers the same way the contracts work on
+int128/uint256, so premiums computed here match the on-chain ones to the wei
+without a node:
+
+    >>> from scripts.option_math import black_scholes_price
+    >>> black_scholes_price(110e2, 395e8, 400e8, 7 * 86400, True)
+    2677473639
+
+64.64 fixed point numbers are plain ints holding the numerator over 2**64.
+Inputs and results that would make the contract revert raise `MathRevert`.
+"""
+import re
+from functools import lru_cache
+from pathlib import Path
+
+MIN_64x64 = -0x80000000000000000000000000000000
+MAX_64x64 = 0x7FFFFFFFFFFFFFFFFFFFFFFFFFFFFFFF
+MAX_UINT256 = 2**256 - 1
+
+ONE_64x64 = 0x10000000000000000
+THREE_64x64 = 0x30000000000000000
+
+INV_SQRT_2PI_64x64 = 0x0662114CF50D94234
+
+# Choudhury's approximation of the normal CDF
+CDF_CONST_0 = 0x09109F285DF452394  # 2260 / 3989
+CDF_CONST_1 = 0x19ABAC0EA1DA65036  # 6400 / 3989
+CDF_CONST_2 = 0x0D3C84B78B749BD6B  # 3300 / 3989
+
+LN_2_128x128 = 0xB17217F7D1CF79ABC9E3B39803F2F6AF
+LOG_2_E_128x128 = 0x171547652B82FE1777D0FFDA0D23A7D12
+
+# 2^(2^-n) in 128.128 fixed point, for the bits of the fractional part of
+# exp_2's input from 2^-1 down to 2^-64
+EXP_2_FACTORS = (
+    0x16A09E667F3BCC908B2FB1366EA957D3E,
+    0x1306FE0A31B7152DE8D5A46305C85EDEC,
+    0x1172B83C7D517ADCDF7C8C50EB14A791F,
+    0x10B5586CF9890F6298B92B71842A98363,
+    0x1059B0D31585743AE7C548EB68CA417FD,
+    0x102C9A3E778060EE6F7CACA4F7A29BDE8,
+    0x10163DA9FB33356D84A66AE336DCDFA3F,
+    0x100B1AFA5ABCBED6129AB13EC11DC9543,
+    0x10058C86DA1C09EA1FF19D294CF2F679B,
+    0x1002C605E2E8CEC506D21BFC89A23A00F,
+    0x100162F3904051FA128BCA9C55C31E5DF,
+    0x1000B175EFFDC76BA38E31671CA939725,
+    0x100058BA01FB9F96D6CACD4B180917C3D,
+    0x10002C5CC37DA9491D0985C348C68E7B3,
+    0x1000162E525EE054754457D5995292026,
+    0x10000B17255775C040618BF4A4ADE83FC,
+    0x1000058B91B5BC9AE2EED81E9B7D4CFAB,
+    0x100002C5C89D5EC6CA4D7C8ACC017B7C9,
+    0x10000162E43F4F831060E02D839A9D16D,
+    0x100000B1721BCFC99D9F890EA06911763,
+    0x10000058B90CF1E6D97F9CA14DBCC1628,
+    0x1000002C5C863B73F016468F6BAC5CA2B,
+    0x100000162E430E5A18F6119E3C02282A5,
+    0x1000000B1721835514B86E6D96EFD1BFE,
+    0x100000058B90C0B48C6BE5DF846C5B2EF,
+    0x10000002C5C8601CC6B9E94213C72737A,
+    0x1000000162E42FFF037DF38AA2B219F06,
+    0x10000000B17217FBA9C739AA5819F44F9,
+    0x1000000058B90BFCDEE5ACD3C1CEDC823,
+    0x100000002C5C85FE31F35A6A30DA1BE50,
+    0x10000000162E42FF0999CE3541B9FFFCF,
+    0x100000000B17217F80F4EF5AADDA45554,
+    0x10000000058B90BFBF8479BD5A81B51AD,
+    0x1000000002C5C85FDF84BD62AE30A74CC,
+    0x100000000162E42FEFB2FED257559BDAA,
+    0x1000000000B17217F7D5A7716BBA4A9AE,
+    0x100000000058B90BFBE9DDBAC5E109CCE,
+    0x10000000002C5C85FDF4B15DE6F17EB0D,
+    0x1000000000162E42FEFA494F1478FDE05,
+    0x10000000000B17217F7D20CF927C8E94C,
+    0x1000000000058B90BFBE8F71CB4E4B33D,
+    0x100000000002C5C85FDF477B662B26945,
+    0x10000000000162E42FEFA3AE53369388C,
+    0x100000000000B17217F7D1D351A389D40,
+    0x10000000000058B90BFBE8E8B2D3D4EDE,
+    0x1000000000002C5C85FDF4741BEA6E77E,
+    0x100000000000162E42FEFA39FE95583C2,
+    0x1000000000000B17217F7D1CFB72B45E1,
+    0x100000000000058B90BFBE8E7CC35C3F0,
+    0x10000000000002C5C85FDF473E242EA38,
+    0x1000000000000162E42FEFA39F02B772C,
+    0x10000000000000B17217F7D1CF7D83C1A,
+    0x1000000000000058B90BFBE8E7BDCBE2E,
+    0x100000000000002C5C85FDF473DEA871F,
+    0x10000000000000162E42FEFA39EF44D91,
+    0x100000000000000B17217F7D1CF79E949,
+    0x10000000000000058B90BFBE8E7BCE544,
+    0x1000000000000002C5C85FDF473DE6ECA,
+    0x100000000000000162E42FEFA39EF366F,
+    0x1000000000000000B17217F7D1CF79AFA,
+    0x100000000000000058B90BFBE8E7BCD6D,
+    0x10000000000000002C5C85FDF473DE6B2,
+    0x1000000000000000162E42FEFA39EF358,
+    0x10000000000000000B17217F7D1CF79AB,
+)
+
+YEAR = 365 * 86400
+
+OPTION_MATH_PATH = (
+    Path(__file__).resolve().parent.parent / "contracts/Libraries/OptionMath.sol"
+)
+CDF_TABLE_PATTERN = re.compile(r"CDF_TABLE =\s*((?:\s*hex\"[0-9a-f]*\")+);")
+CDF_TABLE_SEGMENTS = 128
+
+
+class MathRevert(ArithmeticError):
+    """
+    Raised where the contract's call would revert
+    """
+
+
+def _require(condition):
+    if not condition:
+        raise MathRevert()
+
+
+def _check_64x64(result):
+    _require(MIN_64x64 <= result <= MAX_64x64)
+    return result
+
+
+def _to_int128(value):
+    # Solidity's int128(...) conversion keeps the low 128 bits
+    value &= 2**128 - 1
+    return value - 2**128 if value >= 2**127 else value
+
+
+def _div_towards_zero(x, y):
+    quotient = abs(x) // abs(y)
+    return quotient if (x < 0) == (y < 0) else -quotient
+
+
+# ABDKMath64x64
+
+
+def from_int(x):
+    _require(-0x8000000000000000 <= x <= 0x7FFFFFFFFFFFFFFF)
+    return x << 64
+
+
+def from_uint(x):
+    _require(0 <= x <= 0x7FFFFFFFFFFFFFFF)
+    return x << 64
+
+
+def to_int(x):
+    return x >> 64
+
+
+def to_uint(x):
+    _require(x >= 0)
+    return (x >> 64) & 0xFFFFFFFFFFFFFFFF
+
+
+def add(x, y):
+    return _check_64x64(x + y)
+
+
+def sub(x, y):
+    return _check_64x64(x - y)
+
+
+def mul(x, y):
+    return _check_64x64((x * y) >> 64)
+
+
+def muli(x, y):
+    result = _div_towards_zero(x * y, 2**64)
+    _require(-(2**255) <= result < 2**255)
+    return result
+
+
+def mulu(x, y):
+    if y == 0:
+        return 0
+    _require(x >= 0)
+    result = (x * y) >> 64
+    _require(result <= MAX_UINT256)
+    return result
+
+
+def div(x, y):
+    _require(y != 0)
+    return _check_64x64(_div_towards_zero(x << 64, y))
+
+
+def divu(x, y):
+    _require(y != 0)
+    result = (x << 64) // y
+    _require(result <= MAX_64x64)
+    return result
+
+
+def divi(x, y):
+    _require(y != 0)
+    result = _div_towards_zero(abs(x) << 64, abs(y))
+    _require(result <= 2**128 - 1)
+    if (x < 0) != (y < 0):
+        _require(result <= 0x80000000000000000000000000000000)
+        return -result
+    _require(result <= MAX_64x64)
+    return result
+
+
+def neg(x):
+    _require(x != MIN_64x64)
+    return -x
+
+
+def abs_(x):
+    _require(x != MIN_64x64)
+    return -x if x < 0 else x
+
+
+def sqrtu(x):
+    if x == 0:
+        return 0
+    xx = x
+    r = 1
+    for (threshold, shift, r_shift) in (
+        (2**128, 128, 64),
+        (2**64, 64, 32),
+        (2**32, 32, 16),
+        (2**16, 16, 8),
+        (2**8, 8, 4),
+        (2**4, 4, 2),
+    ):
+        if xx >= threshold:
+            xx >>= shift
+            r <<= r_shift
+    if xx >= 0x8:
+        r <<= 1
+    for _ in range(7):
+        r = (r + x // r) >> 1
+    return min(r, x // r)
+
+
+def sqrt(x):
+    _require(x >= 0)
+    return sqrtu(x << 64)
+
+
+def gavg(x, y):
+    m = x * y
+    _require(0 <= m < 2**254)
+    return sqrtu(m)
+
+
+def log_2(x):
+    _require(x > 0)
+    msb = x.bit_length() - 1
+    result = (msb - 64) << 64
+    ux = x << (127 - msb)
+    bit = 0x8000000000000000
+    while bit > 0:
+        ux *= ux
+        b = ux >> 255
+        ux >>= 127 + b
+        result += bit * b
+        bit >>= 1
+    return result
+
+
+def ln(x):
+    _require(x > 0)
+    # The contract multiplies log_2(x) as an uint256 and relies on it wrapping
+    product = ((log_2(x) & MAX_UINT256) * LN_2_128x128) & MAX_UINT256
+    return _to_int128(product >> 128)
+
+
+def exp_2(x):
+    _require(x < 0x400000000000000000)
+    if x < -0x400000000000000000:
+        return 0
+    result = 0x80000000000000000000000000000000
+    for (i, factor) in enumerate(EXP_2_FACTORS):
+        if x & (0x8000000000000000 >> i):
+            result = (result * factor) >> 128
+    result >>= 63 - (x >> 64)
+    _require(result <= MAX_64x64)
+    return result
+
+
+def exp(x):
+    _require(x < 0x400000000000000000)
+    if x < -0x400000000000000000:
+        return 0
+    return exp_2(_to_int128((x * LOG_2_E_128x128) >> 128))
+
+
+# OptionMath
+
+
+def N(input64x64):
+    """
+    Choudhury's approximation of the normal CDF, OptionMath._N
+    """
+    input_squared = mul(input64x64, input64x64)
+    value = div(
+        exp((-input_squared) >> 1),
+        add(
+            add(CDF_CONST_0, mul(CDF_CONST_1, abs_(input64x64))),
+            mul(CDF_CONST_2, sqrt(add(input_squared, THREE_64x64))),
+        ),
+    )
+    return sub(ONE_64x64, value) if input64x64 > 0 else value
+
+
+def _black_scholes_price(variance, strike, spot, time_to_maturity, is_call):
+    """
+    OptionMath._blackScholesPrice, with 64.64 inputs and result
+    """
+    cumulative_variance = mul(time_to_maturity, variance)
+    cumulative_variance_sqrt = sqrt(cumulative_variance)
+    d1 = div(
+        add(ln(div(spot, strike)), cumulative_variance >> 1),
+        cumulative_variance_sqrt,
+    )
+    d2 = sub(d1, cumulative_variance_sqrt)
+    if is_call:
+        return sub(mul(spot, N(d1)), mul(strike, N(d2)))
+    return neg(sub(mul(spot, N(neg(d1))), mul(strike, N(neg(d2)))))
+
+
+def black_scholes_price(implied_vol, strike, spot, period, is_call):
+    """
+    OptionMath.blackScholesPrice
+
+    implied_vol has a factor of 1e4, strike, spot and the result have a
+    factor of 1e8 and period is in seconds.
+    """
+    (implied_vol, strike, spot, period) = (
+        int(implied_vol),
+        int(strike),
+        int(spot),
+        int(period),
+    )
+    d8 = from_uint(10**8)
+    d4 = from_uint(10**4)
+    implied_vol64x64 = div(from_uint(implied_vol), d4)
+    variance = mul(implied_vol64x64, implied_vol64x64)
+    premium = _black_scholes_price(
+        variance,
+        div(from_uint(strike), d8),
+        div(from_uint(spot), d8),
+        div(from_uint(period), from_uint(YEAR)),
+        is_call,
+    )
+    return to_uint(mul(premium, d8))
+
+
+def _cdf(input64x64, tail64x64):
+    return sub(ONE_64x64, tail64x64) if input64x64 > 0 else tail64x64
+
+
+@lru_cache(maxsize=None)
+def cdf_table(path=OPTION_MATH_PATH):
+    """
+    Returns the entries of OptionMath.CDF_TABLE, read from the library's source
+    """
+    match = CDF_TABLE_PATTERN.search(Path(path).read_text())
+    data = bytes.fromhex("".join(re.findall(r'hex"([0-9a-f]*)"', match[1])))
+    return tuple(int.from_bytes(data[i : i + 8], "big") for i in range(0, len(data), 8))
+
+
+def lookup_tail(abs64x64):
+    """
+    OptionMath._lookupTail, N(-x) for x >= 0 from the lookup table
+    """
+    segment = abs64x64 >> 60
+    if segment >= CDF_TABLE_SEGMENTS:
+        return 0
+    (p0, p1, p2, p3) = cdf_table()[segment : segment + 4]
+    t = (abs64x64 << 4) & 0xFFFFFFFFFFFFFFFF
+    a = 6 * p2 - 2 * p0 - 3 * p1 - p3
+    b = 3 * (p0 - 2 * p1 + p2)
+    c = 3 * (p1 - p2) + p3 - p0
+    value = (t * (a + ((t * (b + ((t * c) >> 64))) >> 64))) >> 64
+    return _to_int128(p1 + _div_towards_zero(value, 6))
+
+
+def lookup_N(input64x64):
+    """
+    OptionMath._lookupN, the lookup table approximation of _N
+    """
+    return _cdf(input64x64, lookup_tail(abs_(input64x64)))
+
+
+def d1d2(implied_vol, strike, spot, period):
+    """
+    OptionMath._d1d2, returns spot / strike, d1 and d2 in 64.64
+    """
+    ratio = divi(spot, strike)
+    cumulative_variance = divi(implied_vol * implied_vol * period, 10**8 * YEAR)
+    cumulative_variance_sqrt = gavg(cumulative_variance, ONE_64x64)
+    d1 = div(add(ln(ratio), cumulative_variance >> 1), cumulative_variance_sqrt)
+    return (ratio, d1, sub(d1, cumulative_variance_sqrt))
+
+
+def _tail(abs64x64, squared64x64, exp64x64):
+    return div(
+        exp64x64,
+        add(
+            add(CDF_CONST_0, mul(CDF_CONST_1, abs64x64)),
+            mul(CDF_CONST_2, gavg(add(squared64x64, THREE_64x64), ONE_64x64)),
+        ),
+    )
+
+
+def tails(ratio, d1, d2, use_lookup_table=False):
+    """
+    OptionMath._tails, returns N(-|d1|) and N(-|d2|) in 64.64
+    """
+    if use_lookup_table:
+        return (lookup_tail(abs_(d1)), lookup_tail(abs_(d2)))
+    d1_squared = mul(d1, d1)
+    exp1 = exp((-d1_squared) >> 1)
+    return (
+        _tail(abs_(d1), d1_squared, exp1),
+        _tail(abs_(d2), mul(d2, d2), mul(exp1, ratio)),
+    )
+
+
+def fused_black_scholes_price(
+    implied_vol, strike, spot, period, is_call, use_lookup_table=False
+):
+    """
+    OptionMath._fusedBlackScholesPrice, the kernel FeeCalculator.fees prices
+    with. Takes and returns the same units as black_scholes_price.
+    """
+    (implied_vol, strike, spot, period) = (
+        int(implied_vol),
+        int(strike),
+        int(spot),
+        int(period),
+    )
+    (ratio, d1, d2) = d1d2(implied_vol, strike, spot, period)
+    (tail1, tail2) = tails(ratio, d1, d2, use_lookup_table)
+    return _price_from_tails(strike, is_call, ratio, d1, d2, tail1, tail2)
+
+
+def _price_from_tails(strike, is_call, ratio, d1, d2, tail1, tail2):
+    if is_call:
+        price = sub(mul(ratio, _cdf(d1, tail1)), _cdf(d2, tail2))
+    else:
+        price = sub(_cdf(-d2, tail2), mul(ratio, _cdf(-d1, tail1)))
+    return mulu(price, strike) if price > 0 else 0
+
+
+def black_scholes_greeks(implied_vol, strike, spot, period, is_call):
+    """
+    OptionMath.blackScholesGreeks, returns the price, delta, gamma, vega and
+    theta with a factor of 1e8
+    """
+    (implied_vol, strike, spot, period) = (
+        int(implied_vol),
+        int(strike),
+        int(spot),
+        int(period),
+    )
+    (ratio, d1, d2) = d1d2(implied_vol, strike, spot, period)
+    (tail1, tail2) = tails(ratio, d1, d2)
+    price = _price_from_tails(strike, is_call, ratio, d1, d2, tail1, tail2)
+    delta = _cdf(d1, tail1)
+    delta = muli(delta if is_call else sub(delta, ONE_64x64), 10**8)
+
+    deviation = sub(d1, d2)
+    spot64x64 = divi(spot, 10**8)
+    pdf = mul(exp((-mul(d1, d1)) >> 1), INV_SQRT_2PI_64x64)
+    spread = mul(mul(spot64x64, pdf), deviation)
+    gamma = muli(div(pdf, mul(spot64x64, deviation)), 10**8)
+    vega = muli(div(spread, divi(implied_vol, 10**4)), 10**8)
+    theta = -muli(div(spread, _to_int128(divi(period, YEAR) << 1)), 10**8)
+    return (price, delta, gamma, vega, theta)
+
+
+# FeeCalculator
+
+
+def current_implied_volatility(
+    implied_vol_rate, amount, locked_amount, total_balance, utilization_rate
+):
+    """
+    FeeCalculator.currentImpliedVolatility, with the pool's lockedAmount and
+    totalTokenXBalance and the config's utilizationRate
+    """
+    _require(total_balance != 0)
+    utilization = ((locked_amount + amount) * 100 * 10**8) // total_balance
+    if utilization > 40 * 10**8:
+        implied_vol_rate += (
+            implied_vol_rate * (utilization - 40 * 10**8)
+        ) // utilization_rate
+    return implied_vol_rate
+
+
+def fees(
+    period,
+    amount,
+    strike,
+    implied_vol_rate,
+    is_call,
+    current_price,
+    locked_amount,
+    total_balance,
+    utilization_rate=60 * 10**8,
+    settlement_fee_percentage=1,
+    use_lookup_table=False,
+):
+    """
+    FeeCalculator.fees, returns the total, the settlement fee and the premium
+    """
+    (period, amount, strike, implied_vol_rate, current_price) = (
+        int(period),
+        int(amount),
+        int(strike),
+        int(implied_vol_rate),
+        int(current_price),
+    )
+    usd_premium = fused_black_scholes_price(
+        current_implied_volatility(
+            implied_vol_rate, amount, locked_amount, total_balance, utilization_rate
+        ),
+        strike,
+        current_price,
+        period,
+        is_call,
+        use_lookup_table,
+    )
+    premium = (usd_premium * amount) // current_price
+    settlement_fee = (amount * settlement_fee_percentage) // 100
+    return (settlement_fee + premium, settlement_fee, premium)
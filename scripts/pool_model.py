@@ -0,0 +1,830 @@
+"""
+Exact pure-Python model of BufferIBFRPoolV2
+
+PoolModel keeps the pool's state in Python integers and applies every
+operation the way the contract does, including the rounding of provide and
+_withdraw, the admin cut, the withdraw queue, the locks and rollOver. It is
+fast enough for millions of randomized operations:
+
+    model = PoolModel(owner, fixed_expiry)
+    model.provide(lp, int(1e18), 0)
+    model.withdraw(lp, int(5e17))
+
+Operations are named after the contract's functions and take the sender
+first, then the function's arguments. One that would make the contract
+revert raises `PoolRevert` with the name of the custom error, "Error" for
+revert strings, "Revert" for reverts without data or "Panic". A reverted
+operation leaves the model unchanged, like a reverted transaction.
+
+`replay` applies a trace of operations to the model and to a deployed pool
+and checks that both agree on every result and on the state after every
+operation.
+"""
+import functools
+import random
+import time
+
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+MAX_UINT256 = 2**256 - 1
+INITIAL_RATE = 1000
+ONE_DAY = 86400
+
+PANIC_OVERFLOW = 0x11
+PANIC_DIVISION_BY_ZERO = 0x12
+PANIC_OUT_OF_BOUNDS = 0x32
+
+# Indexes of a LockedLiquidity and of a WithdrawRequest
+AMOUNT, PREMIUM, LOCKED = range(3)
+WITHDRAW_AMOUNT, ROUND, ACCOUNT = range(3)
+
+
+class PoolRevert(Exception):
+    """
+    An operation the contract would revert, with the error's name and args
+    """
+
+    def __init__(self, name, *args):
+        super().__init__(name, *args)
+        self.name = name
+
+
+def _atomic(operation):
+    # Undoes the changes of an operation that reverts
+    @functools.wraps(operation)
+    def wrapper(self, *args):
+        self._journal = []
+        try:
+            return operation(self, *args)
+        except PoolRevert:
+            for (container, key, value, existed) in reversed(self._journal):
+                if key is None:
+                    container.pop()
+                elif existed:
+                    container[key] = value
+                else:
+                    del container[key]
+            raise
+        finally:
+            self._journal = None
+
+    return wrapper
+
+
+def _sub(a, b):
+    if b > a:
+        raise PoolRevert("Panic", PANIC_OVERFLOW)
+    return a - b
+
+
+def _add(a, b):
+    if a + b > MAX_UINT256:
+        raise PoolRevert("Panic", PANIC_OVERFLOW)
+    return a + b
+
+
+def _mul(a, b):
+    if a * b > MAX_UINT256:
+        raise PoolRevert("Panic", PANIC_OVERFLOW)
+    return a * b
+
+
+def _div(a, b):
+    if b == 0:
+        raise PoolRevert("Panic", PANIC_DIVISION_BY_ZERO)
+    return a // b
+
+
+class PoolModel:
+    def __init__(self, owner, fixed_expiry, max_liquidity=5000000 * 10**18, now=0):
+        self.owner = owner
+        self.admins = {owner}
+        self.issuers = set()
+        self.now = now
+        self._journal = None
+
+        # Scalars are journaled through self.state
+        self.state = {
+            "balance": 0,
+            "total_supply": 0,
+            "locked_amount": 0,
+            "locked_premium": 0,
+            "max_liquidity": max_liquidity,
+            "fixed_expiry": fixed_expiry,
+            "current_round": 1,
+            "has_pool_ended": False,
+            "is_accepting_withdraw_requests": True,
+            "queue_start": 0,
+            "queue_end": 0,
+        }
+        self.balances = {}
+        # Issuer => [[amount, premium, locked], ...]
+        self.locked_liquidity = {}
+        # Issuer => [expiry of each lock, ...]
+        self.lock_expiry = {}
+        # (issuer, expiry) => [amount, premium, locked] of its open locks
+        self.expiry_locked_liquidity = {}
+        # (issuer, expiry) => True once the locks of the expiry are settled
+        self.settled_expiries = {}
+        # Index => [withdrawAmount, round, account]
+        self.queue = {}
+        # Account => [requestIndex, exists]
+        self.requests = {}
+
+    def __getattr__(self, name):
+        try:
+            return self.__dict__["state"][name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def _set(self, container, key, value):
+        if self._journal is not None:
+            existed = key in container
+            self._journal.append((container, key, container.get(key), existed))
+        container[key] = value
+
+    def _setitem(self, items, index, value):
+        if self._journal is not None:
+            self._journal.append((items, index, items[index], True))
+        items[index] = value
+
+    def _update(self, name, value):
+        self._set(self.state, name, value)
+
+    # ERC20
+
+    def balance_of(self, account):
+        return self.balances.get(account, 0)
+
+    def _mint(self, account, amount):
+        if account == ZERO_ADDRESS:
+            raise PoolRevert("Error", "ERC20: mint to the zero address")
+        self._update("total_supply", _add(self.total_supply, amount))
+        self._set(self.balances, account, self.balance_of(account) + amount)
+
+    def _burn(self, account, amount):
+        if self.balance_of(account) < amount:
+            raise PoolRevert("Error", "ERC20: burn amount exceeds balance")
+        self._set(self.balances, account, self.balance_of(account) - amount)
+        self._update("total_supply", self.total_supply - amount)
+
+    def _send_tokenX(self, amount):
+        # tokenX.transfer from the pool
+        if amount > self.balance:
+            raise PoolRevert("Error", "ERC20: transfer amount exceeds balance")
+        self._update("balance", self.balance - amount)
+
+    @_atomic
+    def transfer(self, sender, to, amount):
+        if to == ZERO_ADDRESS:
+            raise PoolRevert("Error", "ERC20: transfer to the zero address")
+        if self.balance_of(sender) < amount:
+            raise PoolRevert("Error", "ERC20: transfer amount exceeds balance")
+        self._set(self.balances, sender, self.balance_of(sender) - amount)
+        self._set(self.balances, to, self.balance_of(to) + amount)
+        return True
+
+    # Views
+
+    def total_tokenX_balance(self):
+        return _sub(self.balance, self.locked_premium)
+
+    def available_balance(self):
+        return _sub(self.total_tokenX_balance(), self.locked_amount)
+
+    def share_of(self, account):
+        if self.total_supply == 0:
+            return 0
+        return (
+            self.total_tokenX_balance()
+            * self.balance_of(account)
+            // (self.total_supply)
+        )
+
+    # Admin
+
+    def _only_admin(self, sender):
+        if sender not in self.admins:
+            raise PoolRevert("Error", "AccessControl: missing role")
+
+    def _only_issuer(self, sender):
+        if sender not in self.issuers:
+            raise PoolRevert("Error", "AccessControl: missing role")
+
+    @_atomic
+    def set_max_liquidity(self, sender, max_liquidity):
+        self._only_admin(sender)
+        self._update("max_liquidity", max_liquidity)
+
+    @_atomic
+    def set_pool_state(self, sender, has_pool_ended):
+        self._only_admin(sender)
+        self._update("has_pool_ended", has_pool_ended)
+
+    @_atomic
+    def roll_over(self, sender, expiry):
+        self._only_admin(sender)
+        if self.now <= self.fixed_expiry:
+            raise PoolRevert("ExpiryNotOver", self.fixed_expiry)
+        if self.locked_amount > 0 or self.locked_premium > 0:
+            raise PoolRevert("RoundNotOver", self.locked_amount, self.locked_premium)
+        self._update("fixed_expiry", expiry)
+        self._update("current_round", self.current_round + 1)
+        self._update("is_accepting_withdraw_requests", False)
+
+    # Liquidity
+
+    @_atomic
+    def provide(self, sender, tokenX_amount, min_mint):
+        if self.has_pool_ended:
+            raise PoolRevert("PoolEnded")
+        supply = self.total_supply
+        balance = self.balance
+        if _add(balance, tokenX_amount) > self.max_liquidity:
+            raise PoolRevert("MaxLiquidityReached", self.max_liquidity)
+
+        if supply > 0 and balance > 0:
+            mint = _mul(tokenX_amount, supply) // balance
+        else:
+            mint = _mul(tokenX_amount, INITIAL_RATE)
+        if mint < min_mint:
+            raise PoolRevert("MintLimitTooLarge", mint, min_mint)
+        if mint == 0:
+            raise PoolRevert("AmountTooSmall")
+
+        self._update("balance", balance + tokenX_amount)
+        admin_cut = mint // 1000
+        self._mint(sender, mint - admin_cut)
+        self._mint(self.owner, admin_cut)
+        return mint
+
+    def _withdraw(self, tokenX_amount, account):
+        available = self.available_balance()
+        if tokenX_amount > available:
+            raise PoolRevert("NotEnoughFunds", tokenX_amount, available)
+        total_supply = self.total_supply
+        balance = self.total_tokenX_balance()
+
+        max_user_withdrawal = _div(
+            _mul(self.balance_of(account), balance), total_supply
+        )
+        amount = min(max_user_withdrawal, tokenX_amount)
+
+        # divCeil
+        if balance == 0:
+            raise PoolRevert("Revert")
+        burn = -(-_mul(amount, total_supply) // balance)
+
+        if burn > self.balance_of(account):
+            raise PoolRevert("AmountTooLarge", burn, self.balance_of(account))
+        if burn == 0:
+            raise PoolRevert("AmountTooSmall")
+        self._burn(account, burn)
+        self._send_tokenX(amount)
+        return burn
+
+    def _initiate_withdraw(self, tokenX_amount, account):
+        if self.balance_of(account) == 0:
+            raise PoolRevert("NothingToWithdraw")
+        request = self.requests.get(account)
+        if request and request[1]:
+            withdraw_request = self.queue.get(request[0], [0, 0, ZERO_ADDRESS])
+            if withdraw_request[ROUND] not in (self.current_round, 0):
+                raise PoolRevert("StateLockedUp", withdraw_request[ROUND])
+            self._set(
+                self.queue,
+                request[0],
+                [
+                    _add(withdraw_request[WITHDRAW_AMOUNT], tokenX_amount),
+                    withdraw_request[ROUND],
+                    withdraw_request[ACCOUNT],
+                ],
+            )
+        else:
+            queue_end = self.queue_end
+            self._set(
+                self.queue, queue_end, [tokenX_amount, self.current_round, account]
+            )
+            self._set(self.requests, account, [queue_end, True])
+            self._update("queue_end", queue_end + 1)
+
+    @_atomic
+    def withdraw(self, sender, tokenX_amount):
+        if self.has_pool_ended:
+            self._withdraw(tokenX_amount, sender)
+        else:
+            if not self.is_accepting_withdraw_requests:
+                raise PoolRevert("NotAcceptingWithdrawRequests")
+            self._initiate_withdraw(tokenX_amount, sender)
+
+    @_atomic
+    def admin_withdraw(self, sender, user, tokenX_amount):
+        self._only_admin(sender)
+        self._withdraw(tokenX_amount, user)
+
+    @_atomic
+    def process_withdraw_requests(self, sender, requests_to_process):
+        start = self.queue_start
+        end = min(_add(start, requests_to_process), self.queue_end)
+        for i in range(start, end):
+            withdraw_request = self.queue.get(i, [0, 0, ZERO_ADDRESS])
+            if withdraw_request[ROUND] == self.current_round:
+                raise PoolRevert("RoundActive", self.current_round)
+            self._withdraw(withdraw_request[WITHDRAW_AMOUNT], withdraw_request[ACCOUNT])
+            if i in self.queue:
+                self._journal.append((self.queue, i, self.queue[i], True))
+                del self.queue[i]
+            self._set(self.requests, withdraw_request[ACCOUNT], [0, False])
+            self._update("queue_start", self.queue_start + 1)
+
+        if self.queue_start == self.queue_end:
+            self._update("queue_start", 0)
+            self._update("queue_end", 0)
+            self._update("is_accepting_withdraw_requests", True)
+
+    # Locks
+
+    def _locked_liquidity(self, issuer, id):
+        locks = self.locked_liquidity.get(issuer, [])
+        if id >= len(locks):
+            raise PoolRevert("Panic", PANIC_OUT_OF_BOUNDS)
+        if not self.is_locked(issuer, id):
+            raise PoolRevert("AlreadyUnlocked", id)
+        return locks[id]
+
+    def expiry_total(self, issuer, expiry):
+        """
+        Returns the total of an issuer's open locks of an expiry
+        """
+        return self.expiry_locked_liquidity.get((issuer, expiry), [0, 0, False])
+
+    def is_settled(self, issuer, expiry):
+        """
+        Returns whether an issuer's locks of an expiry have been settled
+        """
+        return self.settled_expiries.get((issuer, expiry), False)
+
+    def is_locked(self, issuer, id):
+        """
+        Returns whether a lock is still locked, it isn't once its expiry
+        has been settled
+        """
+        ll = self.locked_liquidity[issuer][id]
+        return ll[LOCKED] and not self.is_settled(issuer, self.lock_expiry[issuer][id])
+
+    def _release_from_expiry(self, issuer, id, tokenX_amount, premium):
+        expiry = self.lock_expiry[issuer][id]
+        total = self.expiry_locked_liquidity[(issuer, expiry)]
+        self._setitem(total, AMOUNT, _sub(total[AMOUNT], tokenX_amount))
+        self._setitem(total, PREMIUM, _sub(total[PREMIUM], premium))
+
+    @_atomic
+    def lock(self, sender, id, tokenX_amount, premium):
+        self._only_issuer(sender)
+        locks = self.locked_liquidity.get(sender, [])
+        if id != len(locks):
+            raise PoolRevert("WrongLockID", id, len(locks))
+        locked_amount = _add(self.locked_amount, tokenX_amount)
+        if locked_amount > self.total_tokenX_balance():
+            raise PoolRevert(
+                "AmountTooLarge", locked_amount, self.total_tokenX_balance()
+            )
+        expiry = self.fixed_expiry
+        if self.is_settled(sender, expiry):
+            raise PoolRevert("ExpirySettled", expiry)
+
+        self._update("balance", _add(self.balance, premium))
+        if sender not in self.locked_liquidity:
+            self._set(self.locked_liquidity, sender, locks)
+            self._set(self.lock_expiry, sender, [])
+        locks.append([tokenX_amount, premium, True])
+        self._journal.append((locks, None, None, True))
+        self.lock_expiry[sender].append(expiry)
+        self._journal.append((self.lock_expiry[sender], None, None, True))
+        total = self.expiry_total(sender, expiry)
+        self._set(
+            self.expiry_locked_liquidity,
+            (sender, expiry),
+            [_add(total[AMOUNT], tokenX_amount), _add(total[PREMIUM], premium), True],
+        )
+        self._update("locked_premium", _add(self.locked_premium, premium))
+        self._update("locked_amount", locked_amount)
+
+    @_atomic
+    def change_lock(self, sender, id, tokenX_amount, premium):
+        self._only_issuer(sender)
+        ll = self._locked_liquidity(sender, id)
+        if ll[PREMIUM] > premium:
+            self._send_tokenX(ll[PREMIUM] - premium)
+        total = self.expiry_locked_liquidity[(sender, self.lock_expiry[sender][id])]
+        self._setitem(total, PREMIUM, _add(_sub(total[PREMIUM], ll[PREMIUM]), premium))
+        self._setitem(
+            total, AMOUNT, _add(_sub(total[AMOUNT], ll[AMOUNT]), tokenX_amount)
+        )
+        self._update(
+            "locked_premium", _add(_sub(self.locked_premium, ll[PREMIUM]), premium)
+        )
+        self._update(
+            "locked_amount", _add(_sub(self.locked_amount, ll[AMOUNT]), tokenX_amount)
+        )
+        self._setitem(ll, PREMIUM, premium)
+        self._setitem(ll, AMOUNT, tokenX_amount)
+
+    def _unlock(self, sender, id):
+        self._only_issuer(sender)
+        ll = self._locked_liquidity(sender, id)
+        self._setitem(ll, LOCKED, False)
+        self._release_from_expiry(sender, id, ll[AMOUNT], ll[PREMIUM])
+        self._update("locked_premium", _sub(self.locked_premium, ll[PREMIUM]))
+        self._update("locked_amount", _sub(self.locked_amount, ll[AMOUNT]))
+        return ll[PREMIUM]
+
+    @_atomic
+    def unlock(self, sender, id):
+        self._unlock(sender, id)
+
+    @_atomic
+    def unlock_without_profit(self, sender, id):
+        self._unlock(sender, id)
+
+    @_atomic
+    def send(self, sender, id, to, tokenX_amount):
+        self._only_issuer(sender)
+        ll = self._locked_liquidity(sender, id)
+        if to == ZERO_ADDRESS:
+            raise PoolRevert("ZeroAddress")
+        self._setitem(ll, LOCKED, False)
+        self._release_from_expiry(sender, id, ll[AMOUNT], ll[PREMIUM])
+        self._update("locked_premium", _sub(self.locked_premium, ll[PREMIUM]))
+        self._update("locked_amount", _sub(self.locked_amount, ll[AMOUNT]))
+        self._send_tokenX(min(tokenX_amount, ll[AMOUNT]))
+
+    @_atomic
+    def send_partial(
+        self, sender, id, to, tokenX_amount, unlocked_amount, unlocked_premium
+    ):
+        self._only_issuer(sender)
+        ll = self._locked_liquidity(sender, id)
+        if to == ZERO_ADDRESS:
+            raise PoolRevert("ZeroAddress")
+        self._setitem(ll, AMOUNT, _sub(ll[AMOUNT], unlocked_amount))
+        self._setitem(ll, PREMIUM, _sub(ll[PREMIUM], unlocked_premium))
+        self._release_from_expiry(sender, id, unlocked_amount, unlocked_premium)
+        self._update("locked_premium", _sub(self.locked_premium, unlocked_premium))
+        self._update("locked_amount", _sub(self.locked_amount, unlocked_amount))
+        self._send_tokenX(min(tokenX_amount, unlocked_amount))
+
+    @_atomic
+    def settle(self, sender, expiration, tokenX_amount, premium, payout):
+        self._only_issuer(sender)
+        if self.is_settled(sender, expiration):
+            raise PoolRevert("ExpirySettled", expiration)
+        total = self.expiry_total(sender, expiration)
+        if (tokenX_amount, premium) != (total[AMOUNT], total[PREMIUM]):
+            raise PoolRevert(
+                "SettleMismatch", tokenX_amount, premium, total[AMOUNT], total[PREMIUM]
+            )
+        self._set(
+            self.expiry_locked_liquidity,
+            (sender, expiration),
+            [0, 0, False],
+        )
+        self._set(self.settled_expiries, (sender, expiration), True)
+        self._update("locked_premium", _sub(self.locked_premium, premium))
+        self._update("locked_amount", _sub(self.locked_amount, tokenX_amount))
+        transfer_amount = min(payout, tokenX_amount)
+        if transfer_amount > 0:
+            self._send_tokenX(transfer_amount)
+
+    # Tracing
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+    def apply(self, operation):
+        """
+        Applies an operation, a tuple of its name, its sender and its
+        arguments, and returns its result
+        """
+        (name, *args) = operation
+        return getattr(self, name)(*args)
+
+    def snapshot(self, accounts):
+        """
+        Returns the state of the pool and of the accounts, as read from the
+        contract by `contract_snapshot`
+        """
+        state = {
+            key: value
+            for (key, value) in self.state.items()
+            if key not in ("queue_start", "queue_end")
+        }
+        state["queue"] = (self.queue_start, self.queue_end)
+        state["requests"] = [
+            tuple(self.queue.get(i, [0, 0, ZERO_ADDRESS]))
+            for i in range(self.queue_start, self.queue_end)
+        ]
+        state["accounts"] = [
+            (
+                self.balance_of(account),
+                tuple(self.requests.get(account, [0, False])),
+            )
+            for account in accounts
+        ]
+        # Each lock with its expiry
+        state["locks"] = {
+            issuer: [
+                tuple(ll) + (expiry,)
+                for (ll, expiry) in zip(locks, self.lock_expiry[issuer])
+            ]
+            for (issuer, locks) in sorted(self.locked_liquidity.items())
+        }
+        return state
+
+
+class RandomOperations:
+    """
+    Generates random operations for a model, mostly ones that the pool
+    accepts, in rounds that end with their locks unlocked and a rollOver
+    """
+
+    def __init__(self, rng, lps, issuer, admin):
+        self.rng = rng
+        self.lps = lps
+        self.issuer = issuer
+        self.admin = admin
+        # Every lock before this one is unlocked
+        self.first_open = 0
+        self.last_result = None
+
+    def _open_locks(self, model, locks):
+        def is_open(id):
+            return model.is_locked(self.issuer, id)
+
+        while self.first_open < len(locks) and not is_open(self.first_open):
+            self.first_open += 1
+        # The oldest open lock and the recent ones, so that a long trace
+        # doesn't slow down
+        recent = range(max(len(locks) - 50, self.first_open + 1), len(locks))
+        open_locks = [i for i in recent if is_open(i)]
+        if self.first_open < len(locks):
+            open_locks.append(self.first_open)
+        return open_locks
+
+    def __call__(self, model):
+        rng = self.rng
+        lp = rng.choice(self.lps)
+        (issuer, admin) = (self.issuer, self.admin)
+        locks = model.locked_liquidity.get(issuer, [])
+        open_locks = self._open_locks(model, locks)
+        amount = rng.randint(1, rng.choice([1, 10**6, 10**15, 10**17, 10**18]))
+        kind = rng.random()
+
+        if not model.is_accepting_withdraw_requests and kind < 0.8:
+            if isinstance(self.last_result, PoolRevert):
+                # The queue is stuck on a request larger than the available
+                # balance, release the locks or add liquidity
+                if open_locks:
+                    return ("unlock", issuer, self.first_open)
+                return ("provide", lp, 10**18, 0)
+            return ("process_withdraw_requests", admin, rng.randint(1, 5))
+        if model.now > model.fixed_expiry:
+            # The round is over, unlock or settle everything and roll over
+            if open_locks and kind < 0.1:
+                total = model.expiry_total(issuer, model.fixed_expiry)
+                # Sometimes not the locked totals
+                (locked, premium) = (total[AMOUNT], total[PREMIUM] + (kind < 0.01))
+                payout = rng.randint(0, 2 * premium)
+                return ("settle", issuer, model.fixed_expiry, locked, premium, payout)
+            if open_locks:
+                return ("unlock", issuer, self.first_open)
+            return ("roll_over", admin, model.now + 7 * ONE_DAY)
+        if kind < 0.2:
+            return ("provide", lp, amount, 0)
+        if kind < 0.35:
+            share = model.share_of(lp)
+            return ("withdraw", lp, rng.randint(1, max(share, 1)))
+        if kind < 0.4:
+            return ("process_withdraw_requests", admin, rng.randint(1, 5))
+        if kind < 0.42 and not model.requests.get(lp, [0, False])[1]:
+            # A request of an LP without LP tokens would block the queue
+            return ("transfer", lp, rng.choice(self.lps), model.balance_of(lp) // 2)
+        if kind < 0.55 or not open_locks:
+            locked = rng.randint(0, min(model.available_balance() // 10, 10**19))
+            premium = int(locked * rng.uniform(0.01, 0.1))
+            return ("lock", issuer, len(locks), locked, premium)
+        if kind < 0.57:
+            return ("sleep", model.fixed_expiry - model.now + ONE_DAY)
+
+        lock_id = rng.choice(open_locks)
+        (locked, premium, _) = locks[lock_id]
+        # Mostly payouts about the size of the premium, sometimes the whole
+        # collateral
+        payout = rng.randint(0, 2 * premium if rng.random() < 0.95 else locked)
+        if kind < 0.7:
+            return ("unlock", issuer, lock_id)
+        if kind < 0.75:
+            return ("unlock_without_profit", issuer, lock_id)
+        if kind < 0.85:
+            return ("send", issuer, lock_id, lp, payout)
+        if kind < 0.95:
+            part = rng.randint(0, locked)
+            return (
+                "send_partial",
+                issuer,
+                lock_id,
+                lp,
+                payout * part // max(locked, 1),
+                part,
+                premium * part // max(locked, 1),
+            )
+        return ("change_lock", issuer, lock_id, locked // 2, premium // 2)
+
+
+def random_trace(rng, model, lps, issuer, admin, count):
+    """
+    Applies `count` random operations to the model and returns them with
+    their results, reverted operations have their PoolRevert as the result
+    """
+    trace = []
+    random_operation = RandomOperations(rng, lps, issuer, admin)
+    for _ in range(count):
+        operation = random_operation(model)
+        try:
+            result = model.apply(operation)
+        except PoolRevert as error:
+            result = error
+        random_operation.last_result = result
+        trace.append((operation, result))
+    return trace
+
+
+# Differential replay against a deployed pool
+
+CONTRACT_FUNCTIONS = {
+    "provide": "provide",
+    "withdraw": "withdraw",
+    "admin_withdraw": "adminWithdraw",
+    "process_withdraw_requests": "processWithdrawRequests",
+    "transfer": "transfer",
+    "set_max_liquidity": "setMaxLiquidity",
+    "set_pool_state": "setPoolState",
+    "roll_over": "rollOver",
+    "lock": "lock",
+    "change_lock": "changeLock",
+    "unlock": "unlock",
+    "unlock_without_profit": "unlockWithoutProfit",
+    "send": "send",
+    "send_partial": "sendPartial",
+    "settle": "settle",
+}
+PANIC_MESSAGES = {
+    "Integer overflow",
+    "Integer underflow",
+    "Division or modulo by zero",
+    "Index out of range",
+}
+
+
+def revert_name(error, errors):
+    """
+    Returns the name the model uses for the revert of a transaction
+    """
+    from scripts.error_decoder import decode_revert
+
+    message = error.revert_msg or ""
+    if message.startswith("typed error: "):
+        return decode_revert(message[len("typed error: ") :], errors)[0]
+    name = message.split(":")[0]
+    if name in {e["name"] for e in errors.values()}:
+        return name
+    if not message:
+        return "Revert"
+    if message in PANIC_MESSAGES or message.startswith("Panic"):
+        return "Panic"
+    return "Error"
+
+
+def contract_snapshot(pool, tokenX, accounts, issuers):
+    """
+    Returns the state of a deployed pool in the format of PoolModel.snapshot
+    """
+    from brownie.exceptions import VirtualMachineError
+
+    (queue_start, queue_end) = (pool.queueStart(), pool.queueEnd())
+    locks = {}
+    for issuer in sorted(issuers):
+        locks[issuer] = []
+        while True:
+            try:
+                id = len(locks[issuer])
+                ll = pool.lockedLiquidity(issuer, id)
+            except VirtualMachineError:
+                break
+            locks[issuer].append(tuple(ll) + (pool.lockExpiry(issuer, id),))
+    return {
+        "balance": tokenX.balanceOf(pool),
+        "total_supply": pool.totalSupply(),
+        "locked_amount": pool.lockedAmount(),
+        "locked_premium": pool.lockedPremium(),
+        "max_liquidity": pool.maxLiquidity(),
+        "fixed_expiry": pool.fixedExpiry(),
+        "current_round": pool.currentRound(),
+        "has_pool_ended": pool.hasPoolEnded(),
+        "is_accepting_withdraw_requests": pool.isAcceptingWithdrawRequests(),
+        "queue": (queue_start, queue_end),
+        "requests": [
+            tuple(pool.WithdrawRequestQueue(i)) for i in range(queue_start, queue_end)
+        ],
+        "accounts": [
+            (pool.balanceOf(account), tuple(pool.AddressToWithdrawRequest(account)))
+            for account in accounts
+        ],
+        "locks": {issuer: locks[issuer] for issuer in locks if locks[issuer]},
+    }
+
+
+def model_of(pool, tokenX, issuers, now):
+    """
+    Returns a model of a pool that no one has provided to yet
+    """
+    model = PoolModel(pool.owner(), pool.fixedExpiry(), pool.maxLiquidity(), now)
+    model.state["balance"] = tokenX.balanceOf(pool)
+    model.state["current_round"] = pool.currentRound()
+    model.issuers = set(issuers)
+    return model
+
+
+def replay(trace, pool, tokenX, model, accounts, check_state=True):
+    """
+    Applies the operations of a trace to the pool and the model and checks
+    that they agree after every one, returns the number of reverts
+    """
+    from brownie import chain
+    from brownie.exceptions import VirtualMachineError
+
+    from scripts.error_decoder import parse_errors
+
+    errors = parse_errors()
+    custom_errors = {error["name"] for error in errors.values()}
+    reverts = 0
+    for (operation, _) in trace:
+        (name, *args) = operation
+        model.now = chain.time()
+        if name == "sleep":
+            chain.sleep(args[0])
+            chain.mine(1)
+            continue
+        try:
+            expected = model.apply(operation)
+        except PoolRevert as error:
+            expected = error
+
+        (sender, *params) = args
+        function = getattr(pool, CONTRACT_FUNCTIONS[name])
+        try:
+            tx = function(*params, {"from": sender})
+            result = tx.return_value
+        except VirtualMachineError as error:
+            result = PoolRevert(revert_name(error, errors))
+
+        if isinstance(expected, PoolRevert) or isinstance(result, PoolRevert):
+            reverts += 1
+            assert isinstance(result, PoolRevert) and isinstance(
+                expected, PoolRevert
+            ), f"{operation}: the pool returned {result}, the model {expected}"
+            # Revert strings and panics only have to be reverts of their own
+            if expected.name in custom_errors or result.name in custom_errors:
+                assert result.name == expected.name, (
+                    f"{operation}: the pool reverted with {result.name}, "
+                    f"the model with {expected.name}"
+                )
+        elif name == "provide":
+            assert result == expected, f"{operation}: minted {result}, not {expected}"
+
+        if check_state:
+            issuers = sorted(model.issuers)
+            assert contract_snapshot(pool, tokenX, accounts, issuers) == (
+                model.snapshot(accounts)
+            ), f"The state differs after {operation}"
+    return reverts
+
+
+def main(operations=1000000, seed=0):
+    """
+    Runs random operations on the model and prints the rate
+    """
+    rng = random.Random(int(seed))
+    lps = [f"0x{i:040x}" for i in range(1, 11)]
+    (admin, issuer) = ("0x" + "a" * 40, "0x" + "b" * 40)
+    model = PoolModel(admin, fixed_expiry=7 * ONE_DAY)
+    model.issuers.add(issuer)
+
+    start = time.perf_counter()
+    trace = random_trace(rng, model, lps, issuer, admin, int(operations))
+    elapsed = time.perf_counter() - start
+    reverts = sum(isinstance(result, PoolRevert) for (_, result) in trace)
+    print(
+        f"{len(trace)} operations in {elapsed:.1f}s, "
+        f"{len(trace) / elapsed * 60:,.0f} per minute, {reverts} reverted"
+    )
+    return trace
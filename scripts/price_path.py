@@ -0,0 +1,85 @@
+"""
+Loads a price path into FakePriceProvider in a few transactions
+
+A path is a list of prices with a factor of 1e8, optionally with the
+timestamp of each one. It is read from a list or from a CSV file with a
+`price` column and an optional `timestamp` column, prices in USD:
+
+    timestamp,price
+    1650000000,401.25
+    1650003600,399.80
+
+The whole path can be written as rounds, for settlement against historical
+rounds, or scripted and replayed one price at a time with `advance`:
+
+    (timestamps, prices) = read_price_path("prices.csv")
+    round_ids = load_rounds(pp, prices, timestamps, sender=accounts[0])
+
+    script_prices(pp, prices, sender=accounts[0])
+    pp.advance(1, {"from": accounts[0]})
+"""
+import csv
+from decimal import Decimal
+
+BATCH_SIZE = 200
+PRICE_DECIMALS = 8
+
+
+def read_price_path(path, decimals=PRICE_DECIMALS):
+    """
+    Returns the timestamps, None without a timestamp column, and the prices
+    of a CSV file, scaled by 10**decimals
+    """
+    with open(path, newline="") as f:
+        rows = list(csv.reader(f))
+    header = [column.strip().lower() for column in rows[0]]
+    if "price" in header:
+        rows = rows[1:]
+    else:
+        header = ["timestamp", "price"] if len(header) == 2 else ["price"]
+    price_column = header.index("price")
+    prices = [int(Decimal(row[price_column].strip()).scaleb(decimals)) for row in rows]
+    if "timestamp" not in header:
+        return (None, prices)
+    timestamp_column = header.index("timestamp")
+    return ([int(row[timestamp_column]) for row in rows], prices)
+
+
+def path_timestamps(start, interval, length):
+    """
+    Returns evenly spaced timestamps for a path without them
+    """
+    return [start + i * interval for i in range(length)]
+
+
+def _batches(length, batch_size):
+    for start in range(0, length, batch_size):
+        yield slice(start, start + batch_size)
+
+
+def load_rounds(
+    pp, prices, timestamps, first_round_id=1, batch_size=BATCH_SIZE, sender=None
+):
+    """
+    Writes the path as consecutive rounds starting at `first_round_id` and
+    returns their ids
+    """
+    if len(prices) != len(timestamps):
+        raise ValueError("Every price needs a timestamp")
+    prices = [int(price) for price in prices]
+    round_ids = list(range(first_round_id, first_round_id + len(prices)))
+    for batch in _batches(len(prices), batch_size):
+        pp.setRoundDataBatch(
+            round_ids[batch], timestamps[batch], prices[batch], {"from": sender}
+        )
+    return round_ids
+
+
+def script_prices(pp, prices, first_round_id=1, batch_size=BATCH_SIZE, sender=None):
+    """
+    Appends the path to the scripted prices of the provider, each `advance`
+    then records the next price as a round at the current timestamp
+    """
+    prices = [int(price) for price in prices]
+    for batch in _batches(len(prices), batch_size):
+        pp.scriptPrices(first_round_id, prices[batch], {"from": sender})
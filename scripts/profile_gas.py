@@ -0,0 +1,232 @@
+"""
+Per-function gas profile of the main flows of the options and the pool
+
+Runs create with both payment methods, split, merge, both transferFrom
+variants, exercise, unlock, provide and processWithdrawRequests on a local
+chain. It attributes the gas of every opcode in their traces to the contract
+executing it and to the stack of functions, external and internal, it was
+executed in.
+
+    brownie run profile_gas
+    brownie run profile_gas main reports/gas_profile.json
+
+The JSON report has, for every flow, the gas by contract, the self and total
+gas of every function, and the gas by stack. The stacks are also written in
+the folded format of flame graph tools next to it, e.g. reports/gas_profile.folded:
+
+    create (TokenX);BufferUSDCTokenXOptions.create;...;OptionMath._N 5120
+
+which flamegraph.pl or speedscope render as a flame graph.
+"""
+import json
+from collections import defaultdict
+from pathlib import Path
+
+from brownie import (
+    IBFR,
+    WNEAR,
+    ABDKMath64x64,
+    BufferIBFRPoolV2,
+    BufferUSDCTokenXOptions,
+    FakePriceProvider,
+    FeeCalculator,
+    OptionConfig,
+    OptionMath,
+    accounts,
+    chain,
+)
+
+REPORT_PATH = Path("reports/gas_profile.json")
+ONE_DAY = 86400
+TOP_FUNCTIONS = 10
+# Gas not spent in any opcode: the intrinsic gas, calldata and refunds
+UNATTRIBUTED = "[transaction]"
+
+
+def step_costs(trace):
+    """
+    Returns the gas of every step of a trace, a call's own gas excludes the
+    gas of the steps of the frame it opened
+    """
+    count = len(trace)
+    # Step at which execution continues after each call that opened a frame
+    resumes = {}
+    calls = []
+    for i in range(count):
+        depth = trace[i]["depth"]
+        while calls and trace[calls[-1]]["depth"] >= depth:
+            resumes[calls.pop()] = i
+        if i + 1 < count and trace[i + 1]["depth"] > depth:
+            calls.append(i)
+
+    costs = [0] * count
+    suffix = [0] * (count + 1)
+    for i in reversed(range(count)):
+        step = trace[i]
+        if i in resumes:
+            j = resumes[i]
+            costs[i] = step["gas"] - trace[j]["gas"] - (suffix[i + 1] - suffix[j])
+        elif i + 1 < count and trace[i + 1]["depth"] == step["depth"]:
+            costs[i] = step["gas"] - trace[i + 1]["gas"]
+        else:
+            # Last step of a frame
+            costs[i] = step["gasCost"]
+        suffix[i] = suffix[i + 1] + costs[i]
+    return costs
+
+
+def folded_stacks(trace, costs, root):
+    """
+    Returns the gas of every stack of functions, as "root;fn;fn" strings
+    """
+    stacks = defaultdict(int)
+    # (depth, jumpDepth, fn) of the active functions
+    frames = []
+    for (step, cost) in zip(trace, costs):
+        key = (step["depth"], step.get("jumpDepth", 0))
+        while frames and frames[-1][:2] > key:
+            frames.pop()
+        if frames and frames[-1][:2] == key:
+            frames[-1] = key + (step["fn"],)
+        else:
+            frames.append(key + (step["fn"],))
+        stacks[";".join([root] + [frame[2] for frame in frames])] += cost
+    return dict(stacks)
+
+
+def profile(tx, root):
+    """
+    Returns the gas of a transaction by contract, by function and by stack
+    """
+    trace = tx.trace
+    costs = step_costs(trace)
+    unattributed = tx.gas_used - sum(costs)
+
+    contracts = defaultdict(int)
+    for (step, cost) in zip(trace, costs):
+        contracts[step.get("contractName") or step["fn"].split(".")[0]] += cost
+    contracts[UNATTRIBUTED] += unattributed
+
+    stacks = folded_stacks(trace, costs, root)
+    functions = defaultdict(lambda: {"self": 0, "total": 0})
+    for (stack, gas) in stacks.items():
+        names = stack.split(";")[1:]
+        functions[names[-1]]["self"] += gas
+        for name in set(names):
+            functions[name]["total"] += gas
+    return {
+        "gas_used": tx.gas_used,
+        "unattributed": unattributed,
+        "contracts": dict(contracts),
+        "functions": dict(functions),
+        "stacks": stacks,
+    }
+
+
+def deploy(owner):
+    """
+    Deploys the contracts like the tests' fixture does
+    """
+    tokenX = IBFR.deploy({"from": owner})
+    usdc = WNEAR.deploy({"from": owner})
+    pool = BufferIBFRPoolV2.deploy(tokenX, chain.time() + 7 * ONE_DAY, {"from": owner})
+    pp = FakePriceProvider.deploy(int(400e8), {"from": owner})
+    for library in [ABDKMath64x64, OptionMath, FeeCalculator]:
+        if not len(library):
+            library.deploy({"from": owner})
+    config = OptionConfig.deploy(accounts[7], 110e2, int(395e8), pool, {"from": owner})
+    options = BufferUSDCTokenXOptions.deploy(
+        tokenX, pp, pool, config, usdc, {"from": owner}
+    )
+    pool.grantRole(pool.OPTION_ISSUER_ROLE(), options, {"from": owner})
+    return (tokenX, usdc, pool, options)
+
+
+def run_flows(tokenX, usdc, pool, options, owner, holder, receiver):
+    """
+    Runs every flow once and returns their transactions by flow name
+    """
+    amount = int(1e18) // 1000
+    txs = {}
+    tokenX.approve(pool, int(3e18), {"from": owner})
+    txs["provide"] = pool.provide(int(3e18), 0, {"from": owner})
+    pool.setProjectOwner(accounts[8], {"from": owner})
+    options.approvePoolToTransferTokenX({"from": owner})
+
+    # The options contract pays the tokenX of USDC purchases
+    tokenX.transfer(options, int(1e18), {"from": owner})
+    tokenX.transfer(holder, int(1e18), {"from": owner})
+    usdc.transfer(holder, int(1e22), {"from": owner})
+    tokenX.approve(options, int(1e18), {"from": holder})
+    usdc.approve(options, int(1e22), {"from": holder})
+    txs["create (TokenX)"] = options.create(amount, receiver, "", 1, {"from": holder})
+    txs["create (USDC)"] = options.create(amount, receiver, "", 0, {"from": holder})
+    option_id = txs["create (TokenX)"].return_value
+    target_id = txs["create (USDC)"].return_value
+
+    txs["split"] = options.split(option_id, [300000], {"from": holder})
+    txs["merge"] = options.merge(
+        list(txs["split"].return_value), option_id, {"from": holder}
+    )
+    txs["transferFrom (new option)"] = options.transferFrom[
+        "address,address,uint256,uint256"
+    ](holder, receiver, option_id, 200000, {"from": holder})
+    txs["transferFrom (target option)"] = options.transferFrom[
+        "address,address,uint256,uint256,uint256"
+    ](
+        holder,
+        receiver,
+        target_id,
+        txs["transferFrom (new option)"].return_value,
+        100000,
+        {"from": holder},
+    )
+    txs["exercise"] = options.exercise(option_id, {"from": holder})
+    pool.withdraw(int(1e18), {"from": owner})
+
+    chain.sleep(pool.fixedExpiry() - chain.time() + ONE_DAY)
+    chain.mine(1)
+    unlocks = [
+        options.unlock(i, {"from": owner})
+        for i in range(options.nextTokenId())
+        if options.options(i)["state"] == 1
+    ]
+    txs["unlock"] = unlocks[0]
+    pool.rollOver(chain.time() + 7 * ONE_DAY, {"from": owner})
+    txs["processWithdrawRequests"] = pool.processWithdrawRequests(1, {"from": owner})
+    return txs
+
+
+def write_report(profiles, path=REPORT_PATH):
+    """
+    Writes the profiles as JSON and their stacks in the folded format
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(profiles, indent=2) + "\n")
+    with open(path.with_suffix(".folded"), "w") as f:
+        for (flow, result) in profiles.items():
+            for (stack, gas) in result["stacks"].items():
+                if gas > 0:
+                    f.write(f"{stack} {gas}\n")
+            if result["unattributed"] > 0:
+                f.write(f"{flow};{UNATTRIBUTED} {result['unattributed']}\n")
+
+
+def main(report_path=REPORT_PATH):
+    owner = accounts[0]
+    (tokenX, usdc, pool, options) = deploy(owner)
+    txs = run_flows(tokenX, usdc, pool, options, owner, accounts[1], accounts[2])
+    profiles = {flow: profile(tx, flow) for (flow, tx) in txs.items()}
+    write_report(profiles, report_path)
+
+    for (flow, result) in profiles.items():
+        print(f"\n{flow}: {result['gas_used']} gas")
+        for (contract, gas) in sorted(
+            result["contracts"].items(), key=lambda item: -item[1]
+        ):
+            print(f"  {contract:<44}{gas:>10}")
+        hot_spots = sorted(result["functions"].items(), key=lambda i: -i[1]["self"])
+        for (function, gas) in hot_spots[:TOP_FUNCTIONS]:
+            print(f"    {function:<42}{gas['self']:>10}{gas['total']:>10}")
+    return profiles
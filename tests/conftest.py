@@ -109,3 +109,37 @@ def contracts(
         bufferPp,
         european_usdc_options,
     )
+
+
+@pytest.fixture(scope="module")
+def lens(BufferOptionsLens, accounts):
+    return BufferOptionsLens.deploy({"from": accounts[0]})
+
+
+@pytest.fixture(scope="module")
+def create_option(chain):
+    """
+    Returns a function that buys an option for `minter`, in the fixed strike
+    series unless `series_id` is given, and returns its id
+    """
+
+    def create(
+        options, pool, config, tokenX, amount, owner, minter, referrer, series_id=0
+    ):
+        period = pool.fixedExpiry() - chain.time()
+        if series_id == 0:
+            (total_fee, _, _) = options.fees(period, amount, config.fixedStrike(), 2)
+        else:
+            (total_fee, _, _) = options.seriesFees(series_id, period, amount)
+        tokenX.transfer(minter, total_fee, {"from": owner})
+        tokenX.approve(options.address, total_fee, {"from": minter})
+        options.approvePoolToTransferTokenX({"from": owner})
+        if series_id == 0:
+            tx = options.create(amount, referrer, "test", 1, {"from": minter})
+        else:
+            tx = options.createInSeries(
+                series_id, amount, referrer, "test", 1, {"from": minter}
+            )
+        return tx.return_value
+
+    return create
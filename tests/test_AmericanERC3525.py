@@ -79,7 +79,7 @@ class OptionERC3525Testing(object):
     def verify_creation(self, minter):
         totalTokenXBalance = self.generic_pool.totalTokenXBalance()
         if totalTokenXBalance == 0:
-            with brownie.reverts("O8"):
+            with brownie.reverts(revert_pattern="PoolEmpty:.*"):
                 self.tokenX_options.create(
                     self.amount, self.user_1, self.meta, 1, {"from": self.owner}
                 )
@@ -130,11 +130,11 @@ class OptionERC3525Testing(object):
         initial_locked_amount = self.generic_pool.lockedAmount()
         input_array = [unit_1, unit_2, unit_3]
 
-        with brownie.reverts("N2"):
+        with brownie.reverts(revert_pattern="NotOwnerNorApproved:.*"):
             self.tokenX_options.split(
                 self.option_id, [unit_1, unit_2, unit_3], {"from": self.user_2}
             )
-        with brownie.reverts("N1"):
+        with brownie.reverts(revert_pattern="EmptySplitUnits:.*"):
             self.tokenX_options.split(self.option_id, [], {"from": self.user_2})
 
         option_units = self.tokenX_options.unitsInToken(self.option_id)
@@ -223,11 +223,11 @@ class OptionERC3525Testing(object):
 
         input_array = merge_ids
 
-        with brownie.reverts("N5"):
+        with brownie.reverts(revert_pattern="NotOwnerNorApproved:.*"):
             self.tokenX_options.merge(input_array, target_id, {"from": self.referrer})
-        with brownie.reverts("N4"):
+        with brownie.reverts(revert_pattern="EmptyOptionIDs:.*"):
             self.tokenX_options.merge([], target_id, {"from": self.option_holder})
-        with brownie.reverts("N6"):
+        with brownie.reverts(revert_pattern="SelfMerge:.*"):
             self.tokenX_options.merge(
                 input_array, input_array[1], {"from": self.option_holder}
             )
@@ -235,6 +235,7 @@ class OptionERC3525Testing(object):
         former_target_option_detail = self.tokenX_options.options(target_id)
         total_amount = former_target_option_detail[2]
         total_locked_amount = former_target_option_detail[3]
+        former_option_details = [self.tokenX_options.options(i) for i in input_array]
         merge_function = self.tokenX_options.merge(
             input_array, target_id, {"from": self.option_holder}
         )
@@ -245,10 +246,13 @@ class OptionERC3525Testing(object):
         ), "Option slots should be the same"
 
         for count, unit in enumerate(input_array):
-            option_detail = self.tokenX_options.options(unit)
-            self.tokenX_options.unitsInToken(unit)
+            option_detail = former_option_details[count]
             total_amount += option_detail[2]
             total_locked_amount += option_detail[3]
+
+            # Merged option's storage should be cleared
+            assert self.tokenX_options.options(unit)[2] == 0, "Option not cleared"
+            assert self.tokenX_options.unitsInToken(unit) == 0, "Units not cleared"
             merge_event = merge_function.events["Merge"][count]
 
             # Original token id should be burnt
@@ -278,7 +282,7 @@ class OptionERC3525Testing(object):
         transfer_units = 1000
         units = self.tokenX_options.unitsInToken(unit_3)
         former_option_detail = self.tokenX_options.options(unit_3)
-        with brownie.reverts("N9"):
+        with brownie.reverts(revert_pattern="SourceOwnerMismatch:.*"):
             self.tokenX_options.transferFrom(
                 self.referrer,
                 self.user_2,
@@ -286,7 +290,7 @@ class OptionERC3525Testing(object):
                 transfer_units,
                 {"from": self.referrer},
             )
-        with brownie.reverts("N10"):
+        with brownie.reverts(revert_pattern="TransferToZeroAddress:.*"):
             self.tokenX_options.transferFrom(
                 self.option_holder,
                 ADDRESS_0,
@@ -400,13 +404,13 @@ class OptionERC3525Testing(object):
         self.chain.snapshot()
         option_owner = self.tokenX_options.ownerOf(self.option_id)
 
-        with brownie.reverts("O4"):
+        with brownie.reverts(revert_pattern="OptionNotExpired:.*"):
             self.tokenX_options.unlock(self.option_id, {"from": option_owner})
 
         self.chain.sleep(self.period + ONE_DAY)
         self.chain.mine(1)
 
-        with brownie.reverts("O13"):
+        with brownie.reverts(revert_pattern="OptionExpired:.*"):
             self.tokenX_options.exercise(self.option_id, {"from": option_owner})
 
         option_details = self.tokenX_options.options(self.option_id)
@@ -431,10 +435,38 @@ class OptionERC3525Testing(object):
         assert unlock_events["Profit"][0]["amount"] == option_details[4], "Wrong profit"
         assert unlock_events, "Should unlock on expiry"
         assert final_option_details[0] == 3, "Option not expired"
+        assert final_option_details[2:6] == (0, 0, 0, 0), "Option not cleared"
         print("unlocked", self.option_id)
 
         self.chain.revert()
 
+    def verify_burning(self, id):
+        self.chain.snapshot()
+        option_owner = self.tokenX_options.ownerOf(id)
+        option_details = self.tokenX_options.options(id)
+        initial_locked_premium = self.generic_pool.lockedPremium()
+        initial_locked_amount = self.generic_pool.lockedAmount()
+
+        with brownie.reverts(revert_pattern="NotOptionOwner:.*"):
+            self.tokenX_options.burn(id, {"from": self.accounts[7]})
+        burn = self.tokenX_options.burn(id, {"from": option_owner})
+
+        assert (
+            initial_locked_amount - self.generic_pool.lockedAmount()
+            == option_details[3]
+        ), "Wrong amount unlocked"
+        assert (
+            initial_locked_premium - self.generic_pool.lockedPremium()
+            == option_details[4]
+        ), "Wrong premium unlocked"
+        assert burn.events["Expire"]["premium"] == option_details[4]
+        assert self.tokenX_options.exists(id) == False, "Option not burnt"
+        final_option_details = self.tokenX_options.options(id)
+        assert final_option_details[0] == 3, "Option not expired"
+        assert final_option_details[2:6] == (0, 0, 0, 0), "Option not cleared"
+
+        self.chain.revert()
+
     def verify_exercise(self):
 
         option_owner = self.tokenX_options.ownerOf(self.option_id)
@@ -462,6 +494,71 @@ class OptionERC3525Testing(object):
         ) == profit, "pool sent wrong profit"
         print("exercised", self.option_id)
 
+    def verify_exercise_units(self, id):
+        self.chain.snapshot()
+        option_owner = self.tokenX_options.ownerOf(id)
+        option = self.tokenX_options.options(id)
+        total_units = self.tokenX_options.unitsInToken(id)
+        units = total_units // 3
+        current_price = self.pp.getUsdPrice()
+        amount = option["amount"] * units // total_units
+        locked_amount = option["lockedAmount"] * units // total_units
+        premium = option["premium"] * units // total_units
+        profit = min(
+            (current_price - option["strike"]) * amount // current_price,
+            locked_amount,
+        )
+
+        with brownie.reverts(revert_pattern="NotEligibleToExercise:.*"):
+            self.tokenX_options.exerciseUnits(id, units, {"from": self.accounts[7]})
+        with brownie.reverts(revert_pattern="InvalidUnits:.*"):
+            self.tokenX_options.exerciseUnits(id, 0, {"from": option_owner})
+        with brownie.reverts(revert_pattern="InvalidUnits:.*"):
+            self.tokenX_options.exerciseUnits(
+                id, total_units + 1, {"from": option_owner}
+            )
+
+        initial_tokenX_balance_option_holder = self.tokenX.balanceOf(option_owner)
+        initial_tokenX_balance_pool = self.tokenX.balanceOf(self.generic_pool.address)
+        initial_locked_amount = self.generic_pool.lockedAmount()
+        initial_locked_premium = self.generic_pool.lockedPremium()
+
+        tx = self.tokenX_options.exerciseUnits(id, units, {"from": option_owner})
+
+        final_option = self.tokenX_options.options(id)
+        assert (
+            self.tokenX.balanceOf(option_owner) - initial_tokenX_balance_option_holder
+            == profit
+        ), "Wrong profit transfer"
+        assert (
+            initial_tokenX_balance_pool
+            - self.tokenX.balanceOf(self.generic_pool.address)
+            == profit
+        ), "pool sent wrong profit"
+        assert tx.events["ExerciseUnits"]["profit"] == profit, "Wrong event"
+        assert self.tokenX_options.unitsInToken(id) == total_units - units
+        assert final_option["state"] == 1, "Option should remain active"
+        assert final_option["amount"] == option["amount"] - amount
+        assert final_option["lockedAmount"] == option["lockedAmount"] - locked_amount
+        assert final_option["premium"] == option["premium"] - premium
+        assert (
+            initial_locked_amount - self.generic_pool.lockedAmount() == locked_amount
+        ), "Wrong amount released"
+        assert (
+            initial_locked_premium - self.generic_pool.lockedPremium() == premium
+        ), "Wrong premium released"
+        ll = self.generic_pool.lockedLiquidity(self.tokenX_options.address, id)
+        assert ll[0] == final_option["lockedAmount"], "Wrong locked liquidity"
+        assert ll[1] == final_option["premium"], "Wrong locked premium"
+
+        # Exercising all the remaining units should exercise the option
+        tx = self.tokenX_options.exerciseUnits(
+            id, total_units - units, {"from": option_owner}
+        )
+        assert "Exercise" in tx.events, "Option wasn't exercised"
+        assert self.tokenX_options.exists(id) == False, "Option not burnt"
+        self.chain.revert()
+
     def verify_auto_exercise(self):
         with brownie.reverts(""):
             self.tokenX_options.exercise(self.option_id, {"from": self.owner})
@@ -520,6 +617,7 @@ class OptionERC3525Testing(object):
             for i in self.split_units:
                 self.verify_temp_exercise(i)
                 self.verify_temp_unlocking(i)
+                self.verify_exercise_units(i)
 
             print("#########Merge#########")
             target_id = self.split_units[2]
@@ -542,6 +640,7 @@ class OptionERC3525Testing(object):
             self.verify_temp_exercise(new_option_id)
             self.verify_temp_unlocking(from_id)
             self.verify_temp_unlocking(new_option_id)
+            self.verify_burning(new_option_id)
 
             print("#########Unlocking#########")
             self.verify_unlocking()
@@ -34,6 +34,7 @@ def test_ibfr_pool(contracts, accounts, chain):
     assert tokenX.address == ibfr_pool.tokenX(), "Token is incorrect"
     assert f"Buffer Generic {tokenX.symbol()} LP Token" == ibfr_pool.name()
     assert f"r{tokenX.symbol()}" == ibfr_pool.symbol()
+    assert tokenX.decimals() == ibfr_pool.decimals(), "Wrong decimals"
 
     # Should verify the roles assigned by constructor
     OPTION_ISSUER_ROLE = ibfr_pool.OPTION_ISSUER_ROLE()
@@ -325,7 +326,7 @@ def test_ibfr_pool(contracts, accounts, chain):
 
         tokenX.transfer(user_2, tokenX_amount_2, {"from": owner})
 
-        with brownie.reverts("Pool: Amount is too large."):
+        with brownie.reverts(revert_pattern="AmountTooLarge:.*"):
             ibfr_pool.lock(
                 id,
                 _totalTokenXBalance + tokenX_amount_3,
@@ -359,6 +360,14 @@ def test_ibfr_pool(contracts, accounts, chain):
         assert (
             final_locked_liquidity - initial_locked_liquidity
         ) == tokenX_amount_3, "Wrong lockedAmount"
+        assert ibfr_pool.lockedLiquidity(user_2, id) == (
+            lock_amount,
+            tokenX_amount_2,
+            True,
+        ), "Wrong lockedLiquidity"
+        assert (
+            ibfr_pool.lockExpiry(user_2, id) == ibfr_pool.fixedExpiry()
+        ), "Wrong lockExpiry"
 
     # changeLock()
     old_premium = tokenX_amount_2
@@ -450,6 +459,8 @@ def test_ibfr_pool(contracts, accounts, chain):
     payouts = [int(lock_amount * 0.95), int(lock_amount * 1.05)]
     with brownie.reverts():  # Wrong role
         ibfr_pool.send(lock_ids[0], user_1, tokenX_amount_3, {"from": user_1})
+    with brownie.reverts(revert_pattern="ZeroAddress:.*"):
+        ibfr_pool.send(lock_ids[0], ADDRESS_0, tokenX_amount_3, {"from": user_2})
     for index, id in enumerate(lock_ids):
         test_send(payouts[index], id)
     print("sent profits")
@@ -465,19 +476,19 @@ def test_ibfr_pool(contracts, accounts, chain):
     assert ibfr_pool.shareOf(user_1) == expected_share, "wrong share"
 
     # processWithdrawRequests() Shouldn't Process before roll over
-    with brownie.reverts("Can't process the requests when the round is active"):
+    with brownie.reverts(revert_pattern="RoundActive:.*"):
         ibfr_pool.processWithdrawRequests(2)
 
     # rollOver()
     with brownie.reverts():  # Wrong role
         ibfr_pool.rollOver(chain.time() + ONE_DAY * 14, {"from": user_2})
-    with brownie.reverts("Can't roll over before the expiry ends"):
+    with brownie.reverts(revert_pattern="ExpiryNotOver:.*"):
         ibfr_pool.rollOver(chain.time() + ONE_DAY * 14, {"from": owner})
 
     chain.snapshot()
     chain.sleep(fixedExpiry - chain.time() + ONE_DAY)
     chain.mine(1)
-    with brownie.reverts("Current round hasn't ended completely"):
+    with brownie.reverts(revert_pattern="RoundNotOver:.*"):
         ibfr_pool.rollOver(chain.time() + ONE_DAY * 14, {"from": owner})
 
     # Unlock all the funds before rollOver
@@ -497,7 +508,7 @@ def test_ibfr_pool(contracts, accounts, chain):
         not ibfr_pool.isAcceptingWithdrawRequests()
     ), "Wrong isAcceptingWithdrawRequests"
 
-    with brownie.reverts("Pool: Not accepting withdraw requests currently"):
+    with brownie.reverts(revert_pattern="NotAcceptingWithdrawRequests:.*"):
         withdraw = ibfr_pool.withdraw(tokenX_amount_1, {"from": user_1})
 
     with brownie.reverts():  # Already unlocked
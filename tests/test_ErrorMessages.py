@@ -0,0 +1,111 @@
+import json
+
+import brownie
+from eth_abi import encode
+from eth_utils import keccak
+
+from scripts.error_decoder import (
+    decode_revert,
+    error_messages,
+    parse_errors,
+    sync_error_messages,
+)
+
+
+def abi_error_selectors(contract):
+    selectors = {}
+    for item in contract.abi:
+        if item["type"] != "error":
+            continue
+        signature = "{}({})".format(
+            item["name"], ",".join(i["type"] for i in item["inputs"])
+        )
+        selectors["0x" + keccak(text=signature)[:4].hex()] = item["name"]
+    return selectors
+
+
+def test_error_messages_in_sync():
+    assert not sync_error_messages(
+        check=True
+    ), "error_messages.json is out of date, run `brownie run error_decoder`"
+
+
+def test_errors_from_artifacts(tmp_path):
+    artifact = {
+        "abi": [
+            {
+                "type": "error",
+                "name": "NotEnoughFunds",
+                "inputs": [
+                    {"name": "amount", "type": "uint256", "internalType": "uint256"},
+                    {
+                        "name": "availableBalance",
+                        "type": "uint256",
+                        "internalType": "uint256",
+                    },
+                ],
+            },
+            {"type": "error", "name": "PoolEmpty", "inputs": []},
+            {"type": "function", "name": "lockedAmount", "inputs": []},
+        ],
+        "natspec": {
+            "errors": {
+                "NotEnoughFunds(uint256,uint256)": [
+                    {"notice": "Pool: Not enough funds"}
+                ],
+                "PoolEmpty()": [{"details": "Pool Error: The pool is empty"}],
+            },
+        },
+    }
+    (tmp_path / "Pool.json").write_text(json.dumps(artifact))
+    # The interface declaring the errors has them too
+    (tmp_path / "ILiquidityPool.json").write_text(json.dumps(artifact))
+
+    errors = parse_errors(tmp_path)
+    assert len(errors) == 2, "Wrong errors"
+    selector = "0x" + keccak(text="NotEnoughFunds(uint256,uint256)")[:4].hex()
+    assert errors[selector] == {
+        "name": "NotEnoughFunds",
+        "inputs": [
+            {"name": "amount", "type": "uint256"},
+            {"name": "availableBalance", "type": "uint256"},
+        ],
+        "signature": "NotEnoughFunds(uint256,uint256)",
+        "message": "Pool: Not enough funds",
+    }
+    assert error_messages(errors) == {
+        "NotEnoughFunds": "Pool: Not enough funds",
+        "PoolEmpty": "Pool Error: The pool is empty",
+    }
+
+
+def test_error_decoding(contracts, accounts):
+    (
+        token_contract,
+        pp,
+        tokenX,
+        options_config,
+        ibfr_pool,
+        usdc_options,
+        usdc_contract,
+        bufferPp,
+        european_usdc_options,
+    ) = contracts
+    errors = parse_errors()
+
+    # Every error of the deployed contracts should be decodable
+    for contract in [ibfr_pool, usdc_options, european_usdc_options, options_config]:
+        for (selector, name) in abi_error_selectors(contract).items():
+            assert selector in errors, f"{name} is missing"
+            assert errors[selector]["name"] == name, "Wrong selector"
+
+    selector = next(s for (s, e) in errors.items() if e["name"] == "NotEnoughFunds")
+    (name, args, message) = decode_revert(
+        selector + encode(["uint256", "uint256"], [10, 3]).hex(), errors
+    )
+    assert name == "NotEnoughFunds"
+    assert args == {"amount": 10, "availableBalance": 3}, "Wrong arguments"
+    assert message.startswith("Pool: Not enough funds"), "Wrong message"
+
+    with brownie.reverts(revert_pattern="AmountTooSmall:.*"):
+        ibfr_pool.provide(0, 0, {"from": accounts[0]})
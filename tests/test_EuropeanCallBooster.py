@@ -277,7 +277,7 @@ class OptionERC3525Testing(object):
 
     def european_unlock(self, round_id):
         self.chain.snapshot()
-        with brownie.reverts("O4"):
+        with brownie.reverts(revert_pattern="OptionNotExpired:.*"):
             self.tokenX_options.unlock(self.option_id, {"from": self.option_holder})
 
         self.chain.sleep(self.period + ONE_DAY)
@@ -318,7 +318,7 @@ class OptionERC3525Testing(object):
 
     def european_exercise(self, round_id):
         self.chain.snapshot()
-        with brownie.reverts("O4"):
+        with brownie.reverts(revert_pattern="OptionNotExpired:.*"):
             self.tokenX_options.exercise(self.option_id, {"from": self.option_holder})
         self.chain.sleep(self.period + ONE_DAY)
         self.chain.mine(1)
@@ -353,7 +353,7 @@ class OptionERC3525Testing(object):
                 final_tokenX_balance_exerciser - initial_tokenX_balance_exerciser == 0
             )
         else:
-            with brownie.reverts("O17"):
+            with brownie.reverts(revert_pattern="ExpiryPriceTooLow:.*"):
                 exercise_option = self.tokenX_options.exercise(
                     self.option_id, {"from": self.option_holder}
                 )
@@ -382,7 +382,7 @@ class OptionERC3525Testing(object):
         self.option_id = self.verify_creation(self.option_holder, 0)
 
         self.chain.snapshot()
-        with brownie.reverts("O20"):
+        with brownie.reverts(revert_pattern="RoundIDNotFound:.*"):
             self.chain.sleep(self.period + ONE_DAY)
             self.chain.mine(1)
             unlock_option = self.tokenX_options.unlock(
@@ -79,7 +79,7 @@ class OptionERC3525Testing(object):
     def verify_creation(self, minter):
         totalTokenXBalance = self.generic_pool.totalTokenXBalance()
         if totalTokenXBalance == 0:
-            with brownie.reverts("O8"):
+            with brownie.reverts(revert_pattern="PoolEmpty:.*"):
                 self.tokenX_options.create(
                     self.amount, self.user_1, self.meta, 1, {"from": self.owner}
                 )
@@ -130,11 +130,11 @@ class OptionERC3525Testing(object):
         initial_locked_amount = self.generic_pool.lockedAmount()
         input_array = [unit_1, unit_2, unit_3]
 
-        with brownie.reverts("N2"):
+        with brownie.reverts(revert_pattern="NotOwnerNorApproved:.*"):
             self.tokenX_options.split(
                 self.option_id, [unit_1, unit_2, unit_3], {"from": self.user_2}
             )
-        with brownie.reverts("N1"):
+        with brownie.reverts(revert_pattern="EmptySplitUnits:.*"):
             self.tokenX_options.split(self.option_id, [], {"from": self.user_2})
 
         option_units = self.tokenX_options.unitsInToken(self.option_id)
@@ -223,11 +223,11 @@ class OptionERC3525Testing(object):
 
         input_array = merge_ids
 
-        with brownie.reverts("N5"):
+        with brownie.reverts(revert_pattern="NotOwnerNorApproved:.*"):
             self.tokenX_options.merge(input_array, target_id, {"from": self.referrer})
-        with brownie.reverts("N4"):
+        with brownie.reverts(revert_pattern="EmptyOptionIDs:.*"):
             self.tokenX_options.merge([], target_id, {"from": self.option_holder})
-        with brownie.reverts("N6"):
+        with brownie.reverts(revert_pattern="SelfMerge:.*"):
             self.tokenX_options.merge(
                 input_array, input_array[1], {"from": self.option_holder}
             )
@@ -235,6 +235,7 @@ class OptionERC3525Testing(object):
         former_target_option_detail = self.tokenX_options.options(target_id)
         total_amount = former_target_option_detail[2]
         total_locked_amount = former_target_option_detail[3]
+        former_option_details = [self.tokenX_options.options(i) for i in input_array]
         merge_function = self.tokenX_options.merge(
             input_array, target_id, {"from": self.option_holder}
         )
@@ -245,10 +246,13 @@ class OptionERC3525Testing(object):
         ), "Option slots should be the same"
 
         for count, unit in enumerate(input_array):
-            option_detail = self.tokenX_options.options(unit)
-            self.tokenX_options.unitsInToken(unit)
+            option_detail = former_option_details[count]
             total_amount += option_detail[2]
             total_locked_amount += option_detail[3]
+
+            # Merged option's storage should be cleared
+            assert self.tokenX_options.options(unit)[2] == 0, "Option not cleared"
+            assert self.tokenX_options.unitsInToken(unit) == 0, "Units not cleared"
             merge_event = merge_function.events["Merge"][count]
 
             # Original token id should be burnt
@@ -278,7 +282,7 @@ class OptionERC3525Testing(object):
         transfer_units = 1000
         units = self.tokenX_options.unitsInToken(unit_3)
         former_option_detail = self.tokenX_options.options(unit_3)
-        with brownie.reverts("N9"):
+        with brownie.reverts(revert_pattern="SourceOwnerMismatch:.*"):
             self.tokenX_options.transferFrom(
                 self.referrer,
                 self.user_2,
@@ -286,7 +290,7 @@ class OptionERC3525Testing(object):
                 transfer_units,
                 {"from": self.referrer},
             )
-        with brownie.reverts("N10"):
+        with brownie.reverts(revert_pattern="TransferToZeroAddress:.*"):
             self.tokenX_options.transferFrom(
                 self.option_holder,
                 ADDRESS_0,
@@ -408,13 +412,13 @@ class OptionERC3525Testing(object):
         )
         option_owner = self.tokenX_options.ownerOf(self.option_id)
 
-        with brownie.reverts("O4"):
+        with brownie.reverts(revert_pattern="OptionNotExpired:.*"):
             self.tokenX_options.unlock(self.option_id, {"from": option_owner})
 
         self.chain.sleep(self.period + ONE_DAY)
         self.chain.mine(1)
 
-        with brownie.reverts("O17"):
+        with brownie.reverts(revert_pattern="ExpiryPriceTooLow:.*"):
             self.tokenX_options.exercise(self.option_id, {"from": option_owner})
 
         option_details = self.tokenX_options.options(self.option_id)
@@ -439,6 +443,7 @@ class OptionERC3525Testing(object):
         assert unlock_events["Profit"][0]["amount"] == option_details[4], "Wrong profit"
         assert unlock_events, "Should unlock on expiry"
         assert final_option_details[0] == 3, "Option not expired"
+        assert final_option_details[2:6] == (0, 0, 0, 0), "Option not cleared"
         print("unlocked", self.option_id)
 
         self.chain.revert()
@@ -0,0 +1,255 @@
+import brownie
+
+ONE_DAY = 86400
+
+
+class RoundSettlementTesting(object):
+    def __init__(
+        self,
+        accounts,
+        options,
+        generic_pool,
+        amount,
+        meta,
+        chain,
+        tokenX,
+        liquidity,
+        options_config,
+        bufferPp,
+    ):
+        self.tokenX_options = options
+        self.options_config = options_config
+        self.generic_pool = generic_pool
+        self.amount = amount
+        self.meta = meta
+        self.accounts = accounts
+        self.owner = accounts[0]
+        self.holders = [accounts[1], accounts[2]]
+        self.referrer = accounts[3]
+        self.liquidity = liquidity
+        self.tokenX = tokenX
+        self.chain = chain
+        self.expiry = self.generic_pool.fixedExpiry()
+        self.period = self.expiry - self.chain.time()
+        self.strike = self.options_config.fixedStrike()
+        self.pp = bufferPp
+
+    def provide_liquidity(self):
+        self.tokenX.approve(
+            self.generic_pool.address, self.liquidity, {"from": self.owner}
+        )
+        self.generic_pool.provide(self.liquidity, 0, {"from": self.owner})
+        self.tokenX_options.approvePoolToTransferTokenX({"from": self.owner})
+
+    def create(self, minter):
+        (total_fee, _, _) = self.tokenX_options.fees(
+            self.period, self.amount, self.strike, 2
+        )
+        self.tokenX.transfer(minter, total_fee, {"from": self.owner})
+        self.tokenX.approve(self.tokenX_options.address, total_fee, {"from": minter})
+        option = self.tokenX_options.create(
+            self.amount, self.referrer, self.meta, 1, {"from": minter}
+        )
+        return option.return_value
+
+    def create_book(self):
+        option_ids = [self.create(holder) for holder in self.holders]
+        split_ids = self.tokenX_options.split(
+            option_ids[0], [300000, 200000], {"from": self.holders[0]}
+        ).return_value
+        return option_ids + list(split_ids)
+
+    def expire(self, price):
+        self.chain.sleep(self.period + ONE_DAY)
+        self.chain.mine(1)
+        self.pp.setRoundData(1, self.expiry - 100, price, {"from": self.owner})
+        self.pp.setRoundData(2, self.expiry + 100, price, {"from": self.owner})
+        self.tokenX_options.setRoundIDForExpiry(2, {"from": self.owner})
+
+    def expected_profit(self, option, price):
+        if price <= option["strike"]:
+            return 0
+        profit = (price - option["strike"]) * option["amount"] // price
+        return min(profit, option["lockedAmount"])
+
+    def verify_series(self, option_ids):
+        series_ids = self.tokenX_options.seriesOfExpiry(self.expiry)
+        assert len(series_ids) == 1, "All the options belong to one series"
+        series = self.tokenX_options.roundSeries(series_ids[0])
+        details = [self.tokenX_options.options(i) for i in option_ids]
+
+        assert series["strike"] == self.strike, "Wrong series strike"
+        assert series["expiration"] == self.expiry, "Wrong series expiration"
+        assert series["amount"] == sum(d["amount"] for d in details)
+        assert series["lockedAmount"] == sum(d["lockedAmount"] for d in details)
+        assert series["premium"] == sum(d["premium"] for d in details)
+        assert series["isSettled"] == False, "Series shouldn't be settled"
+        assert (
+            self.generic_pool.lockedAmount() == series["lockedAmount"]
+        ), "The series should account for all the locked funds"
+        return series_ids[0]
+
+    def verify_settlement(self, option_ids, price):
+        self.chain.snapshot()
+        series_id = self.verify_series(option_ids)
+
+        with brownie.reverts(revert_pattern="OptionNotExpired:.*"):
+            self.tokenX_options.settleRound(self.expiry, {"from": self.owner})
+        with brownie.reverts(revert_pattern="RoundNotSettled:.*"):
+            self.tokenX_options.claim(option_ids[0], {"from": self.holders[0]})
+
+        self.expire(price)
+        details = [self.tokenX_options.options(i) for i in option_ids]
+        owners = [self.tokenX_options.ownerOf(i) for i in option_ids]
+        profits = [self.expected_profit(d, price) for d in details]
+
+        initial_pool_balance = self.tokenX.balanceOf(self.generic_pool.address)
+        settlement = self.tokenX_options.settleRound(
+            self.expiry, {"from": self.accounts[5]}
+        )
+        series = self.tokenX_options.roundSeries(series_id)
+        payout = self.expected_profit(series, price)
+
+        assert series["isSettled"] == True, "Series should be settled"
+        assert series["expiryPrice"] == price, "Wrong expiry price"
+        assert series["payout"] == payout, "Wrong series payout"
+        assert settlement.events["SettleSeries"]["payout"] == payout
+        assert self.generic_pool.lockedAmount() == 0, "Collateral wasn't released"
+        assert self.generic_pool.lockedPremium() == 0, "Premium wasn't released"
+        assert (
+            initial_pool_balance - self.tokenX.balanceOf(self.generic_pool.address)
+            == payout
+        ), "Pool sent wrong payout"
+        assert self.tokenX_options.unclaimedPayout() == payout
+        assert sum(profits) <= payout, "Claims can't exceed the payout"
+
+        # Settling twice shouldn't release anything again
+        self.tokenX_options.settleRound(self.expiry, {"from": self.owner})
+        assert self.tokenX_options.unclaimedPayout() == payout
+
+        with brownie.reverts(revert_pattern="RoundSettled:.*"):
+            self.tokenX_options.split(option_ids[0], [1000], {"from": self.holders[0]})
+
+        for count, option_id in enumerate(option_ids):
+            initial_balance = self.tokenX.balanceOf(owners[count])
+            claim = self.tokenX_options.claim(option_id, {"from": self.accounts[5]})
+            final_balance = self.tokenX.balanceOf(owners[count])
+
+            assert final_balance - initial_balance == profits[count], "Wrong profit"
+            if profits[count] > 0:
+                assert claim.events["Exercise"]["profit"] == profits[count]
+            else:
+                assert claim.events["Expire"]["premium"] == details[count]["premium"]
+            assert self.tokenX_options.exists(option_id) == False, "Option not burnt"
+            with brownie.reverts(revert_pattern="OptionDoesNotExist:.*"):
+                self.tokenX_options.claim(option_id, {"from": owners[count]})
+
+        # The rounding left over once every option is claimed isn't kept
+        assert self.tokenX_options.unclaimedPayout() == 0, "Wrong unclaimed payout"
+        assert self.tokenX_options.roundSeries(series_id)["payout"] == 0
+        self.chain.revert()
+
+    def verify_burn(self, option_ids):
+        series_id = self.tokenX_options.seriesOfExpiry(self.expiry)[0]
+        burnt_id = option_ids[-1]
+        burnt = self.tokenX_options.options(burnt_id)
+        initial_series = self.tokenX_options.roundSeries(series_id)
+        initial_locked_amount = self.generic_pool.lockedAmount()
+
+        with brownie.reverts(revert_pattern="NotOptionOwner:.*"):
+            self.tokenX_options.burn(burnt_id, {"from": self.holders[1]})
+        self.tokenX_options.burn(burnt_id, {"from": self.holders[0]})
+
+        series = self.tokenX_options.roundSeries(series_id)
+        assert initial_series["amount"] - series["amount"] == burnt["amount"]
+        assert (
+            initial_locked_amount - self.generic_pool.lockedAmount()
+            == burnt["lockedAmount"]
+        ), "The collateral wasn't released"
+        assert self.tokenX_options.exists(burnt_id) == False, "Option not burnt"
+        assert self.tokenX_options.options(burnt_id)["state"] == 3, "Not expired"
+
+        # The round settles without the burnt option
+        self.verify_settlement(option_ids[:-1], self.strike + int(10e8))
+
+        # A burnt ITM option of a settled round gives its claim back to the
+        # pool, so does the rounding of the claims
+        price = self.strike + int(10e8)
+        self.expire(price)
+        options_balance = self.tokenX.balanceOf(self.tokenX_options.address)
+        self.tokenX_options.settleRound(self.expiry, {"from": self.owner})
+        payout = self.tokenX_options.roundSeries(series_id)["payout"]
+        profits = {
+            i: self.expected_profit(self.tokenX_options.options(i), price)
+            for i in option_ids[:-1]
+        }
+        pool_balance = self.tokenX.balanceOf(self.generic_pool.address)
+        for option_id in option_ids[1:-1]:
+            assert profits[option_id] > 0, "The option should be ITM"
+            initial_pool_balance = self.tokenX.balanceOf(self.generic_pool.address)
+            self.tokenX_options.burn(
+                option_id, {"from": self.tokenX_options.ownerOf(option_id)}
+            )
+            assert (
+                self.tokenX.balanceOf(self.generic_pool.address) - initial_pool_balance
+                == profits[option_id]
+            ), "The forfeited claim wasn't sent back to the pool"
+        self.tokenX_options.claim(option_ids[0], {"from": self.holders[0]})
+        assert self.tokenX_options.unclaimedPayout() == 0, "Payout wasn't released"
+        assert (
+            self.tokenX.balanceOf(self.generic_pool.address) - pool_balance
+            == payout - profits[option_ids[0]]
+        ), "The pool didn't get the unclaimed payout back"
+        assert (
+            self.tokenX.balanceOf(self.tokenX_options.address) == options_balance
+        ), "The options contract kept part of the payout"
+
+        # Only the contract's own funds can be withdrawn
+        project_owner = self.accounts[7]
+        self.generic_pool.setProjectOwner(project_owner, {"from": self.owner})
+        initial_balance = self.tokenX.balanceOf(project_owner)
+        self.tokenX_options.withdrawFunds({"from": self.owner})
+        assert self.tokenX.balanceOf(project_owner) - initial_balance == options_balance
+        assert self.tokenX.balanceOf(self.tokenX_options.address) == 0
+
+    def complete_flow_test(self):
+        self.provide_liquidity()
+        option_ids = self.create_book()
+
+        # In the money
+        self.verify_settlement(option_ids, self.strike + int(10e8))
+        # Out of the money
+        self.verify_settlement(option_ids, self.strike - int(10e8))
+        self.verify_burn(option_ids)
+
+
+def test_round_settlement(contracts, accounts, chain):
+
+    (
+        token_contract,
+        pp,
+        tokenX,
+        options_config,
+        ibfr_pool,
+        usdc_options,
+        usdc_contract,
+        bufferPp,
+        european_usdc_options,
+    ) = contracts
+    amount = int(1e18) // 1000
+    meta = "test"
+    liquidity = int(3 * 1e18)
+
+    option = RoundSettlementTesting(
+        accounts,
+        european_usdc_options,
+        ibfr_pool,
+        amount,
+        meta,
+        chain,
+        token_contract,
+        liquidity,
+        options_config,
+        bufferPp,
+    )
+    option.complete_flow_test()
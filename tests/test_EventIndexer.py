@@ -0,0 +1,277 @@
+from eth_abi import encode
+from eth_utils import keccak
+
+from scripts.event_indexer import EventIndexer, sources
+
+OPTIONS = "0x" + "1" * 40
+POOL = "0x" + "2" * 40
+ALICE = "0x" + "a" * 40
+BOB = "0x" + "b" * 40
+ZERO = "0x" + "0" * 40
+ABI = [
+    {
+        "type": "event",
+        "name": "TransferUnits",
+        "inputs": [
+            {"name": "from", "type": "address", "indexed": True},
+            {"name": "to", "type": "address", "indexed": True},
+            {"name": "tokenId", "type": "uint256", "indexed": True},
+            {"name": "targetTokenId", "type": "uint256", "indexed": False},
+            {"name": "transferUnits", "type": "uint256", "indexed": False},
+        ],
+    },
+    {
+        "type": "event",
+        "name": "Provide",
+        "inputs": [
+            {"name": "account", "type": "address", "indexed": True},
+            {"name": "amount", "type": "uint256", "indexed": False},
+            {"name": "writeAmount", "type": "uint256", "indexed": False},
+        ],
+    },
+    {
+        "type": "event",
+        "name": "ExerciseUnits",
+        "inputs": [
+            {"name": "id", "type": "uint256", "indexed": True},
+            {"name": "units", "type": "uint256", "indexed": False},
+            {"name": "profit", "type": "uint256", "indexed": False},
+        ],
+    },
+    {
+        "type": "event",
+        "name": "Exercise",
+        "inputs": [
+            {"name": "id", "type": "uint256", "indexed": True},
+            {"name": "profit", "type": "uint256", "indexed": False},
+        ],
+    },
+    {
+        "type": "event",
+        "name": "SettleSeries",
+        "inputs": [
+            {"name": "seriesID", "type": "uint256", "indexed": True},
+            {"name": "expiryPrice", "type": "uint256", "indexed": False},
+            {"name": "payout", "type": "uint256", "indexed": False},
+        ],
+    },
+    {
+        "type": "event",
+        "name": "Settle",
+        "inputs": [
+            {"name": "issuer", "type": "address", "indexed": True},
+            {"name": "amount", "type": "uint256", "indexed": False},
+            {"name": "premium", "type": "uint256", "indexed": False},
+            {"name": "payout", "type": "uint256", "indexed": False},
+        ],
+    },
+]
+
+
+def make_log(address, event, args, tx):
+    abi = next(item for item in ABI if item["name"] == event)
+    signature = "{}({})".format(event, ",".join(i["type"] for i in abi["inputs"]))
+    topics = [keccak(text=signature)] + [
+        encode([i["type"]], [args[i["name"]]]) for i in abi["inputs"] if i["indexed"]
+    ]
+    data = encode(
+        [i["type"] for i in abi["inputs"] if not i["indexed"]],
+        [args[i["name"]] for i in abi["inputs"] if not i["indexed"]],
+    )
+    return {"address": address, "topics": topics, "data": data, "transactionHash": tx}
+
+
+class FakeEth:
+    """
+    Chain of blocks with logs, whose nodes reject ranges above max_range
+    """
+
+    def __init__(self, max_range):
+        self.max_range = max_range
+        self.blocks = []
+
+    def mine(self, logs=(), fork=""):
+        number = len(self.blocks)
+        for (i, log) in enumerate(logs):
+            log.update(blockNumber=number, logIndex=i, blockHash=self.hash(number))
+        self.blocks.append({"hash": keccak(text=f"{number}{fork}"), "logs": logs})
+
+    def hash(self, number):
+        return keccak(text=f"{number}")
+
+    @property
+    def block_number(self):
+        return len(self.blocks) - 1
+
+    def get_block(self, number):
+        return {"hash": self.blocks[number]["hash"]}
+
+    def get_logs(self, params):
+        (start, end) = (params["fromBlock"], params["toBlock"])
+        if end - start + 1 > self.max_range:
+            raise ValueError("Block range too large")
+        return [log for block in self.blocks[start : end + 1] for log in block["logs"]]
+
+
+class FakeWeb3:
+    def __init__(self, max_range):
+        self.eth = FakeEth(max_range)
+
+
+def test_event_indexer_ranges_and_reorgs(tmp_path):
+    web3 = FakeWeb3(max_range=50)
+    eth = web3.eth
+    eth.mine()
+    mint = {"from": ZERO, "to": ALICE, "tokenId": 0, "targetTokenId": 7}
+    eth.mine(
+        [make_log(OPTIONS, "TransferUnits", dict(mint, transferUnits=100), "0x01")]
+    )
+    for _ in range(300):
+        eth.mine()
+    provide = {"account": BOB, "amount": 10**20, "writeAmount": 10**23}
+    eth.mine([make_log(POOL, "Provide", provide, "0x02")])
+
+    db_path = tmp_path / "events.db"
+    indexer = EventIndexer(db_path, web3, [(OPTIONS, ABI), (POOL, ABI)])
+    assert indexer.sync() == 2
+    assert indexer.block_range <= 50, "The range should shrink to what the node accepts"
+    assert indexer.checkpoint == eth.block_number
+    [option] = indexer.option_book(owner=ALICE)
+    assert (option["option_id"], option["units"]) == (7, 100)
+    assert indexer.lp_position(BOB)["lp_tokens"] == 10**23
+
+    # A partial transfer to a new option, minted in the same transaction
+    transfer = {"from": ALICE, "to": BOB, "tokenId": 7, "targetTokenId": 8}
+    eth.mine(
+        [
+            make_log(
+                OPTIONS,
+                "TransferUnits",
+                dict(mint, to=BOB, targetTokenId=8, transferUnits=40),
+                "0x03",
+            ),
+            make_log(
+                OPTIONS, "TransferUnits", dict(transfer, transferUnits=40), "0x03"
+            ),
+        ]
+    )
+    eth.mine()
+    assert indexer.sync() == 2
+    assert indexer.option(OPTIONS, 7)["units"] == 60
+    assert indexer.option(OPTIONS, 8)["units"] == 40
+    indexer.close()
+
+    # The last two blocks are replaced, the transfer never happened
+    fork = eth.block_number - 1
+    eth.blocks = eth.blocks[:fork]
+    eth.mine(fork="b")
+    eth.mine(fork="b")
+    eth.mine(fork="b")
+    indexer = EventIndexer(db_path, web3, [(OPTIONS, ABI), (POOL, ABI)])
+    assert indexer.sync() == 0
+    assert indexer.checkpoint == eth.block_number
+    assert indexer.option(OPTIONS, 7)["units"] == 100
+    assert indexer.option(OPTIONS, 8) is None
+    assert indexer.db.execute("SELECT COUNT(*) FROM events").fetchone()[0] == 2
+
+
+def test_event_indexer_settlements():
+    web3 = FakeWeb3(max_range=1000)
+    eth = web3.eth
+    mint = {"from": ZERO, "to": ALICE, "tokenId": 0, "targetTokenId": 3}
+    series_id = 2**255 + 1
+    eth.mine(
+        [make_log(OPTIONS, "TransferUnits", dict(mint, transferUnits=100), "0x01")]
+    )
+    eth.mine(
+        [
+            make_log(
+                OPTIONS, "ExerciseUnits", {"id": 3, "units": 40, "profit": 7}, "0x02"
+            ),
+            make_log(OPTIONS, "Exercise", {"id": 3, "profit": 11}, "0x03"),
+            make_log(
+                OPTIONS,
+                "SettleSeries",
+                {"seriesID": series_id, "expiryPrice": 410 * 10**8, "payout": 50},
+                "0x04",
+            ),
+            make_log(
+                POOL,
+                "Settle",
+                {"issuer": OPTIONS, "amount": 10**3, "premium": 20, "payout": 50},
+                "0x04",
+            ),
+        ]
+    )
+
+    indexer = EventIndexer(":memory:", web3, [(OPTIONS, ABI), (POOL, ABI)])
+    assert indexer.sync() == 5
+    option = indexer.option(OPTIONS, 3)
+    assert (option["state"], option["profit"]) == ("exercised", 18)
+    series = indexer.series(OPTIONS, series_id)
+    assert (series["expiry_price"], series["payout"]) == (410 * 10**8, 50)
+    assert indexer.pool_pnl() == {"profit": 0, "loss": 30}
+
+
+def test_event_indexer(contracts, accounts, chain, web3, tmp_path):
+    (
+        token_contract,
+        pp,
+        tokenX,
+        options_config,
+        ibfr_pool,
+        usdc_options,
+        usdc_contract,
+        bufferPp,
+        european_usdc_options,
+    ) = contracts
+    (owner, holder, receiver) = accounts[:3]
+    tokenX.approve(ibfr_pool, int(3e18), {"from": owner})
+    ibfr_pool.provide(int(3e18), 0, {"from": owner})
+    usdc_options.approvePoolToTransferTokenX({"from": owner})
+    tokenX.transfer(holder, int(1e18), {"from": owner})
+    tokenX.approve(usdc_options, int(1e18), {"from": holder})
+    amount = int(1e18) // 1000
+    option_id = usdc_options.create(amount, owner, "", 1, {"from": holder}).return_value
+    target_id = usdc_options.create(amount, owner, "", 1, {"from": holder}).return_value
+    (split_id,) = usdc_options.split(option_id, [300000], {"from": holder}).return_value
+    usdc_options.merge([split_id], target_id, {"from": holder})
+    usdc_options.transferFrom["address,address,uint256,uint256"](
+        holder, receiver, option_id, 200000, {"from": holder}
+    )
+    usdc_options.exerciseUnits(target_id, 100000, {"from": holder})
+    usdc_options.exercise(option_id, {"from": holder})
+    ibfr_pool.withdraw(int(1e18), {"from": owner})
+
+    indexer = EventIndexer(
+        tmp_path / "events.db",
+        web3,
+        sources(ibfr_pool, usdc_options, european_usdc_options),
+        start_block=ibfr_pool.tx.block_number,
+    )
+    assert indexer.sync() > 0
+    book = indexer.option_book(contract=usdc_options)
+    assert len(book) == 2
+    for option in book:
+        assert option["owner"] == usdc_options.ownerOf(option["option_id"])
+        assert option["units"] == usdc_options.unitsInToken(option["option_id"])
+    assert indexer.option(usdc_options, split_id)["state"] == "merged"
+    exercised = indexer.option(usdc_options, option_id)
+    assert exercised["state"] == "exercised" and exercised["profit"] > 0
+    partly_exercised = indexer.option(usdc_options, target_id)
+    assert partly_exercised["state"] == "active" and partly_exercised["profit"] > 0
+    position = indexer.lp_position(owner)
+    assert position["lp_tokens"] == ibfr_pool.balanceOf(owner)
+    assert position["pending_withdrawal"] == int(1e18)
+    assert sum(indexer.pool_pnl().values()) > 0, "The exercise wasn't settled"
+
+    # Blocks abandoned by a revert are rolled back on the next sync
+    chain.snapshot()
+    usdc_options.create(amount, owner, "", 1, {"from": holder})
+    indexer.sync()
+    assert len(indexer.option_book(owner=holder)) == 2
+    chain.revert()
+    chain.mine(3)
+    indexer.sync()
+    assert len(indexer.option_book(owner=holder)) == 1
+    assert indexer.checkpoint == web3.eth.block_number
@@ -0,0 +1,86 @@
+from scripts.profile_gas import (
+    UNATTRIBUTED,
+    folded_stacks,
+    profile,
+    run_flows,
+    step_costs,
+    write_report,
+)
+
+
+def test_step_costs():
+    # A call opening a frame of 3 steps, then a STOP
+    trace = [
+        {"depth": 1, "jumpDepth": 0, "fn": "A.f", "gas": 1000, "gasCost": 3},
+        {"depth": 1, "jumpDepth": 1, "fn": "A._g", "gas": 997, "gasCost": 700},
+        {"depth": 2, "jumpDepth": 0, "fn": "B.h", "gas": 600, "gasCost": 3},
+        {"depth": 2, "jumpDepth": 0, "fn": "B.h", "gas": 597, "gasCost": 20000},
+        {"depth": 2, "jumpDepth": 0, "fn": "B.h", "gas": 497, "gasCost": 0},
+        {"depth": 1, "jumpDepth": 1, "fn": "A._g", "gas": 800, "gasCost": 0},
+    ]
+    costs = step_costs(trace)
+    assert costs == [3, 94, 3, 100, 0, 0]
+    assert sum(costs) == trace[0]["gas"] - trace[-1]["gas"]
+    assert folded_stacks(trace, costs, "flow") == {
+        "flow;A.f": 3,
+        "flow;A.f;A._g": 94,
+        "flow;A.f;A._g;B.h": 103,
+    }
+
+
+def test_gas_profile(contracts, accounts, tmp_path):
+    (
+        token_contract,
+        pp,
+        tokenX,
+        options_config,
+        ibfr_pool,
+        usdc_options,
+        usdc_contract,
+        bufferPp,
+        european_usdc_options,
+    ) = contracts
+    txs = run_flows(
+        tokenX,
+        usdc_contract,
+        ibfr_pool,
+        usdc_options,
+        accounts[0],
+        accounts[1],
+        accounts[2],
+    )
+    assert set(txs) == {
+        "provide",
+        "create (TokenX)",
+        "create (USDC)",
+        "split",
+        "merge",
+        "transferFrom (new option)",
+        "transferFrom (target option)",
+        "exercise",
+        "unlock",
+        "processWithdrawRequests",
+    }
+
+    profiles = {}
+    for (flow, tx) in txs.items():
+        result = profile(tx, flow)
+        assert sum(result["contracts"].values()) == tx.gas_used
+        assert (
+            sum(result["stacks"].values()) + result["unattributed"] == tx.gas_used
+        ), f"{flow}'s gas doesn't add up"
+        profiles[flow] = result
+
+    create = profiles["create (TokenX)"]
+    assert create["contracts"]["BufferIBFRPoolV2"] > 0, "pool.lock wasn't profiled"
+    assert create["functions"]["BufferIBFRPoolV2.lock"]["total"] > 0
+    assert create["functions"]["BufferUSDCTokenXOptions.create"]["total"] > 0.9 * sum(
+        create["stacks"].values()
+    ), "create should include the other functions"
+
+    write_report(profiles, tmp_path / "gas_profile.json")
+    lines = (tmp_path / "gas_profile.folded").read_text().splitlines()
+    flows = {line.split(";")[0] for line in lines}
+    assert flows == set(txs), "Every flow should be in the flame graph"
+    assert all(int(line.rsplit(" ", 1)[1]) > 0 for line in lines)
+    assert any(line.startswith(f"create (TokenX);{UNATTRIBUTED}") for line in lines)
@@ -0,0 +1,116 @@
+import itertools
+
+import brownie
+import numpy as np
+
+from scripts import option_math
+from scripts.greeks import GREEKS, book_greeks, greeks, load_book
+
+ONE_DAY = 86400
+
+
+def test_black_scholes_greeks(contracts, OptionMath):
+    option_math_library = OptionMath[-1]
+    spot = int(400e8)
+
+    for (iv, strike, period, is_call) in itertools.product(
+        [int(50e2), int(110e2)],
+        [int(380e8), int(400e8), int(420e8)],
+        [ONE_DAY, 28 * ONE_DAY],
+        [True, False],
+    ):
+        args = (iv, strike, spot, period, is_call)
+        on_chain = option_math_library.blackScholesGreeks(*args)
+        assert tuple(on_chain) == option_math.black_scholes_greeks(*args)
+        assert on_chain["price"] == option_math.fused_black_scholes_price(*args)
+
+        expected = greeks(*args)
+        for name in GREEKS:
+            assert np.isclose(
+                on_chain[name] / 1e8, expected[name], rtol=1e-6, atol=1e-7
+            ), f"Wrong {name}"
+        # Finite differences of the on-chain price
+        bumped = option_math_library.blackScholesGreeks(
+            iv, strike, spot + int(1e8), period, is_call
+        )
+        assert np.isclose(
+            bumped["price"] - on_chain["price"], on_chain["delta"], rtol=0.02, atol=1e5
+        ), "Delta doesn't match the price"
+
+
+def test_book_greeks(contracts, accounts, lens, create_option):
+    (
+        token_contract,
+        pp,
+        tokenX,
+        options_config,
+        ibfr_pool,
+        usdc_options,
+        usdc_contract,
+        bufferPp,
+        european_usdc_options,
+    ) = contracts
+    owner = accounts[0]
+    tokenX.approve(ibfr_pool.address, int(3e18), {"from": owner})
+    ibfr_pool.provide(int(3e18), 0, {"from": owner})
+
+    # A second series at another strike and implied vol
+    series_id = options_config.seriesCount()
+    series_iv = options_config.impliedVolRate() * 3 // 2
+    options_config.addSeries(
+        options_config.fixedStrike() + int(20e8), series_iv, {"from": owner}
+    )
+
+    amounts = [int(1e15), int(2e15), int(5e15), int(3e15)]
+    series_ids = [0, 0, series_id, series_id]
+    option_ids = [
+        create_option(
+            usdc_options,
+            ibfr_pool,
+            options_config,
+            tokenX,
+            amount,
+            owner,
+            accounts[1],
+            accounts[3],
+            series_id=option_series_id,
+        )
+        for (amount, option_series_id) in zip(amounts, series_ids)
+    ]
+    usdc_options.exercise(option_ids[0], {"from": accounts[1]})
+
+    book = load_book(usdc_options, lens, options_config, batch_size=2)
+    assert list(book["id"]) == option_ids[1:], "Wrong active options"
+    assert list(book["amount"]) == amounts[1:], "Wrong amounts"
+    implied_vols = [
+        options_config.getSeries(option_series_id)["impliedVolRate"]
+        for option_series_id in series_ids[1:]
+    ]
+    assert list(book["implied_vol"]) == implied_vols, "Wrong implied vols"
+
+    now = brownie.chain.time()
+    (positions, pool) = book_greeks(book, pp.getUsdPrice(), book["implied_vol"], now)
+    for (i, option_id) in enumerate(book["id"]):
+        option = usdc_options.options(int(option_id))
+        expected = option_math.black_scholes_greeks(
+            implied_vols[i],
+            option["strike"],
+            pp.getUsdPrice(),
+            option["expiration"] - now,
+            True,
+        )
+        assert np.isclose(
+            positions["delta"][i], expected[1] / 1e8 * option["amount"] / 1e18
+        ), "Wrong position delta"
+        assert np.isclose(
+            positions["vega"][i], expected[3] / 1e8 * option["amount"] / 1e18
+        ), "Wrong position vega"
+    for name in GREEKS:
+        assert np.isclose(pool[name], -positions[name].sum()), "Wrong pool total"
+
+    # A single implied vol is broadcast to every position
+    (flat_positions, _) = book_greeks(
+        book, pp.getUsdPrice(), options_config.impliedVolRate(), now
+    )
+    assert np.isclose(flat_positions["vega"][0], positions["vega"][0])
+    assert not np.isclose(flat_positions["vega"][1], positions["vega"][1])
@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+
+from scripts.lp_simulation import price_paths, simulate, summarize
+
+ONE_DAY = 86400
+PERIOD = 4 * ONE_DAY
+ORDER = 1e18
+# Every step one order of ORDER that every buyer takes
+CERTAIN_DEMAND = dict(
+    demand_rate=1e6,
+    order_size=ORDER,
+    order_dispersion=0,
+    markup=1e6,
+    markup_dispersion=0,
+)
+
+
+def test_price_paths():
+    prices = price_paths(np.random.default_rng(1), 20000, 28, PERIOD, 400e8, 0.9)
+    assert prices.shape == (29, 20000)
+    assert np.all(prices[0] == 400e8)
+    log_returns = np.log(prices[-1] / prices[0])
+    assert log_returns.std() == pytest.approx(0.9 * np.sqrt(4 / 365), rel=0.03)
+    assert np.exp(log_returns).mean() == pytest.approx(1, abs=0.01), "Not a martingale"
+
+
+def test_lp_simulation_payouts():
+    # Up 10%, then OTM before the expiry on the first path, down on the second
+    prices = np.array(
+        [[400e8, 400e8], [440e8, 380e8], [400e8, 380e8], [390e8, 380e8], [450e8, 350e8]]
+    )
+    european = simulate(prices, PERIOD, 395e8, american=False, **CERTAIN_DEMAND)
+    assert list(european["sold"]) == [4, 4]
+    assert european["payouts"][0] == pytest.approx(4 * ORDER * 55 / 450)
+    assert european["payouts"][1] == 0
+    profit = european["premiums"] - european["payouts"]
+    assert european["lp_return"] == pytest.approx(profit / 1e21)
+
+    # The first option is exercised at 440, the rest expire OTM at 390
+    american = simulate(prices, PERIOD, 395e8, take_profit=0.1, **CERTAIN_DEMAND)
+    assert american["payouts"][0] == pytest.approx(ORDER * 45 / 440)
+    assert american["payouts"][1] == 0
+    assert american["premiums"][1] == european["premiums"][1]
+
+    # A lower collateralization caps the payouts
+    capped = simulate(
+        prices,
+        PERIOD,
+        395e8,
+        american=False,
+        collateralization_ratio=10,
+        **CERTAIN_DEMAND,
+    )
+    assert capped["payouts"][0] == pytest.approx(4 * ORDER * 0.1)
+
+
+def test_lp_simulation_capacity():
+    prices = price_paths(np.random.default_rng(2), 5000, 24, PERIOD, 400e8, 0.9)
+    # European options stay locked until the expiry
+    demand = dict(CERTAIN_DEMAND, american=False)
+    result = simulate(prices, PERIOD, 395e8, lp_liquidity=2 * ORDER, **demand)
+    assert result["sold"].max() <= 2, "Only two options fit"
+    summary = summarize(result)
+    assert summary["exhaustion_frequency"] == 1
+    assert summary["rejected_share"] > 0.8
+
+    # maxLiquidity caps what the LPs provide
+    assert np.array_equal(
+        simulate(
+            prices,
+            PERIOD,
+            395e8,
+            lp_liquidity=1e21,
+            max_liquidity=2 * ORDER,
+            **demand,
+        )["sold"],
+        result["sold"],
+    )
+
+    # The utilization adjusted IV makes the premiums grow with the book, the
+    # pool has room for 20 options, not exactly, away from float rounding
+    base = simulate(prices, PERIOD, 395e8, lp_liquidity=20.5 * ORDER, **demand)
+    slower = simulate(
+        prices,
+        PERIOD,
+        395e8,
+        lp_liquidity=20.5 * ORDER,
+        utilization_rate=600e8,
+        **demand,
+    )
+    assert np.all(base["sold"] == slower["sold"])
+    assert np.all(base["premiums"] > slower["premiums"])
+    summary = summarize(base)
+    assert (
+        summary["lp_return"]["p1"]
+        <= summary["lp_return"]["p5"]
+        <= summary["lp_return"]["p50"]
+    )
+    assert summary["lp_return"]["expected_shortfall_5"] <= summary["lp_return"]["p5"]
@@ -0,0 +1,64 @@
+import csv
+
+import pytest
+
+from scripts.load_test import fund_accounts, parse_mix, run, summarize, write_report
+
+
+def test_load_test_summary():
+    samples = [
+        {"operation": "create", "reverted": False, "gas": 300000, "latency": 0.01},
+        {"operation": "create", "reverted": False, "gas": 320000, "latency": 0.03},
+        {"operation": "split", "reverted": True, "gas": None, "latency": 0.02},
+    ]
+    report = summarize(samples, 2)
+    assert report["tps"] == 1.5 and report["reverts"] == 1
+    create = report["operations"]["create"]
+    assert create["gas"] == {"mean": 310000, "min": 300000, "max": 320000}
+    assert create["latency_ms"]["p50"] == pytest.approx(20)
+    assert report["operations"]["split"]["gas"]["mean"] is None
+
+    assert parse_mix("create=3, split=1") == {"create": 3, "split": 1}
+    with pytest.raises(ValueError):
+        parse_mix("create=1,settle=1")
+
+
+def test_load_test(contracts, accounts, tmp_path):
+    (
+        token_contract,
+        pp,
+        tokenX,
+        options_config,
+        ibfr_pool,
+        usdc_options,
+        usdc_contract,
+        bufferPp,
+        european_usdc_options,
+    ) = contracts
+    owner = accounts[0]
+    usdc_options.approvePoolToTransferTokenX({"from": owner})
+    tokenX.approve(ibfr_pool, int(1e21), {"from": owner})
+    ibfr_pool.provide(int(1e21), 0, {"from": owner})
+
+    load_accounts = fund_accounts(tokenX, ibfr_pool, usdc_options, owner, 6)
+    (report, samples) = run(
+        ibfr_pool, usdc_options, owner, load_accounts, 60, threads=3, rounds=2
+    )
+    operations = report["operations"]
+    assert {"create", "split", "unlockAll", "processWithdrawRequests"} <= set(
+        operations
+    )
+    assert operations["create"]["reverts"] == 0
+    assert operations["create"]["gas"]["min"] > 100000, "Gas wasn't measured"
+    for result in operations.values():
+        latency = result["latency_ms"]
+        assert 0 < latency["p50"] <= latency["p90"] <= latency["p99"]
+    assert report["tps"] > 0
+
+    # Every round was settled
+    assert ibfr_pool.currentRound() == 2
+    assert ibfr_pool.lockedAmount() == 0 and ibfr_pool.queueEnd() == 0
+
+    write_report(report, samples, tmp_path / "load_test.json")
+    with open(tmp_path / "load_test.csv") as f:
+        assert len(list(csv.DictReader(f))) == report["transactions"]
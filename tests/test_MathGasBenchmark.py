@@ -0,0 +1,28 @@
+import random
+
+from scripts.benchmark_math import compare, input_ranges, measure
+
+
+def test_math_gas_benchmark(contracts, accounts, OptionMathHarness):
+    harness = OptionMathHarness.deploy({"from": accounts[0]})
+    report = measure(harness, input_ranges(random.Random(0), samples=2))
+
+    for (primitive, ranges) in report.items():
+        for (label, stats) in ranges.items():
+            assert stats["samples"] == 2, f"{primitive} {label} wasn't measured"
+            assert 0 < stats["min"] <= stats["mean"] <= stats["max"]
+
+    # exp_2 multiplies once per set bit of the fraction
+    exp_2 = report["exp_2"]
+    assert exp_2["fraction with 0 bits set"]["max"] < (
+        exp_2["fraction with 64 bits set"]["min"]
+    ), "exp_2 should cost more with more bits set"
+    assert (
+        report["fusedBlackScholesPrice"]["quotes"]["mean"]
+        < report["blackScholesPrice"]["quotes"]["mean"]
+    ), "The fused kernel should be cheaper"
+    assert compare(report, report) == {
+        f"{primitive} {label}": 0
+        for (primitive, ranges) in report.items()
+        for label in ranges
+    }
@@ -0,0 +1,101 @@
+import itertools
+
+import brownie
+
+ONE_DAY = 86400
+
+# Largest difference allowed between the fused kernel and blackScholesPrice,
+# in 1e-8 of the quote asset
+PRICE_TOLERANCE = 1
+# Largest difference allowed between the lookup table CDF and _N
+CDF_TOLERANCE = 3e-7
+
+
+def test_fused_black_scholes_price(contracts, accounts, OptionMathHarness):
+    harness = OptionMathHarness.deploy({"from": accounts[0]})
+    spot = int(400e8)
+
+    total_gas = 0
+    total_fused_gas = 0
+    for (iv, strike, period, is_call) in itertools.product(
+        [int(50e2), int(110e2), int(200e2)],
+        [int(380e8), int(395e8), int(400e8), int(420e8)],
+        [ONE_DAY, 7 * ONE_DAY, 28 * ONE_DAY],
+        [True, False],
+    ):
+        (price, gas) = harness.blackScholesPrice(iv, strike, spot, period, is_call)
+        (fused_price, fused_gas) = harness.fusedBlackScholesPrice(
+            iv, strike, spot, period, is_call, False
+        )
+        assert abs(fused_price - price) <= PRICE_TOLERANCE, "Wrong fused price"
+        assert fused_gas < gas, "Fused kernel should be cheaper"
+        total_gas += gas
+        total_fused_gas += fused_gas
+
+    assert total_fused_gas < total_gas * 3 // 4, "Fused kernel isn't cheap enough"
+
+    # The approximation is negative deep out of the money, which is priced at 0
+    (fused_price, _) = harness.fusedBlackScholesPrice(
+        951, 218293573616, 161014713129, 4379979, True, False
+    )
+    assert fused_price == 0, "Negative prices should be 0"
+
+
+def test_lookup_table_cdf(contracts, accounts, OptionMathHarness):
+    harness = OptionMathHarness.deploy({"from": accounts[0]})
+
+    for i in range(-90, 91):
+        x = int(i / 10 * 2**64) + 12345
+        (value, gas) = harness.N(x)
+        (lookup_value, lookup_gas) = harness.lookupN(x)
+        assert abs(lookup_value - value) <= CDF_TOLERANCE * 2**64, "Wrong CDF"
+        assert lookup_gas < gas, "Lookup table should be cheaper"
+
+    spot = int(400e8)
+    for (strike, is_call) in itertools.product(
+        [int(380e8), int(400e8), int(420e8)], [True, False]
+    ):
+        (price, gas) = harness.fusedBlackScholesPrice(
+            int(110e2), strike, spot, 7 * ONE_DAY, is_call, False
+        )
+        (lookup_price, lookup_gas) = harness.fusedBlackScholesPrice(
+            int(110e2), strike, spot, 7 * ONE_DAY, is_call, True
+        )
+        assert abs(lookup_price - price) <= (strike + spot) * CDF_TOLERANCE
+        assert lookup_gas < gas, "Lookup table should be cheaper"
+
+
+def test_cdf_method(contracts, accounts):
+    (
+        token_contract,
+        pp,
+        tokenX,
+        options_config,
+        ibfr_pool,
+        usdc_options,
+        usdc_contract,
+        bufferPp,
+        european_usdc_options,
+    ) = contracts
+    owner = accounts[0]
+    token_contract.approve(ibfr_pool.address, int(3e18), {"from": owner})
+    ibfr_pool.provide(int(3e18), 0, {"from": owner})
+    strike = options_config.fixedStrike()
+    amount = int(1e18) // 1000
+
+    (total_fee, _, premium) = usdc_options.fees(7 * ONE_DAY, amount, strike, 2)
+
+    with brownie.reverts("Ownable: caller is not the owner"):
+        options_config.setCDFMethod(1, {"from": accounts[1]})
+    tx = options_config.setCDFMethod(1, {"from": owner})
+    assert tx.events["UpdateCDFMethod"]["method"] == 1, "Wrong event"
+    assert options_config.cdfMethod() == 1, "Wrong CDF method"
+
+    (lookup_total_fee, _, lookup_premium) = usdc_options.fees(
+        7 * ONE_DAY, amount, strike, 2
+    )
+    price = pp.getUsdPrice()
+    assert abs(lookup_premium - premium) <= (
+        (strike + price) * CDF_TOLERANCE * amount // price + 1
+    ), "Wrong premium"
+    assert lookup_total_fee - lookup_premium == total_fee - premium
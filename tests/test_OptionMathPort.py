@@ -0,0 +1,93 @@
+import itertools
+import random
+
+from scripts import option_math
+
+ONE_DAY = 86400
+
+
+def random_64x64(rng, low, high):
+    return int(rng.uniform(low, high) * 2**64)
+
+
+def test_abdk_math_port(contracts, accounts, ABDKMath64x64, OptionMathHarness):
+    harness = OptionMathHarness.deploy({"from": accounts[0]})
+    abdk = ABDKMath64x64[-1]
+    rng = random.Random(0)
+
+    for _ in range(25):
+        (x, y) = (random_64x64(rng, -1e3, 1e3), random_64x64(rng, -1e3, 1e3))
+        assert abdk.mul(x, y) == option_math.mul(x, y), "Wrong mul"
+        assert abdk.div(x, y) == option_math.div(x, y), "Wrong div"
+        assert abdk.sqrt(abs(x)) == option_math.sqrt(abs(x)), "Wrong sqrt"
+        (a, b) = (rng.randint(0, 10**24), rng.randint(1, 10**18))
+        assert abdk.divu(a, b) == option_math.divu(a, b), "Wrong divu"
+
+        positive = random_64x64(rng, 1e-9, 1e9)
+        assert harness.ln(positive)[0] == option_math.ln(positive), "Wrong ln"
+        assert harness.log_2(positive)[0] == option_math.log_2(positive)
+        exponent = random_64x64(rng, -60, 40)
+        assert harness.exp(exponent)[0] == option_math.exp(exponent), "Wrong exp"
+        assert harness.exp_2(exponent)[0] == option_math.exp_2(exponent)
+
+
+def test_option_math_port(contracts, accounts, OptionMath, OptionMathHarness):
+    harness = OptionMathHarness.deploy({"from": accounts[0]})
+    option_math_library = OptionMath[-1]
+
+    for i in range(-40, 41, 3):
+        x = int(i / 8 * 2**64) + 987654321
+        assert harness.N(x)[0] == option_math.N(x), "Wrong N"
+        assert harness.lookupN(x)[0] == option_math.lookup_N(x), "Wrong lookupN"
+
+    spot = int(400e8)
+    for (iv, strike, period, is_call) in itertools.product(
+        [int(50e2), int(110e2), int(200e2)],
+        [int(380e8), int(400e8), int(420e8)],
+        [ONE_DAY, 28 * ONE_DAY],
+        [True, False],
+    ):
+        args = (iv, strike, spot, period, is_call)
+        price = option_math_library.blackScholesPrice(*args)
+        assert price == option_math.black_scholes_price(*args), "Wrong price"
+        for use_lookup_table in [False, True]:
+            (fused_price, _) = harness.fusedBlackScholesPrice(*args, use_lookup_table)
+            assert fused_price == option_math.fused_black_scholes_price(
+                *args, use_lookup_table
+            ), "Wrong fused price"
+
+
+def test_fees_port(contracts, accounts):
+    (
+        token_contract,
+        pp,
+        tokenX,
+        options_config,
+        ibfr_pool,
+        usdc_options,
+        usdc_contract,
+        bufferPp,
+        european_usdc_options,
+    ) = contracts
+    owner = accounts[0]
+    token_contract.approve(ibfr_pool.address, int(3e18), {"from": owner})
+    ibfr_pool.provide(int(3e18), 0, {"from": owner})
+
+    # Up to 80% utilization, where the IV goes up
+    for amount in [int(1e15), int(1e18), int(2.4e18)]:
+        for (strike, option_type) in itertools.product(
+            [int(380e8), int(395e8), int(420e8)], [1, 2]
+        ):
+            expected = usdc_options.fees(7 * ONE_DAY, amount, strike, option_type)
+            assert expected == option_math.fees(
+                7 * ONE_DAY,
+                amount,
+                strike,
+                options_config.impliedVolRate(),
+                option_type == 2,
+                pp.getUsdPrice(),
+                ibfr_pool.lockedAmount(),
+                ibfr_pool.totalTokenXBalance(),
+                options_config.utilizationRate(),
+                options_config.settlementFeePercentage(),
+            ), "Wrong fees"
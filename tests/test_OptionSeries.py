@@ -0,0 +1,198 @@
+import brownie
+
+ONE_DAY = 86400
+
+
+class OptionSeriesTesting(object):
+    def __init__(
+        self,
+        accounts,
+        options,
+        generic_pool,
+        amount,
+        meta,
+        chain,
+        tokenX,
+        liquidity,
+        options_config,
+        bufferPp,
+    ):
+        self.tokenX_options = options
+        self.options_config = options_config
+        self.generic_pool = generic_pool
+        self.amount = amount
+        self.meta = meta
+        self.accounts = accounts
+        self.owner = accounts[0]
+        self.option_holder = accounts[1]
+        self.referrer = accounts[3]
+        self.liquidity = liquidity
+        self.tokenX = tokenX
+        self.chain = chain
+        self.expiry = self.generic_pool.fixedExpiry()
+        self.period = self.expiry - self.chain.time()
+        self.pp = bufferPp
+
+    def provide_liquidity(self):
+        self.tokenX.approve(
+            self.generic_pool.address, self.liquidity, {"from": self.owner}
+        )
+        self.generic_pool.provide(self.liquidity, 0, {"from": self.owner})
+        self.tokenX_options.approvePoolToTransferTokenX({"from": self.owner})
+
+    def create(self, series_id):
+        self.tokenX.transfer(self.option_holder, int(1e18), {"from": self.owner})
+        self.tokenX.approve(
+            self.tokenX_options.address, int(1e18), {"from": self.option_holder}
+        )
+        return self.tokenX_options.createInSeries(
+            series_id,
+            self.amount,
+            self.referrer,
+            self.meta,
+            1,
+            {"from": self.option_holder},
+        )
+
+    def verify_series_listing(self):
+        series = self.options_config.getSeries(0)
+        assert series["strike"] == self.options_config.fixedStrike()
+        assert series["impliedVolRate"] == self.options_config.impliedVolRate()
+        assert series["isActive"] == True, "Series 0 should always be open"
+
+        with brownie.reverts("Ownable: caller is not the owner"):
+            self.options_config.addSeries(
+                int(410e8), 90e2, {"from": self.option_holder}
+            )
+        with brownie.reverts(revert_pattern="ImpliedVolRateTooSmall:.*"):
+            self.options_config.addSeries(int(410e8), 99, {"from": self.owner})
+        with brownie.reverts(revert_pattern="ValueOutOfRange:.*"):
+            self.options_config.addSeries(0, 90e2, {"from": self.owner})
+
+        series_ids = []
+        for (strike, iv) in [(int(410e8), 90e2), (int(380e8), 130e2)]:
+            series_id = self.options_config.seriesCount()
+            tx = self.options_config.addSeries(strike, iv, {"from": self.owner})
+            assert tx.return_value == series_id, "Wrong series id"
+            assert tx.events["AddSeries"]["strike"] == strike, "Wrong event"
+            series = self.options_config.getSeries(series_id)
+            assert series == (strike, iv, True), "Wrong series"
+            series_ids.append(series_id)
+
+        with brownie.reverts(revert_pattern="SeriesNotOpen:.*"):
+            self.create(self.options_config.seriesCount())
+        with brownie.reverts(revert_pattern="SeriesDoesNotExist:.*"):
+            self.options_config.setSeriesStatus(
+                self.options_config.seriesCount(), False, {"from": self.owner}
+            )
+        with brownie.reverts(revert_pattern="SeriesDoesNotExist:.*"):
+            self.options_config.setSeriesImpliedVolRate(0, 90e2, {"from": self.owner})
+        return series_ids
+
+    def verify_series_creation(self, series_id):
+        series = self.options_config.getSeries(series_id)
+        (total_fee, _, premium) = self.tokenX_options.seriesFees(
+            series_id, self.period, self.amount
+        )
+        (expected_total_fee, _, _) = self.tokenX_options.fees(
+            self.period, self.amount, series["strike"], 2
+        )
+        if series["impliedVolRate"] == self.options_config.impliedVolRate():
+            assert total_fee == expected_total_fee, "Wrong series fees"
+
+        initial_balance = self.tokenX.balanceOf(self.option_holder)
+        option = self.create(series_id)
+        option_id = option.return_value
+        option_detail = self.tokenX_options.options(option_id)
+        slot = self.tokenX_options.slotOf(option_id)
+
+        assert (
+            initial_balance + int(1e18) - self.tokenX.balanceOf(self.option_holder)
+        ) == total_fee, "Wrong fee charged"
+        assert option_detail["strike"] == series["strike"], "Wrong strike"
+        assert option_detail["premium"] == premium, "Wrong premium"
+        assert option_detail["expiration"] == self.expiry, "Wrong expiration"
+        assert (
+            self.tokenX_options.slotDetails(slot)["strike"] == series["strike"]
+        ), "Wrong slot strike"
+        return option_id
+
+    def verify_series_updates(self, series_id):
+        (initial_total_fee, _, _) = self.tokenX_options.seriesFees(
+            series_id, self.period, self.amount
+        )
+        self.options_config.setSeriesImpliedVolRate(
+            series_id, 200e2, {"from": self.owner}
+        )
+        (total_fee, _, _) = self.tokenX_options.seriesFees(
+            series_id, self.period, self.amount
+        )
+        assert total_fee > initial_total_fee, "Higher IV should cost more"
+
+        self.options_config.setSeriesStatus(series_id, False, {"from": self.owner})
+        with brownie.reverts(revert_pattern="SeriesNotOpen:.*"):
+            self.create(series_id)
+        self.options_config.setSeriesStatus(series_id, True, {"from": self.owner})
+        self.create(series_id)
+
+    def verify_round_settlement(self, option_ids, price):
+        self.chain.sleep(self.period + ONE_DAY)
+        self.chain.mine(1)
+        self.pp.setRoundData(1, self.expiry - 100, price, {"from": self.owner})
+        self.pp.setRoundData(2, self.expiry + 100, price, {"from": self.owner})
+        self.tokenX_options.setRoundIDForExpiry(2, {"from": self.owner})
+
+        series_ids = self.tokenX_options.seriesOfExpiry(self.expiry)
+        strikes = set(self.tokenX_options.options(i)["strike"] for i in option_ids)
+        assert len(series_ids) == len(strikes), "Every strike should be a series"
+
+        self.tokenX_options.settleRound(self.expiry, {"from": self.owner})
+        for series_id in series_ids:
+            series = self.tokenX_options.roundSeries(series_id)
+            assert series["isSettled"] == True, "Series should be settled"
+        assert self.generic_pool.lockedAmount() == 0, "Collateral wasn't released"
+
+    def complete_flow_test(self, is_european):
+        self.provide_liquidity()
+        series_ids = self.verify_series_listing()
+        option_ids = [self.verify_series_creation(0)]
+        for series_id in series_ids:
+            option_ids.append(self.verify_series_creation(series_id))
+        self.verify_series_updates(series_ids[0])
+        if is_european:
+            self.verify_round_settlement(option_ids, int(400e8))
+
+
+def test_option_series(contracts, accounts, chain):
+
+    (
+        token_contract,
+        pp,
+        tokenX,
+        options_config,
+        ibfr_pool,
+        usdc_options,
+        usdc_contract,
+        bufferPp,
+        european_usdc_options,
+    ) = contracts
+    amount = int(1e18) // 1000
+    meta = "test"
+    liquidity = int(3 * 1e18)
+
+    for options in [usdc_options, european_usdc_options]:
+        chain.snapshot()
+        option = OptionSeriesTesting(
+            accounts,
+            options,
+            ibfr_pool,
+            amount,
+            meta,
+            chain,
+            token_contract,
+            liquidity,
+            options_config,
+            bufferPp,
+        )
+        option.complete_flow_test(options == european_usdc_options)
+        chain.revert()
@@ -0,0 +1,104 @@
+ADDRESS_0 = "0x0000000000000000000000000000000000000000"
+
+
+def verify_option_data(options, data, option_id):
+    assert data["optionID"] == option_id, "Wrong option id"
+    assert data["exists"] == options.exists(option_id), "Wrong existence"
+    assert tuple(data["option"]) == tuple(options.options(option_id)), "Wrong option"
+    if not data["exists"]:
+        assert data["owner"] == ADDRESS_0, "Burnt option shouldn't have an owner"
+        return
+    assert data["owner"] == options.ownerOf(option_id), "Wrong owner"
+    assert data["units"] == options.unitsInToken(option_id), "Wrong units"
+    assert data["slot"] == options.slotOf(option_id), "Wrong slot"
+    assert tuple(data["slotDetail"]) == tuple(
+        options.slotDetails(options.slotOf(option_id))
+    ), "Wrong slot details"
+
+
+def test_options_lens(contracts, accounts, lens, create_option):
+    (
+        token_contract,
+        pp,
+        tokenX,
+        options_config,
+        ibfr_pool,
+        usdc_options,
+        usdc_contract,
+        bufferPp,
+        european_usdc_options,
+    ) = contracts
+    owner = accounts[0]
+    option_holder = accounts[1]
+    referrer = accounts[3]
+    amount = int(1e18) // 1000
+    liquidity = int(3 * 1e18)
+
+    tokenX.approve(ibfr_pool.address, liquidity, {"from": owner})
+    ibfr_pool.provide(liquidity, 0, {"from": owner})
+
+    # Should return the pool state in one call
+    pool_state = lens.getPoolState(ibfr_pool.address)
+    assert pool_state["totalTokenXBalance"] == ibfr_pool.totalTokenXBalance()
+    assert pool_state["availableBalance"] == ibfr_pool.availableBalance()
+    assert pool_state["lockedAmount"] == ibfr_pool.lockedAmount() == 0
+    assert pool_state["totalSupply"] == ibfr_pool.totalSupply()
+    assert pool_state["fixedExpiry"] == ibfr_pool.fixedExpiry()
+    assert pool_state["currentRound"] == ibfr_pool.currentRound()
+    assert pool_state["hasPoolEnded"] == ibfr_pool.hasPoolEnded()
+
+    for options in [usdc_options, european_usdc_options]:
+        option_id = create_option(
+            options,
+            ibfr_pool,
+            options_config,
+            tokenX,
+            amount,
+            owner,
+            option_holder,
+            referrer,
+        )
+        split_ids = options.split(
+            option_id, [50000, 30000], {"from": option_holder}
+        ).return_value
+        options.merge([split_ids[0]], split_ids[1], {"from": option_holder})
+
+        # Should return the same values as the individual getters,
+        # including the options that no longer exist
+        option_ids = [option_id, split_ids[0], split_ids[1], options.nextTokenId()]
+        option_data = lens.getOptions(options.address, option_ids)
+        assert len(option_data) == len(option_ids), "Wrong number of options"
+        for count, data in enumerate(option_data):
+            verify_option_data(options, data, option_ids[count])
+        assert option_data[1]["exists"] == False, "Merged option should be burnt"
+
+        if options == usdc_options:
+            assert option_data[0]["autoExerciseStatus"] == options.autoExerciseStatus(
+                option_holder
+            )
+        else:
+            assert option_data[0]["autoExerciseStatus"] == False
+
+        # Should page through the options of a slot
+        slot = options.slotOf(option_id)
+        (slot_data, total) = lens.getOptionsOfSlot(options.address, slot, 0, 10)
+        assert total == options.tokensInSlot(slot) == len(slot_data)
+        for count, data in enumerate(slot_data):
+            assert data["optionID"] == options.tokenOfSlotByIndex(slot, count)
+            verify_option_data(options, data, data["optionID"])
+
+        (slot_data, total) = lens.getOptionsOfSlot(options.address, slot, 1, 10)
+        assert len(slot_data) == total - 1, "Wrong page length"
+        (slot_data, total) = lens.getOptionsOfSlot(options.address, slot, total, 10)
+        assert len(slot_data) == 0, "Page beyond the slot should be empty"
+        # Limits and offsets that would overflow are clamped to the slot
+        (slot_data, _) = lens.getOptionsOfSlot(options.address, slot, 1, 2**256 - 1)
+        assert len(slot_data) == total - 1, "Wrong page length"
+        (slot_data, _) = lens.getOptionsOfSlot(
+            options.address, slot, 2**256 - 1, 2**256 - 1
+        )
+        assert len(slot_data) == 0, "Page beyond the slot should be empty"
+
+    pool_state = lens.getPoolState(ibfr_pool.address)
+    assert pool_state["lockedAmount"] == ibfr_pool.lockedAmount()
+    assert pool_state["lockedPremium"] == ibfr_pool.lockedPremium()
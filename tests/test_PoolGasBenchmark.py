@@ -0,0 +1,39 @@
+import csv
+
+from scripts.benchmark_pool import measure, write_report
+
+
+def test_pool_gas_benchmark(contracts, accounts, tmp_path):
+    (
+        token_contract,
+        pp,
+        tokenX,
+        options_config,
+        ibfr_pool,
+        usdc_options,
+        usdc_contract,
+        bufferPp,
+        european_usdc_options,
+    ) = contracts
+    report = measure(ibfr_pool, tokenX, accounts[0], accounts[9], sizes=[2, 5])
+
+    for (size, results) in report["sizes"].items():
+        assert results["whole_queue_fits"], "A short queue fits a block"
+        assert results["max_requests_to_process"] == int(size)
+        assert not results["extrapolated"]
+        for operation in ["provide", "withdraw", "processWithdrawRequests(1)"]:
+            assert results["gas"][operation] > 21000, f"{operation} wasn't measured"
+    gas = report["sizes"]["5"]["gas"]
+    assert gas["processWithdrawRequests(4)"] > gas["processWithdrawRequests(1)"]
+
+    # The cost of a lock doesn't depend on the number of locks
+    for operation in ["lock", "changeLock", "unlock", "send"]:
+        assert abs(gas[operation] / report["sizes"]["2"]["gas"][operation] - 1) < 0.01
+
+    # The chain is back to its state before the benchmark
+    assert ibfr_pool.queueEnd() == 0 and ibfr_pool.totalSupply() == 0
+
+    write_report(report, tmp_path / "pool_gas.json")
+    with open(tmp_path / "pool_gas.csv") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == sum(len(r["gas"]) for r in report["sizes"].values())
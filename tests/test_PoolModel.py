@@ -0,0 +1,149 @@
+import random
+
+from scripts.pool_model import (
+    PoolModel,
+    PoolRevert,
+    model_of,
+    random_trace,
+    replay,
+)
+
+ONE_DAY = 86400
+ADMIN = "0x" + "a" * 40
+ISSUER = "0x" + "b" * 40
+LPS = [f"0x{i:040x}" for i in range(1, 6)]
+
+
+def check_invariants(model):
+    assert model.total_supply == sum(model.balances.values()), "Wrong supply"
+    locks = [
+        ll
+        for (issuer, issuer_locks) in model.locked_liquidity.items()
+        for (id, ll) in enumerate(issuer_locks)
+        if model.is_locked(issuer, id)
+    ]
+    assert model.locked_amount == sum(ll[0] for ll in locks)
+    assert model.locked_premium == sum(ll[1] for ll in locks)
+    assert model.balance >= model.locked_premium
+    for i in range(model.queue_start, model.queue_end):
+        account = model.queue[i][2]
+        assert model.requests[account] == [i, True], "Wrong request index"
+
+
+def test_pool_model_properties():
+    model = PoolModel(ADMIN, fixed_expiry=7 * ONE_DAY)
+    model.issuers.add(ISSUER)
+    trace = random_trace(random.Random(0), model, LPS, ISSUER, ADMIN, 20000)
+    assert model.current_round > 10, "The trace should span many rounds"
+    assert any(operation[0] == "settle" for (operation, _) in trace)
+    assert sum(isinstance(r, PoolRevert) for (_, r) in trace) < 0.2 * len(trace)
+    check_invariants(model)
+
+    # Replaying the trace gives the same results, reverts change nothing
+    replayed = PoolModel(ADMIN, fixed_expiry=7 * ONE_DAY)
+    replayed.issuers.add(ISSUER)
+    for (operation, result) in trace[:5000]:
+        before = replayed.snapshot(LPS)
+        try:
+            assert replayed.apply(operation) == result
+        except PoolRevert as error:
+            assert isinstance(result, PoolRevert) and error.args == result.args
+            assert replayed.snapshot(LPS) == before, f"{operation} changed the state"
+        check_invariants(replayed)
+
+
+def test_pool_model_rounding():
+    model = PoolModel(ADMIN, fixed_expiry=7 * ONE_DAY)
+    model.issuers.add(ISSUER)
+    assert model.provide(LPS[0], 10**18, 0) == 10**21
+    assert model.balance_of(LPS[0]) == 10**21 - 10**18, "Wrong admin cut"
+    model.lock(ISSUER, 0, 10**17, 3)
+    assert model.provide(LPS[1], 7, 0) == 7 * 10**21 // (10**18 + 3)
+
+    # Burns are rounded up
+    model.set_pool_state(ADMIN, True)
+    supply = model.total_supply
+    balance = model.total_tokenX_balance()
+    model.withdraw(LPS[1], 5)
+    assert supply - model.total_supply == -(-5 * supply // balance)
+
+    model.unlock(ISSUER, 0)
+    try:
+        model.unlock(ISSUER, 0)
+        assert False, "Should revert"
+    except PoolRevert as error:
+        assert error.name == "AlreadyUnlocked"
+
+
+def test_pool_model_settlement():
+    model = PoolModel(ADMIN, fixed_expiry=7 * ONE_DAY)
+    model.issuers.add(ISSUER)
+    model.provide(LPS[0], 10**18, 0)
+    for (id, locked) in enumerate([10**16, 2 * 10**16, 3 * 10**16]):
+        model.lock(ISSUER, id, locked, locked // 100)
+    model.unlock(ISSUER, 1)
+    model.change_lock(ISSUER, 2, 10**16, 10**14)
+
+    # Only the totals of the expiry's open locks settle them
+    for (locked, premium) in [(4 * 10**16, 4 * 10**14), (2 * 10**16, 10**14)]:
+        try:
+            model.settle(ISSUER, 7 * ONE_DAY, locked, premium, 0)
+            assert False, "Should revert"
+        except PoolRevert as error:
+            assert error.name == "SettleMismatch"
+    model.settle(ISSUER, 7 * ONE_DAY, 2 * 10**16, 2 * 10**14, 10**15)
+    assert (model.locked_amount, model.locked_premium) == (0, 0)
+
+    # The settled locks are unlocked, the expiry can't be locked again
+    for operation in [
+        ("unlock", ISSUER, 0),
+        ("unlock_without_profit", ISSUER, 2),
+        ("change_lock", ISSUER, 2, 10**15, 10**13),
+        ("send", ISSUER, 0, LPS[1], 10**15),
+    ]:
+        try:
+            model.apply(operation)
+            assert False, "Should revert"
+        except PoolRevert as error:
+            assert error.name == "AlreadyUnlocked"
+    for operation in [
+        ("settle", ISSUER, 7 * ONE_DAY, 0, 0, 0),
+        ("lock", ISSUER, 3, 10**16, 10**14),
+    ]:
+        try:
+            model.apply(operation)
+            assert False, "Should revert"
+        except PoolRevert as error:
+            assert error.name == "ExpirySettled"
+
+
+def test_pool_model_matches_contract(contracts, accounts, chain):
+    (
+        token_contract,
+        pp,
+        tokenX,
+        options_config,
+        ibfr_pool,
+        usdc_options,
+        usdc_contract,
+        bufferPp,
+        european_usdc_options,
+    ) = contracts
+    (admin, issuer, lps) = (accounts[0], accounts[6], accounts[1:6])
+    ibfr_pool.grantRole(ibfr_pool.OPTION_ISSUER_ROLE(), issuer, {"from": admin})
+    for account in lps + [issuer]:
+        tokenX.transfer(account, int(1e22), {"from": admin})
+        tokenX.approve(ibfr_pool, 2**256 - 1, {"from": account})
+
+    addresses = [str(account) for account in lps]
+    model = model_of(ibfr_pool, tokenX, [str(issuer)], chain.time())
+    trace = random_trace(
+        random.Random(1), model, addresses, str(issuer), str(admin), 150
+    )
+    assert model.current_round > 1, "The trace should roll over"
+
+    model = model_of(ibfr_pool, tokenX, [str(issuer)], chain.time())
+    reverts = replay(
+        trace, ibfr_pool, tokenX, model, addresses + [str(issuer), str(admin)]
+    )
+    assert reverts == sum(isinstance(r, PoolRevert) for (_, r) in trace)
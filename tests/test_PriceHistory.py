@@ -0,0 +1,100 @@
+import bisect
+
+import brownie
+
+from scripts.price_path import load_rounds, path_timestamps, script_prices
+
+ONE_HOUR = 3600
+
+
+def test_price_at(PriceHistory, FakePriceProvider, accounts, chain):
+    owner = accounts[0]
+    pp = FakePriceProvider.deploy(int(400e8), {"from": owner})
+    history = PriceHistory.deploy(pp, 8, {"from": owner})
+    start = chain.time()
+
+    with brownie.reverts(revert_pattern="PriceNotObserved:.*"):
+        history.priceAt(start)
+
+    # Irregular intervals, only the last 8 of the 20 rounds are kept
+    timestamps = [start + i * ONE_HOUR + (i % 3) * 600 for i in range(20)]
+    prices = [int(400e8) + i * int(1e8) for i in range(20)]
+    round_ids = load_rounds(pp, prices, timestamps, sender=owner)
+    tx = history.observeRounds(round_ids, {"from": owner})
+    assert tx.return_value == 20, "Every round should be recorded"
+    assert history.observationCount() == 20
+    assert history.latestObservation() == (timestamps[-1], 20, prices[-1])
+
+    # Rounds that aren't newer are skipped
+    assert history.observeRounds(round_ids[-3:], {"from": owner}).return_value == 0
+
+    for timestamp in [timestamps[12], timestamps[12] + 1, timestamps[-1] + 10**6]:
+        i = bisect.bisect_right(timestamps, timestamp) - 1
+        assert history.priceAt(timestamp) == (timestamps[i], i + 1, prices[i])
+    for timestamp in [timestamps[11], timestamps[12] - 1]:
+        with brownie.reverts(revert_pattern="PriceNotObserved:.*"):
+            history.priceAt(timestamp)
+
+    # Keepers record the latest round as it is published
+    script_prices(pp, [int(450e8)], first_round_id=21, sender=owner)
+    chain.sleep(max(timestamps[-1] - chain.time(), 0) + ONE_HOUR)
+    tx = pp.advance(1, {"from": owner})
+    assert history.observe({"from": owner}).return_value
+    assert history.latestObservation() == (tx.timestamp, 21, int(450e8))
+    assert not history.observe({"from": owner}).return_value
+
+
+def test_settlement_from_history(
+    contracts, PriceHistory, BufferEuropeanUSDCTokenXOptions, accounts, chain
+):
+    (
+        token_contract,
+        pp,
+        tokenX,
+        options_config,
+        ibfr_pool,
+        usdc_options,
+        usdc_contract,
+        bufferPp,
+        european_usdc_options,
+    ) = contracts
+    owner = accounts[0]
+    (history, gapped_history) = (
+        PriceHistory.deploy(pp, 100, {"from": owner}) for _ in range(2)
+    )
+    (options, gapped_options) = (
+        BufferEuropeanUSDCTokenXOptions.deploy(
+            token_contract,
+            provider,
+            ibfr_pool,
+            options_config,
+            usdc_contract,
+            {"from": owner},
+        )
+        for provider in [history, gapped_history]
+    )
+    expiry = ibfr_pool.fixedExpiry()
+
+    # Hourly rounds around the expiry, more than the history keeps
+    timestamps = path_timestamps(expiry - 150 * ONE_HOUR + 1, ONE_HOUR, 300)
+    prices = [int(400e8) + i * int(1e8) for i in range(300)]
+    round_ids = load_rounds(pp, prices, timestamps, sender=owner)
+    for start in range(0, 150, 75):
+        history.observeRounds(round_ids[start : start + 75], {"from": owner})
+    with brownie.reverts(revert_pattern="RoundNotAfterExpiry:.*"):
+        options.setRoundIDFromHistory({"from": owner})
+
+    history.observeRounds(round_ids[150:160], {"from": owner})
+    # The last rounds before the expiry were never observed
+    gapped_history.observeRounds(round_ids[140:147] + [round_ids[152]], {"from": owner})
+    chain.sleep(expiry - chain.time() + ONE_HOUR)
+    chain.mine(1)
+    with brownie.reverts(revert_pattern="RoundNotAfterExpiry:.*"):
+        gapped_options.setRoundIDFromHistory({"from": accounts[1]})
+
+    tx = options.setRoundIDFromHistory({"from": accounts[1]})
+    assert tx.return_value == round_ids[149], "Wrong settlement round"
+    assert options.expiryToRoundID(expiry) == round_ids[149]
+    assert history.getRoundData(round_ids[149])[1] == prices[149]
+    with brownie.reverts(revert_pattern="RoundIDAlreadySet:.*"):
+        options.setRoundIDFromHistory({"from": accounts[1]})
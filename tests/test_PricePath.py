@@ -0,0 +1,93 @@
+import brownie
+
+from scripts.price_path import (
+    load_rounds,
+    path_timestamps,
+    read_price_path,
+    script_prices,
+)
+
+ONE_HOUR = 3600
+
+
+def test_read_price_path(tmp_path):
+    path = tmp_path / "prices.csv"
+    path.write_text("timestamp,price\n1650000000,401.25\n1650003600,399.8\n")
+    assert read_price_path(path) == (
+        [1650000000, 1650003600],
+        [40125000000, 39980000000],
+    )
+    path.write_text("400\n400.00000001\n")
+    assert read_price_path(path) == (None, [int(400e8), int(400e8) + 1])
+    assert path_timestamps(100, 10, 3) == [100, 110, 120]
+
+
+def test_load_rounds(contracts, accounts, chain):
+    (
+        token_contract,
+        pp,
+        tokenX,
+        options_config,
+        ibfr_pool,
+        usdc_options,
+        usdc_contract,
+        bufferPp,
+        european_usdc_options,
+    ) = contracts
+    owner = accounts[0]
+    expiry = ibfr_pool.fixedExpiry()
+
+    # Hourly path around the expiry, written in 2 transactions
+    length = 300
+    timestamps = path_timestamps(expiry - 150 * ONE_HOUR + 1, ONE_HOUR, length)
+    prices = [int(400e8) + i * int(1e8) for i in range(length)]
+    round_ids = load_rounds(pp, prices, timestamps, sender=owner)
+    assert round_ids == list(range(1, length + 1))
+    for i in [0, 149, 150, length - 1]:
+        round_data = pp.getRoundData(round_ids[i])
+        assert round_data[1] == prices[i], "Wrong price"
+        assert round_data[3] == timestamps[i], "Wrong timestamp"
+
+    with brownie.reverts("FakePriceProvider: Length mismatch"):
+        pp.setRoundDataBatch([1, 2], [expiry], [int(400e8)], {"from": owner})
+
+    chain.sleep(expiry - chain.time() + ONE_HOUR)
+    chain.mine(1)
+    european_usdc_options.setRoundIDForExpiry(round_ids[150], {"from": owner})
+    assert (
+        european_usdc_options.expiryToRoundID(expiry) == round_ids[149]
+    ), "Wrong settlement round"
+
+
+def test_scripted_prices(contracts, accounts, chain):
+    (
+        token_contract,
+        pp,
+        tokenX,
+        options_config,
+        ibfr_pool,
+        usdc_options,
+        usdc_contract,
+        bufferPp,
+        european_usdc_options,
+    ) = contracts
+    owner = accounts[0]
+    prices = [int(390e8), int(395e8), int(405e8)]
+    script_prices(pp, prices, first_round_id=11, batch_size=2, sender=owner)
+    assert pp.scriptLength() == len(prices)
+
+    tx = pp.advance(1, {"from": owner})
+    assert tx.return_value == 11, "Wrong round"
+    assert pp.getUsdPrice() == prices[0], "Wrong price"
+    assert pp.getRoundData(11)[3] == tx.timestamp, "Wrong round timestamp"
+
+    chain.sleep(ONE_HOUR)
+    tx = pp.advance(2, {"from": owner})
+    assert tx.return_value == 13, "Wrong round"
+    assert pp.getUsdPrice() == prices[2], "Wrong price"
+    assert pp.getRoundData(12)[1] == prices[1], "Skipped price wasn't recorded"
+
+    with brownie.reverts("FakePriceProvider: End of the script"):
+        pp.advance(1, {"from": owner})
+    pp.clearScript({"from": owner})
+    assert pp.scriptLength() == 0 and pp.cursor() == 0
@@ -0,0 +1,251 @@
+"""
+Differential fuzzing of the on-chain Black-Scholes pricing
+
+Samples FUZZ_SAMPLES random (iv, strike, spot, period, isCall) inputs over a
+range much wider than the options are sold in and prices them on-chain with
+OptionMath.blackScholesPrice and the fused kernel the fees use. The inputs
+are sent in batches through OptionMathHarness.blackScholesPriceBatch, many
+batches per JSON-RPC request, so a run makes few round trips.
+
+The results are compared with the exact port in scripts/option_math.py,
+which has to agree to the wei and revert on the same inputs, and with true
+Black-Scholes in float64. The report written to FUZZ_REPORT holds the error
+distribution, the regions where pricing reverts and the gas per call.
+
+    FUZZ_SAMPLES=300000 brownie test tests/test_PricingFuzz.py
+"""
+import json
+import math
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+import requests
+from brownie import web3
+
+from scripts import option_math
+
+SAMPLES = int(os.environ.get("FUZZ_SAMPLES", 2000))
+SEED = int(os.environ.get("FUZZ_SEED", 0))
+REPORT_PATH = Path(os.environ.get("FUZZ_REPORT", "reports/pricing_fuzz.json"))
+
+# Inputs priced by one eth_call and eth_calls sent in one JSON-RPC request
+BATCH_SIZE = 100
+CALLS_PER_REQUEST = 20
+
+YEAR = 365 * 86400
+# Largest absolute error of Choudhury's approximation against the normal CDF,
+# at 0. The price can be off by (spot + strike) times that.
+CDF_ERROR = 1.4e-4
+
+KERNELS = {"blackScholesPrice": False, "fusedBlackScholesPrice": True}
+
+
+def sample_inputs(size, seed):
+    rng = np.random.default_rng(seed)
+
+    def log_uniform(low, high):
+        return np.exp(rng.uniform(np.log(low), np.log(high), size))
+
+    strike = log_uniform(1e2, 1e16).astype(np.uint64)
+    spot = np.maximum(strike * log_uniform(1e-3, 1e3), 1).astype(np.uint64)
+    return {
+        "impliedVol": log_uniform(1, 1e7).astype(np.uint64),
+        "strike": strike,
+        "spot": spot,
+        "period": log_uniform(1, 10 * YEAR).astype(np.uint64),
+        "isCall": rng.random(size) < 0.5,
+    }
+
+
+def _rows(inputs):
+    return [
+        tuple(v.item() for v in row)
+        for row in zip(
+            inputs["impliedVol"],
+            inputs["strike"],
+            inputs["spot"],
+            inputs["period"],
+            inputs["isCall"],
+        )
+    ]
+
+
+def _post_batch(calls):
+    response = requests.post(web3.provider.endpoint_uri, json=calls, timeout=600)
+    response.raise_for_status()
+    results = {r["id"]: r for r in response.json()}
+    return [results[call["id"]] for call in calls]
+
+
+def price_on_chain(harness, inputs, use_fused_kernel):
+    """
+    Returns the prices, the gas used and the reverted flags of the inputs
+    """
+    rows = _rows(inputs)
+    gas = hex(web3.eth.get_block("latest").gasLimit)
+    calls = [
+        {
+            "jsonrpc": "2.0",
+            "id": i,
+            "method": "eth_call",
+            "params": [
+                {
+                    "to": harness.address,
+                    "data": harness.blackScholesPriceBatch.encode_input(
+                        rows[start : start + BATCH_SIZE], use_fused_kernel
+                    ),
+                    "gas": gas,
+                },
+                "latest",
+            ],
+        }
+        for (i, start) in enumerate(range(0, len(rows), BATCH_SIZE))
+    ]
+
+    (prices, gas_used, reverted) = ([], [], [])
+    for start in range(0, len(calls), CALLS_PER_REQUEST):
+        for result in _post_batch(calls[start : start + CALLS_PER_REQUEST]):
+            assert "error" not in result, result.get("error")
+            (
+                batch_prices,
+                batch_gas,
+                batch_reverted,
+            ) = harness.blackScholesPriceBatch.decode_output(result["result"])
+            prices += batch_prices
+            gas_used += batch_gas
+            reverted += batch_reverted
+    return (np.array(prices, dtype=object), np.array(gas_used), np.array(reverted))
+
+
+def price_with_port(inputs, use_fused_kernel):
+    """
+    Returns the prices of the exact port, None where the contract reverts
+    """
+    price = (
+        option_math.fused_black_scholes_price
+        if use_fused_kernel
+        else option_math.black_scholes_price
+    )
+    prices = []
+    for row in _rows(inputs):
+        try:
+            prices.append(price(*row))
+        except option_math.MathRevert:
+            prices.append(None)
+    return np.array(prices, dtype=object)
+
+
+def reference_prices(inputs):
+    """
+    Black-Scholes prices with the exact normal CDF, with a factor of 1e8
+    """
+    (iv, strike, spot, period) = (
+        inputs[key].astype(np.float64)
+        for key in ("impliedVol", "strike", "spot", "period")
+    )
+    erfc = np.frompyfunc(math.erfc, 1, 1)
+
+    def cdf(x):
+        return 0.5 * erfc(-x / math.sqrt(2)).astype(np.float64)
+
+    deviation = iv / 1e4 * np.sqrt(period / YEAR)
+    d1 = (np.log(spot / strike) + deviation**2 / 2) / deviation
+    d2 = d1 - deviation
+    call = spot * cdf(d1) - strike * cdf(d2)
+    put = strike * cdf(-d2) - spot * cdf(-d1)
+    return np.where(inputs["isCall"], call, put)
+
+
+def _percentiles(values):
+    if len(values) == 0:
+        return {}
+    points = [50, 90, 99, 99.9, 100]
+    return {
+        f"p{p:g}": float(v) for (p, v) in zip(points, np.percentile(values, points))
+    }
+
+
+def _regions(inputs, mask):
+    # Reverts by log10(spot / strike) and log10(iv * sqrt(years)) in halves
+    moneyness = np.log10(inputs["spot"] / inputs["strike"])
+    deviation = np.log10(inputs["impliedVol"] / 1e4 * np.sqrt(inputs["period"] / YEAR))
+    regions = {}
+    for (m, d) in zip(
+        np.floor(moneyness[mask] * 2) / 2, np.floor(deviation[mask] * 2) / 2
+    ):
+        key = f"log10(S/K)={m:+.1f} log10(sigma*sqrt(T))={d:+.1f}"
+        regions[key] = regions.get(key, 0) + 1
+    return dict(sorted(regions.items(), key=lambda item: -item[1]))
+
+
+def kernel_report(inputs, chain, port, reference):
+    (prices, gas_used, reverted) = chain
+    priced = ~reverted
+    mismatches = int(
+        sum(
+            (p is None) != r or (not r and p != c)
+            for (p, c, r) in zip(port, prices, reverted)
+        )
+    )
+    values = prices[priced].astype(np.float64)
+    errors = values - reference[priced]
+    scale = (inputs["spot"] + inputs["strike"])[priced].astype(np.float64)
+    significant = reference[priced] > 1e-4 * inputs["strike"][priced]
+    relative = np.abs(errors[significant] / reference[priced][significant])
+    histogram = np.histogram(
+        np.log10(np.maximum(relative, 1e-18)), bins=np.arange(-18, 3)
+    )
+    return {
+        "samples": len(prices),
+        "port_mismatches": mismatches,
+        "reverts": int(reverted.sum()),
+        "revert_regions": _regions(inputs, reverted),
+        "absolute_error": _percentiles(np.abs(errors)),
+        # Beyond the rounding of the result to 1e-8
+        "error_over_spot_plus_strike": _percentiles(
+            np.maximum(np.abs(errors) - 1, 0) / scale
+        ),
+        "relative_error": _percentiles(relative),
+        "relative_error_log10_histogram": {
+            f"{int(edge)}": int(count)
+            for (edge, count) in zip(histogram[1], histogram[0])
+        },
+        "gas": {
+            "mean": float(gas_used[priced].mean()) if priced.any() else None,
+            **_percentiles(gas_used[priced]),
+            "min": int(gas_used[priced].min()) if priced.any() else None,
+        },
+    }
+
+
+def test_pricing_fuzz(contracts, accounts, OptionMathHarness):
+    harness = OptionMathHarness.deploy({"from": accounts[0]})
+    inputs = sample_inputs(SAMPLES, SEED)
+    reference = reference_prices(inputs)
+
+    report = {"samples": SAMPLES, "seed": SEED, "kernels": {}}
+    for (name, use_fused_kernel) in KERNELS.items():
+        start = time.perf_counter()
+        chain = price_on_chain(harness, inputs, use_fused_kernel)
+        elapsed = time.perf_counter() - start
+        port = price_with_port(inputs, use_fused_kernel)
+        report["kernels"][name] = {
+            "seconds_on_chain": elapsed,
+            **kernel_report(inputs, chain, port, reference),
+        }
+
+    REPORT_PATH.parent.mkdir(parents=True, exist_ok=True)
+    REPORT_PATH.write_text(json.dumps(report, indent=2) + "\n")
+
+    for (name, kernel) in report["kernels"].items():
+        assert kernel["port_mismatches"] == 0, f"{name} differs from the port"
+        assert kernel["reverts"] < SAMPLES, f"{name} always reverts"
+        assert (
+            kernel["error_over_spot_plus_strike"]["p100"] < CDF_ERROR + 1e-9
+        ), f"{name} is off by more than the CDF approximation"
+    assert (
+        report["kernels"]["fusedBlackScholesPrice"]["gas"]["mean"]
+        < report["kernels"]["blackScholesPrice"]["gas"]["mean"]
+    ), "The fused kernel should be cheaper"
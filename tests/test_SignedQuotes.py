@@ -0,0 +1,193 @@
+import brownie
+from eth_keys import keys
+
+
+def sign_quote(options, signer, quote):
+    digest = options.quoteDigest(quote)
+    signature = keys.PrivateKey(bytes.fromhex(signer.private_key[2:])).sign_msg_hash(
+        bytes(digest)
+    )
+    (r, s, v) = (signature.r, signature.s, signature.v + 27)
+    return r.to_bytes(32, "big") + s.to_bytes(32, "big") + bytes([v])
+
+
+class SignedQuoteTesting(object):
+    def __init__(
+        self,
+        accounts,
+        options,
+        generic_pool,
+        amount,
+        meta,
+        chain,
+        tokenX,
+        liquidity,
+        options_config,
+    ):
+        self.tokenX_options = options
+        self.options_config = options_config
+        self.generic_pool = generic_pool
+        self.amount = amount
+        self.meta = meta
+        self.accounts = accounts
+        self.owner = accounts[0]
+        self.option_holder = accounts[1]
+        self.referrer = accounts[3]
+        self.signer = accounts.add()
+        self.liquidity = liquidity
+        self.tokenX = tokenX
+        self.chain = chain
+        self.expiry = self.generic_pool.fixedExpiry()
+        self.strike = self.options_config.fixedStrike()
+
+    def provide_liquidity(self):
+        self.tokenX.approve(
+            self.generic_pool.address, self.liquidity, {"from": self.owner}
+        )
+        self.generic_pool.provide(self.liquidity, 0, {"from": self.owner})
+        self.tokenX_options.approvePoolToTransferTokenX({"from": self.owner})
+
+    def get_quote(
+        self, nonce, premium=None, strike=None, deadline=None, buyer=None, type=2
+    ):
+        if premium is None:
+            (_, _, premium) = self.tokenX_options.fees(
+                self.expiry - self.chain.time(), self.amount, self.strike, 2
+            )
+        return (
+            buyer or self.option_holder,
+            0,
+            type,
+            self.amount,
+            strike or self.strike,
+            self.expiry,
+            premium,
+            deadline or self.chain.time() + 300,
+            nonce,
+        )
+
+    def buy(self, quote, signature):
+        self.tokenX.transfer(self.option_holder, int(1e18), {"from": self.owner})
+        self.tokenX.approve(
+            self.tokenX_options.address, int(1e18), {"from": self.option_holder}
+        )
+        return self.tokenX_options.createWithQuote(
+            quote,
+            signature,
+            self.referrer,
+            self.meta,
+            1,
+            {"from": self.option_holder},
+        )
+
+    def verify_invalid_quotes(self):
+        quote = self.get_quote(1)
+
+        # Quotes are disabled until a signer is set
+        with brownie.reverts(revert_pattern="InvalidQuoteSignature:.*"):
+            self.buy(quote, sign_quote(self.tokenX_options, self.signer, quote))
+
+        with brownie.reverts("Ownable: caller is not the owner"):
+            self.options_config.setQuoteSigner(
+                self.signer, {"from": self.option_holder}
+            )
+        self.options_config.setQuoteSigner(self.signer, {"from": self.owner})
+        assert self.options_config.quoteSigner() == self.signer, "Wrong signer"
+
+        with brownie.reverts(revert_pattern="InvalidQuoteSignature:.*"):
+            self.buy(quote, sign_quote(self.tokenX_options, self.accounts.add(), quote))
+
+        tampered_quote = self.get_quote(1, premium=quote[6] // 2)
+        with brownie.reverts(revert_pattern="InvalidQuoteSignature:.*"):
+            self.buy(
+                tampered_quote, sign_quote(self.tokenX_options, self.signer, quote)
+            )
+
+        wrong_strike = self.get_quote(1, strike=self.strike + int(1e8))
+        with brownie.reverts(revert_pattern="QuoteMismatch:.*"):
+            self.buy(
+                wrong_strike, sign_quote(self.tokenX_options, self.signer, wrong_strike)
+            )
+
+        # Quotes are only valid for their series' option type and their buyer
+        put = self.get_quote(1, type=1)
+        with brownie.reverts(revert_pattern="QuoteMismatch:.*"):
+            self.buy(put, sign_quote(self.tokenX_options, self.signer, put))
+        other_buyer = self.get_quote(1, buyer=self.referrer)
+        with brownie.reverts(revert_pattern="QuoteNotForBuyer:.*"):
+            self.buy(
+                other_buyer, sign_quote(self.tokenX_options, self.signer, other_buyer)
+            )
+
+        expired = self.get_quote(1, deadline=self.chain.time() - 1)
+        with brownie.reverts(revert_pattern="QuoteExpired:.*"):
+            self.buy(expired, sign_quote(self.tokenX_options, self.signer, expired))
+
+    def verify_quoted_creation(self):
+        quote = self.get_quote(2, premium=int(1e15))
+        signature = sign_quote(self.tokenX_options, self.signer, quote)
+        settlement_fee = (
+            self.amount * self.options_config.settlementFeePercentage() // 100
+        )
+        total_fee = quote[6] + settlement_fee
+
+        initial_balance = self.tokenX.balanceOf(self.option_holder)
+        initial_locked_premium = self.generic_pool.lockedPremium()
+        option = self.buy(quote, signature)
+        option_id = option.return_value
+        option_detail = self.tokenX_options.options(option_id)
+
+        assert (
+            initial_balance + int(1e18) - self.tokenX.balanceOf(self.option_holder)
+            == total_fee
+        ), "Wrong fee charged"
+        assert option.events["Create"]["totalFee"] == total_fee, "Wrong total fee"
+        assert option_detail["premium"] == quote[6], "Quoted premium wasn't used"
+        assert option_detail["strike"] == self.strike, "Wrong strike"
+        assert option_detail["amount"] == self.amount, "Wrong amount"
+        assert (
+            self.generic_pool.lockedPremium() - initial_locked_premium == quote[6]
+        ), "Wrong premium locked"
+        assert self.tokenX_options.usedQuoteNonces(quote[8]), "Nonce wasn't used"
+
+        with brownie.reverts(revert_pattern="QuoteUsed:.*"):
+            self.buy(quote, signature)
+
+    def complete_flow_test(self):
+        self.provide_liquidity()
+        self.verify_invalid_quotes()
+        self.verify_quoted_creation()
+
+
+def test_signed_quotes(contracts, accounts, chain):
+
+    (
+        token_contract,
+        pp,
+        tokenX,
+        options_config,
+        ibfr_pool,
+        usdc_options,
+        usdc_contract,
+        bufferPp,
+        european_usdc_options,
+    ) = contracts
+    amount = int(1e18) // 1000
+    meta = "test"
+    liquidity = int(3 * 1e18)
+
+    for options in [usdc_options, european_usdc_options]:
+        chain.snapshot()
+        option = SignedQuoteTesting(
+            accounts,
+            options,
+            ibfr_pool,
+            amount,
+            meta,
+            chain,
+            token_contract,
+            liquidity,
+            options_config,
+        )
+        option.complete_flow_test()
+        chain.revert()
@@ -0,0 +1,47 @@
+import brownie
+
+
+def test_cached_price(
+    TwapPriceProvider, FakePriceProvider, FakeSlidingWindowOracle, accounts, chain
+):
+    owner = accounts[0]
+    feed = FakePriceProvider.deploy(int(300e8), {"from": owner})
+    twap = FakeSlidingWindowOracle.deploy(int(2e8), {"from": owner})
+    pp = TwapPriceProvider.deploy(accounts[5], accounts[6], twap, feed, {"from": owner})
+
+    # Without a poke the price is read live
+    assert pp.getUsdPrice() == int(600e8), "Wrong live price"
+    feed.setPrice(int(310e8), {"from": owner})
+    assert pp.getUsdPrice() == int(620e8), "Live price should follow the feed"
+
+    with brownie.reverts("Ownable: caller is not the owner"):
+        pp.setMaxAge(60, {"from": accounts[1]})
+    tx = pp.setMaxAge(60, {"from": owner})
+    assert tx.events["UpdateMaxAge"]["maxAge"] == 60, "Wrong event"
+
+    # Anyone can poke, the cached price is used within the window
+    tx = pp.poke({"from": accounts[1]})
+    assert tx.return_value == int(620e8), "Wrong poked price"
+    assert tx.events["Poke"]["price"] == int(620e8), "Wrong event"
+    (price, updated_at, max_age) = pp.cache()
+    assert (price, updated_at, max_age) == (int(620e8), tx.timestamp, 60)
+
+    feed.setPrice(int(320e8), {"from": owner})
+    twap.setRate(int(3e8), {"from": owner})
+    assert pp.getUsdPrice() == int(620e8), "Cached price wasn't used"
+
+    # Once the window has passed the price is read live again
+    chain.sleep(120)
+    chain.mine(1)
+    assert pp.getUsdPrice() == int(960e8), "Stale price was used"
+
+    pp.poke({"from": accounts[1]})
+    assert pp.getUsdPrice() == int(960e8), "Wrong cached price"
+
+    # A price that doesn't fit in the cache isn't truncated
+    twap.setRate(int(1e8), {"from": owner})
+    feed.setPrice(2**128, {"from": owner})
+    with brownie.reverts(revert_pattern="PriceTooLarge:.*"):
+        pp.poke({"from": accounts[1]})
+    (price, _, _) = pp.cache()
+    assert price == int(960e8), "The cache shouldn't change"
@@ -0,0 +1,59 @@
+import itertools
+
+import numpy as np
+
+from scripts import vectorized_fees
+
+ONE_DAY = 86400
+
+
+def test_vectorized_fees_error():
+    (exact, max_price_error, max_premium_error) = vectorized_fees.measure_error(2000)
+    assert exact > 0.98, "Too few exact prices"
+    assert max_price_error <= 1, "Price is off by more than 1"
+    assert max_premium_error < 1e-10, "Premium is off"
+
+
+def test_vectorized_fees(contracts, accounts):
+    (
+        token_contract,
+        pp,
+        tokenX,
+        options_config,
+        ibfr_pool,
+        usdc_options,
+        usdc_contract,
+        bufferPp,
+        european_usdc_options,
+    ) = contracts
+    owner = accounts[0]
+    token_contract.approve(ibfr_pool.address, int(3e18), {"from": owner})
+    ibfr_pool.provide(int(3e18), 0, {"from": owner})
+    price = pp.getUsdPrice()
+
+    amounts = np.array([int(1e15), int(1e17), int(2.4e18)])
+    strikes = np.array([int(380e8), int(395e8), int(420e8)])
+    periods = np.array([ONE_DAY, 7 * ONE_DAY, 30 * ONE_DAY])
+    (total, settlement_fee, premium) = vectorized_fees.fees(
+        period=periods[:, None, None],
+        amount=amounts[None, :, None],
+        strike=strikes[None, None, :],
+        implied_vol_rate=options_config.impliedVolRate(),
+        is_call=True,
+        current_price=price,
+        locked_amount=ibfr_pool.lockedAmount(),
+        total_balance=ibfr_pool.totalTokenXBalance(),
+        utilization_rate=options_config.utilizationRate(),
+        settlement_fee_percentage=options_config.settlementFeePercentage(),
+    )
+    assert premium.shape == (3, 3, 3), "Inputs should broadcast"
+
+    for (i, j, k) in itertools.product(range(3), repeat=3):
+        expected = usdc_options.fees(
+            int(periods[i]), int(amounts[j]), int(strikes[k]), 2
+        )
+        assert settlement_fee[i, j, k] == expected["settlementFee"]
+        # Off by at most 1e-8 USD per unit
+        assert abs(premium[i, j, k] - expected["premium"]) <= (
+            amounts[j] / price + expected["premium"] * 1e-10 + 1
+        ), "Wrong premium"